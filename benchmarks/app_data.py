@@ -0,0 +1,71 @@
+"""
+Banco temporário com dados sintéticos e a aplicação real (main.app) para os
+benchmarks: os tempos saem dos endpoints, com consulta, serialização e
+middlewares, e não de payloads montados à mão.
+
+Importe este módulo antes de qualquer módulo da aplicação: as engines e os
+limites são lidos das variáveis de ambiente na importação.
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+_tmp = tempfile.mkdtemp(prefix="estoque-bench-")
+os.environ["DATABASE_PATH"] = os.path.join(_tmp, "bench.db")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["MAX_IN_FLIGHT"] = "0"
+os.environ["LOGIN_THROTTLE_BACKEND"] = "off"
+# Sem compressão na aplicação: benchmarks.compression aplica os middlewares por fora
+os.environ["RESPONSE_COMPRESSION"] = "off"
+
+from sqlalchemy import insert  # noqa: E402
+
+from models.models import Base, Category, Location, Order, Product, StockLevel, StockMovement, Supplier, User, db  # noqa: E402
+from routes.dependencies import SessionLocal  # noqa: E402
+from security.auth import create_token  # noqa: E402
+
+# Listas sem paginação, as que mais pesam na serialização
+LIST_ROUTES = ("/stock/movements", "/stock/levels", "/stock/alerts", "/product/", "/order/")
+
+
+def seed(rows: int) -> dict:
+    """Cria o schema, grava rows produtos/níveis/movimentações/pedidos e devolve os headers do admin"""
+    Base.metadata.create_all(db)
+    session = SessionLocal()
+    admin = User("admin", "Admin", "admin@bench.local", "x", admin=True)
+    session.add_all([admin, Location("MAIN", "", "Default location")])
+    session.flush()
+
+    start = datetime(2026, 1, 1)
+    session.execute(insert(Category), [{"name": f"Categoria {i}"} for i in range(1, 21)])
+    session.execute(insert(Supplier), [{"name": f"Fornecedor {i}"} for i in range(1, 51)])
+    session.execute(insert(Product), [
+        {"name": f"Produto Exemplo {i}", "description": "Descrição do produto de exemplo",
+         "price": round(9.9 + i % 1000 * 0.37, 2), "category_id": i % 20 + 1, "supplier_id": i % 50 + 1,
+         "created_at": start, "version": 1}
+        for i in range(1, rows + 1)
+    ])
+    # Metade dos níveis abaixo do mínimo, para /stock/alerts
+    session.execute(insert(StockLevel), [
+        {"product_id": i, "location_id": 1, "current_quantity": i % 300, "minimum_quantity": 150,
+         "maximum_quantity": 500, "version": 1}
+        for i in range(1, rows + 1)
+    ])
+    session.execute(insert(StockMovement), [
+        {"product_id": i % rows + 1, "movement_type": "in" if i % 2 else "out", "quantity": i % 40 + 1,
+         "reference_type": "manual", "user_id": admin.id, "location_id": 1,
+         "created_at": start + timedelta(minutes=i)}
+        for i in range(1, rows + 1)
+    ])
+    session.execute(insert(Order), [
+        {"status": "PENDING", "user_id": admin.id, "product_id": i % rows + 1, "quantity": i % 5 + 1,
+         "total_price": (i % 5 + 1) * 10.0, "created_at": start + timedelta(minutes=i), "version": 1}
+        for i in range(1, rows + 1)
+    ])
+    session.commit()
+    headers = {"Authorization": f"Bearer {create_token(admin.id)}"}
+    session.close()
+    return headers
@@ -0,0 +1,69 @@
+"""
+Mede, nos endpoints de listagem reais (/stock/movements, /stock/levels,
+/product/, ...), o tamanho no fio e o tempo do request sem compressão e com
+o CompressionMiddleware da aplicação em cada nível de gzip e brotli.
+
+Cada request passa pela aplicação inteira (TestClient sobre main.app, banco
+SQLite temporário com --rows linhas por tabela).
+
+Uso (na raiz do projeto):
+    python -m benchmarks.compression --rows 50000 --repeat 3
+"""
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from benchmarks.app_data import LIST_ROUTES, seed
+
+from main import app  # noqa: E402
+from services.compression import CompressionMiddleware  # noqa: E402
+
+# (nome, Accept-Encoding, kwargs do CompressionMiddleware)
+VARIANTS = [
+    ("gzip -1", "gzip", {"gzip_level": 1}),
+    ("gzip -6", "gzip", {"gzip_level": 6}),
+    ("gzip -9", "gzip", {"gzip_level": 9}),
+    ("brotli q1", "br", {"brotli_quality": 1}),
+    ("brotli q4", "br", {"brotli_quality": 4}),
+    ("brotli q11", "br", {"brotli_quality": 11}),
+]
+
+
+def measure(client: TestClient, path: str, headers: dict, repeat: int):
+    """Melhor tempo do request e bytes no fio (corpo antes da descompressão do cliente)"""
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        best = min(best, time.perf_counter() - started)
+        response.raise_for_status()
+        size = response.num_bytes_downloaded
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    headers = seed(args.rows)
+    print(f"rows: {args.rows} por tabela (melhor de {args.repeat})")
+    # O contexto do TestClient roda o lifespan da aplicação; os clientes
+    # comprimidos reaproveitam a mesma aplicação já iniciada
+    with TestClient(app) as plain:
+        clients = [
+            (name, encoding, TestClient(CompressionMiddleware(app, minimum_size=0, **options)))
+            for name, encoding, options in VARIANTS
+        ]
+        for path in LIST_ROUTES:
+            identity_ms, identity_size = measure(plain, path, {**headers, "Accept-Encoding": "identity"}, args.repeat)
+            print(f"\n{path}: {identity_size / 1024:.0f} KiB sem compressão, {identity_ms * 1000:.1f} ms")
+            for name, encoding, client in clients:
+                ms, size = measure(client, path, {**headers, "Accept-Encoding": encoding}, args.repeat)
+                print(f"  {name:<11} {ms * 1000:8.1f} ms  {size / 1024:8.0f} KiB ({size / identity_size:.0%})")
+
+
+if __name__ == "__main__":
+    main()
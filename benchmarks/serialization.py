@@ -0,0 +1,56 @@
+"""
+Compara, nos endpoints de listagem reais, o caminho do response_model do
+FastAPI (dicts validados e serializados pelo response_model) com o caminho
+rápido dos endpoints que usam list_response(..., fast=True) (TypeAdapter do
+schema -> bytes JSON), alternando FAST_SERIALIZATION.
+
+Cada request passa pela aplicação inteira (TestClient sobre main.app, banco
+SQLite temporário com --rows linhas por tabela).
+
+Uso (na raiz do projeto):
+    python -m benchmarks.serialization --rows 50000 --repeat 5
+"""
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from benchmarks.app_data import LIST_ROUTES, seed
+
+import services.serialization as serialization  # noqa: E402
+from main import app  # noqa: E402
+
+
+def measure(client: TestClient, path: str, headers: dict, repeat: int):
+    best, body = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        best = min(best, time.perf_counter() - started)
+        response.raise_for_status()
+        body = response.json()
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    headers = seed(args.rows)
+    print(f"rows: {args.rows} por tabela (melhor de {args.repeat})")
+    print(f"{'rota':<20} {'response_model':>15} {'fast path':>12} {'speedup':>8}")
+    with TestClient(app) as client:
+        for path in LIST_ROUTES:
+            serialization.FAST_SERIALIZATION = False
+            slow, expected = measure(client, path, headers, args.repeat)
+            serialization.FAST_SERIALIZATION = True
+            fast, body = measure(client, path, headers, args.repeat)
+            # Os dois caminhos precisam gerar o mesmo JSON
+            assert body == expected, path
+            print(f"{path:<20} {slow * 1000:12.1f} ms {fast * 1000:9.1f} ms {slow / fast:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
 from routes.auth_routes import auth_router
 from routes.order_routes import order_router
 from routes.product_routes import product_router
@@ -6,8 +10,76 @@ from routes.category_routes import category_router
 from routes.supplier_routes import supplier_router
 from routes.stock_routes import stock_router
 from routes.user_routes import user_router
+from routes.job_routes import job_router
+from routes.analytics_routes import analytics_router
+from routes.metrics_routes import metrics_router
+from services.jobs import job_queue
+from services.group_commit import movement_writer
+from routes.dependencies import is_read_only, mark_write
+from services.rate_limit import LoadShedding, in_flight
+from services.compression import CompressionMiddleware
+
+# Compressão das respostas: auto ou brotli (br, com gzip para quem não aceita br), gzip ou off
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "auto").lower()
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes; respostas menores vão sem compressão
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pool de jobs em background (importações, reconciliações, etc.)
+    job_queue.start()
+    # Writer do group commit de movimentações (se STOCK_GROUP_COMMIT=true)
+    await movement_writer.start()
+    yield
+    await movement_writer.stop()
+    job_queue.shutdown()
+
+
+app = FastAPI(
+    title="Inventory Management System",
+    description="API for managing inventory, orders, and users",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+if RESPONSE_COMPRESSION != "off":
+    # Exports .gz e outras respostas já comprimidas passam sem recompressão
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        brotli=RESPONSE_COMPRESSION != "gzip",
+        brotli_quality=BROTLI_QUALITY,
+        gzip_level=GZIP_LEVEL
+    )
+
+
+# Acima de MAX_IN_FLIGHT requests em andamento, recusa na hora com 503
+# (o cliente tenta de novo) em vez de enfileirar e atrasar todo mundo.
+# /metrics fica de fora para continuar respondendo sob sobrecarga
+app.add_middleware(LoadShedding, limiter=in_flight, exempt=("/metrics",))
+
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    # Escritas bem-sucedidas fazem as próximas leituras do cliente irem ao primário
+    # (POSTs só de leitura, marcados com @read_only, não contam)
+    response = await call_next(request)
+    if not is_read_only(request) and response.status_code < 400:
+        mark_write(request, response)
+    return response
+
+
+@app.exception_handler(StaleDataError)
+async def version_conflict(request: Request, exc: StaleDataError):
+    # UPDATE com version_id_col não achou a versão lida: outra escrita passou antes
+    # (a sessão é descartada pela dependência, o que desfaz a transação)
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "Version conflict: the record was modified by another request, reload and retry"}
+    )
 
-app = FastAPI(title="Inventory Management System", description="API for managing inventory, orders, and users", version="1.0.0")
 
 app.include_router(auth_router)
 app.include_router(user_router)
@@ -16,6 +88,9 @@ app.include_router(product_router)
 app.include_router(category_router) 
 app.include_router(supplier_router)
 app.include_router(stock_router)
+app.include_router(job_router)
+app.include_router(analytics_router)
+app.include_router(metrics_router)
 
 
 ## Para rodar o codigo e executar o servidor: uvicorn main:app --reload
@@ -1,26 +1,87 @@
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, Float, DateTime, ForeignKey
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy import create_engine, event, func, Column, Integer, String, Boolean, Float, Date, DateTime, ForeignKey, Text, UniqueConstraint, Index
+from sqlalchemy.orm import declarative_base, relationship, validates
 from sqlalchemy_utils.types import ChoiceType
 from datetime import datetime
 from enum import Enum
+import os
+import unicodedata
 
 # Configuração do banco de dados SQLite
-db = create_engine("sqlite:///./banco.db")
+DATABASE_PATH = os.getenv("DATABASE_PATH", "./banco.db")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "10"))
+
+# Engine de escrita: uma única conexão por processo. Quem precisa escrever
+# espera na fila do pool, então só há um writer por vez no processo.
+db = create_engine(
+    f"sqlite:///{DATABASE_PATH}",
+    pool_size=1,
+    max_overflow=0,
+    pool_timeout=SQLITE_BUSY_TIMEOUT_MS / 1000
+)
+
+# Engine de leitura: pool separado, somente leitura (não disputa o lock de escrita)
+read_db = create_engine(
+    f"sqlite:///file:{DATABASE_PATH}?mode=ro&uri=true",
+    pool_size=DB_READ_POOL_SIZE,
+    max_overflow=DB_READ_POOL_SIZE
+)
+
+# Réplica de leitura opcional (outra cópia do SQLite ou um standby Postgres).
+# Sem READ_REPLICA_URL, as leituras roteadas usam o pool somente leitura local.
+READ_REPLICA_URL = os.getenv("READ_REPLICA_URL")
+replica_db = create_engine(READ_REPLICA_URL, pool_pre_ping=True) if READ_REPLICA_URL else read_db
+
+@event.listens_for(db, "connect")
+def _configure_writer(dbapi_connection, connection_record):
+    # WAL: leitores não bloqueiam o writer; busy_timeout: writers de outros
+    # processos (workers do uvicorn) esperam o lock em vez de falhar
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+@event.listens_for(read_db, "connect")
+def _configure_reader(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
 
 # Criação da base declarativa
 Base = declarative_base()
 
+def search_key(value):
+    """
+    Forma de busca de um texto: sem acentos, casefold e espaços normalizados
+    ('  JOÃO  Silva' -> 'joao silva'). O lower() do SQLite só dobra ASCII, por
+    isso os filtros do /user/list comparam colunas gravadas nessa forma.
+    """
+    if value is None:
+        return None
+    decomposed = unicodedata.normalize("NFKD", " ".join(value.split()).casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
 class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
-    occupation = Column(String, nullable=False)
+    occupation = Column(String, nullable=False, index=True)
     name = Column(String, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     admin = Column(Boolean, default=False)
     password = Column(String)
-    active = Column(Boolean, default=True)
+    active = Column(Boolean, default=True, index=True)
     created_at = Column(DateTime, default=datetime.now, nullable=True)
+    # search_key(name) / search_key(occupation), mantidas pelos validates abaixo
+    name_search = Column(String, index=True)
+    occupation_search = Column(String, index=True)
+
+    __table_args__ = (
+        # Prefixo de email no /user/list compara lower(email) com o prefixo em minúsculas
+        Index("ix_users_email_lower", func.lower(email)),
+    )
 
     def __init__(self, occupation, name, email, password, active=True, admin=False):
         self.occupation = occupation
@@ -29,6 +90,11 @@ class User(Base):
         self.password = password
         self.admin = admin
         self.active = active
+
+    @validates("name", "occupation")
+    def _update_search_key(self, key, value):
+        setattr(self, f"{key}_search", search_key(value))
+        return value
     
     def __repr__(self):
         return f"<User(id={self.id}, name={self.name}, email={self.email}, occupation={self.occupation}, admin={self.admin}, active={self.active})>"
@@ -69,13 +135,16 @@ class Product(Base):
     description = Column(String, index=True)
     price = Column(Float, nullable=False)
     created_at = Column(DateTime, default=datetime.now, nullable=True)
-    category_id = Column(Integer, ForeignKey("categories.id"))
-    supplier_id = Column(Integer, ForeignKey("suppliers.id"))
+    category_id = Column(Integer, ForeignKey("categories.id"), index=True)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), index=True)
+    version = Column(Integer, nullable=False, default=1) # controle de concorrência otimista
+
+    __mapper_args__ = {"version_id_col": version}
 
     # Relacionamentos
     category = relationship("Category")
     supplier = relationship("Supplier")
-    stock_level = relationship("StockLevel", uselist=False, back_populates="product")
+    stock_levels = relationship("StockLevel", back_populates="product") # um nível por localização
 
     def __init__(self, name, description, price, category_id, supplier_id, created_at=None):
         self.name = name
@@ -92,71 +161,352 @@ class StockMovement(Base):
     __tablename__ = "stock_movements"
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     movement_type = Column(String, nullable=False) # 'in' or 'out'
     quantity = Column(Integer, nullable=False)
     reference_type = Column(String(20)) # 'order' or 'return'
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime, default=datetime.now)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.now, index=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False, index=True)
     
     # Relacionamentos
     product = relationship("Product")
     user = relationship("User")
+    location = relationship("Location")
 
-    def __init__(self, product_id, movement_type, quantity, user_id, reference_type=None, created_at=None):
+    def __init__(self, product_id, movement_type, quantity, user_id, location_id, reference_type=None, created_at=None):
         self.product_id = product_id
         self.movement_type = movement_type
         self.quantity = quantity
         self.reference_type = reference_type
         self.user_id = user_id
+        self.location_id = location_id
         self.created_at = created_at or datetime.now()
 
     def __repr__(self):
         return f"<StockMovement(id={self.id}, product_id={self.product_id}, movement_type={self.movement_type}, quantity={self.quantity})>"
 
+class StockMovementArchive(Base):
+    __tablename__ = "stock_movements_archive"
+
+    # Mesmo id da movimentação original (não é autoincrement)
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    movement_type = Column(String, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    reference_type = Column(String(20))
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime, index=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    period = Column(String(7), nullable=False, index=True) # 'YYYY-MM' - partição lógica
+    archived_at = Column(DateTime, default=datetime.now)
+
+    def __repr__(self):
+        return f"<StockMovementArchive(id={self.id}, product_id={self.product_id}, period={self.period}, quantity={self.quantity})>"
+
+class StockArchiveBalance(Base):
+    __tablename__ = "stock_archive_balances"
+
+    # Saldo (SUM(in) - SUM(out)) das movimentações já arquivadas de cada produto/localização
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), primary_key=True)
+    archived_net = Column(Integer, nullable=False, default=0)
+    archived_count = Column(Integer, nullable=False, default=0)
+    archived_until = Column(DateTime) # tudo antes desta data está no arquivo
+
+    def __init__(self, product_id, location_id, archived_net=0, archived_count=0, archived_until=None):
+        self.product_id = product_id
+        self.location_id = location_id
+        self.archived_net = archived_net
+        self.archived_count = archived_count
+        self.archived_until = archived_until
+
+    def __repr__(self):
+        return f"<StockArchiveBalance(product_id={self.product_id}, location_id={self.location_id}, archived_net={self.archived_net}, archived_until={self.archived_until})>"
+
+class Location(Base):
+    __tablename__ = "locations"
+    __table_args__ = (
+        UniqueConstraint("warehouse", "bin", name="uq_locations_warehouse_bin"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    warehouse = Column(String(50), nullable=False)
+    bin = Column(String(50), nullable=False, default="")
+    description = Column(String(200))
+
+    def __init__(self, warehouse, bin="", description=None):
+        self.warehouse = warehouse
+        self.bin = bin
+        self.description = description
+
+    def __repr__(self):
+        return f"<Location(id={self.id}, warehouse={self.warehouse}, bin={self.bin})>"
+
 class StockLevel(Base):
     __tablename__ = "stock_levels"
+    __table_args__ = (
+        UniqueConstraint("product_id", "location_id", name="uq_stock_levels_product_location"),  # Um produto = um nível por localização
+        Index("ix_stock_levels_location_product", "location_id", "product_id"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, unique=True)  # Um produto = um nível de estoque
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
     current_quantity = Column(Integer, default=0)
     minimum_quantity = Column(Integer, default=0)
     maximum_quantity = Column(Integer)
-    location = Column(String(50))
+    location = Column(String(50)) # observação livre (legado)
+    version = Column(Integer, nullable=False, default=1) # controle de concorrência otimista
+
+    __mapper_args__ = {"version_id_col": version}
     
     # Relacionamento
-    product = relationship("Product", back_populates="stock_level")
+    product = relationship("Product", back_populates="stock_levels")
+    warehouse_location = relationship("Location")
 
-    def __init__(self, product_id, current_quantity=0, minimum_quantity=0, maximum_quantity=None, location=None):
+    def __init__(self, product_id, location_id, current_quantity=0, minimum_quantity=0, maximum_quantity=None, location=None):
         self.product_id = product_id
+        self.location_id = location_id
         self.current_quantity = current_quantity
         self.minimum_quantity = minimum_quantity
         self.maximum_quantity = maximum_quantity
         self.location = location
     
     def __repr__(self):
-        return f"<StockLevel(id={self.id}, product_id={self.product_id}, current_quantity={self.current_quantity})>"
+        return f"<StockLevel(id={self.id}, product_id={self.product_id}, location_id={self.location_id}, current_quantity={self.current_quantity})>"
+
+class ProductStockTotal(Base):
+    __tablename__ = "product_stock_totals"
+
+    # Soma de current_quantity de todas as localizações, mantida incrementalmente
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    total_quantity = Column(Integer, nullable=False, default=0)
+
+    def __init__(self, product_id, total_quantity=0):
+        self.product_id = product_id
+        self.total_quantity = total_quantity
+
+    def __repr__(self):
+        return f"<ProductStockTotal(product_id={self.product_id}, total_quantity={self.total_quantity})>"
+
+class StockForecast(Base):
+    __tablename__ = "stock_forecasts"
+
+    # Resultado do job stock_forecast para cada nível (produto/localização)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), primary_key=True)
+    average_daily_demand = Column(Float, nullable=False, default=0) # média móvel da janela
+    smoothed_daily_demand = Column(Float, nullable=False, default=0) # suavização exponencial
+    demand_std = Column(Float, nullable=False, default=0)
+    safety_stock = Column(Integer, nullable=False, default=0)
+    reorder_point = Column(Integer, nullable=False, default=0, index=True)
+    lookback_days = Column(Integer, nullable=False)
+    lead_time_days = Column(Integer, nullable=False)
+    computed_at = Column(DateTime, default=datetime.now)
+
+    def __init__(self, product_id, location_id, average_daily_demand, smoothed_daily_demand, demand_std,
+                 safety_stock, reorder_point, lookback_days, lead_time_days, computed_at=None):
+        self.product_id = product_id
+        self.location_id = location_id
+        self.average_daily_demand = average_daily_demand
+        self.smoothed_daily_demand = smoothed_daily_demand
+        self.demand_std = demand_std
+        self.safety_stock = safety_stock
+        self.reorder_point = reorder_point
+        self.lookback_days = lookback_days
+        self.lead_time_days = lead_time_days
+        self.computed_at = computed_at or datetime.now()
+
+    def __repr__(self):
+        return f"<StockForecast(product_id={self.product_id}, location_id={self.location_id}, reorder_point={self.reorder_point})>"
+
+class StockValueRollup(Base):
+    __tablename__ = "stock_value_rollups"
+
+    # Valor do estoque (quantidade * preço) agregado por categoria ou fornecedor,
+    # mantido incrementalmente. dimension_id = 0: produtos sem categoria/fornecedor.
+    dimension = Column(String(10), primary_key=True) # 'category' ou 'supplier'
+    dimension_id = Column(Integer, primary_key=True)
+    total_quantity = Column(Integer, nullable=False, default=0)
+    total_value = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.now)
+
+    def __init__(self, dimension, dimension_id, total_quantity=0, total_value=0):
+        self.dimension = dimension
+        self.dimension_id = dimension_id
+        self.total_quantity = total_quantity
+        self.total_value = total_value
+        self.updated_at = datetime.now()
+
+    def __repr__(self):
+        return f"<StockValueRollup(dimension={self.dimension}, dimension_id={self.dimension_id}, total_value={self.total_value})>"
+
+class StockMovementDaily(Base):
+    __tablename__ = "stock_movement_daily"
+
+    # Volume de movimentações por dia, mantido incrementalmente
+    day = Column(Date, primary_key=True)
+    in_count = Column(Integer, nullable=False, default=0)
+    in_quantity = Column(Integer, nullable=False, default=0)
+    out_count = Column(Integer, nullable=False, default=0)
+    out_quantity = Column(Integer, nullable=False, default=0)
+
+    def __init__(self, day, in_count=0, in_quantity=0, out_count=0, out_quantity=0):
+        self.day = day
+        self.in_count = in_count
+        self.in_quantity = in_quantity
+        self.out_count = out_count
+        self.out_quantity = out_quantity
+
+    def __repr__(self):
+        return f"<StockMovementDaily(day={self.day}, in_quantity={self.in_quantity}, out_quantity={self.out_quantity})>"
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Índice de cobertura dos relatórios: filtra por período e agrega sem ler a tabela
+        Index("ix_orders_report_covering", "created_at", "user_id", "status", "quantity", "total_price"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     status = Column(String, default="pendente")
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
     total_price = Column(Float, nullable=False, default=0.0)
+    created_at = Column(DateTime, nullable=False, default=datetime.now) # pedidos antigos: preenchido na migração b4e8a1d3f2c9
+    version = Column(Integer, nullable=False, default=1) # controle de concorrência otimista
+
+    __mapper_args__ = {"version_id_col": version}
     
     # Relacionamentos
     user = relationship("User")
     product = relationship("Product")
     
-    def __init__(self, status, user_id, product_id, quantity, total_price):
+    def __init__(self, status, user_id, product_id, quantity, total_price, created_at=None):
         self.status = status
         self.user_id = user_id
         self.product_id = product_id
         self.quantity = quantity
         self.total_price = total_price
+        self.created_at = created_at or datetime.now()
 
     def __repr__(self):
         return f"<Order(id={self.id}, status={self.status}, user_id={self.user_id}, product_id={self.product_id}, quantity={self.quantity})>"
+
+class OrderDailyRollup(Base):
+    __tablename__ = "order_daily_rollups"
+
+    # Pedidos agregados por dia/produto/status, mantido incrementalmente
+    # (mudança de status move o pedido entre linhas)
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    status = Column(String(20), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+    def __init__(self, day, product_id, status, order_count=0, units=0, revenue=0):
+        self.day = day
+        self.product_id = product_id
+        self.status = status
+        self.order_count = order_count
+        self.units = units
+        self.revenue = revenue
+
+    def __repr__(self):
+        return f"<OrderDailyRollup(day={self.day}, product_id={self.product_id}, status={self.status}, revenue={self.revenue})>"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="pending", index=True) # pending, running, completed, failed, cancelled
+    params = Column(Text) # JSON
+    progress = Column(Integer, default=0)
+    total = Column(Integer, default=0)
+    result = Column(Text) # JSON
+    error = Column(Text)
+    cancel_requested = Column(Boolean, default=False)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    worker_id = Column(String(64)) # processo que está executando o job
+    heartbeat_at = Column(DateTime, index=True) # atualizado periodicamente enquanto roda
+
+    def __init__(self, id, kind, params=None, user_id=None, status="pending"):
+        self.id = id
+        self.kind = kind
+        self.params = params
+        self.user_id = user_id
+        self.status = status
+        self.progress = 0
+        self.total = 0
+        self.cancel_requested = False
+        self.created_at = datetime.now()
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind={self.kind}, status={self.status}, progress={self.progress}/{self.total})>"
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # Chave composta (key, user_id): a busca é feita direto pelo índice da PK
+    key = Column(String(64), primary_key=True)
+    user_id = Column(Integer, primary_key=True)
+    scope = Column(String(100), nullable=False) # ex: 'POST /stock/movements'
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text)
+    created_at = Column(DateTime, default=datetime.now, index=True)
+
+    def __init__(self, key, user_id, scope, request_hash, status_code, response_body):
+        self.key = key
+        self.user_id = user_id
+        self.scope = scope
+        self.request_hash = request_hash
+        self.status_code = status_code
+        self.response_body = response_body
+        self.created_at = datetime.now()
+
+    def __repr__(self):
+        return f"<IdempotencyKey(key={self.key}, user_id={self.user_id}, scope={self.scope}, status_code={self.status_code})>"
+
+
+class LoginFailure(Base):
+    __tablename__ = "login_failures"
+    __table_args__ = (
+        # Janela deslizante: contagem por chave a partir de um instante
+        Index("ix_login_failures_key_failed_at", "key", "failed_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    key = Column(String(320), nullable=False) # 'email:<email>' ou 'ip:<endereço>'
+    failed_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    def __init__(self, key, failed_at=None):
+        self.key = key
+        self.failed_at = failed_at or datetime.now()
+
+    def __repr__(self):
+        return f"<LoginFailure(id={self.id}, key={self.key}, failed_at={self.failed_at})>"
+
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    # Geração por tabela, incrementada no mesmo commit que altera a tabela:
+    # caches em memória de qualquer processo comparam com ela (services/cache.py)
+    name = Column(String(50), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+    def __init__(self, name, generation=0):
+        self.name = name
+        self.generation = generation
+
+    def __repr__(self):
+        return f"<CacheVersion(name={self.name}, generation={self.generation})>"
@@ -0,0 +1,142 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from models.models import Category, Supplier, StockMovementDaily, StockValueRollup, User
+from .dependencies import read_session_dependencies, verify_token, verify_admin
+from services.rate_limit import RateLimit
+from schemas.analytics_schema import DailyMovementGet, OrderReportGet, ValuationGet
+from schemas.job_schema import JobGet
+from services.analytics import DIMENSIONS
+from services.jobs import job_queue
+from services.order_reports import REPORT_GROUPS, order_report
+from typing import List, Optional
+from datetime import date
+
+# analytics_routes.py
+# Endpoints de dashboard: leem apenas as tabelas de rollup (tamanho
+# proporcional ao número de categorias/fornecedores/dias, não ao catálogo).
+analytics_router = APIRouter(
+    prefix="/analytics",
+    tags=["analytics"],
+    dependencies=[Depends(verify_admin), Depends(RateLimit("analytics"))]
+)
+
+# ============================================
+# VALORAÇÃO - Estoque x Preço
+# ============================================
+
+@analytics_router.get("/valuation", response_model=ValuationGet)
+async def get_stock_valuation(
+    by: str = "category",
+    session: Session = Depends(read_session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """Valor do estoque (quantidade * preço) por categoria ou fornecedor (apenas admin)"""
+    if by not in DIMENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid grouping. Use: {', '.join(DIMENSIONS)}"
+        )
+
+    names = Category if by == "category" else Supplier
+    rows = session.execute(
+        select(
+            StockValueRollup.dimension_id,
+            names.name,
+            StockValueRollup.total_quantity,
+            StockValueRollup.total_value
+        )
+        .outerjoin(names, names.id == StockValueRollup.dimension_id)
+        .where(StockValueRollup.dimension == by)
+        .order_by(StockValueRollup.total_value.desc())
+    ).all()
+
+    groups = [
+        {
+            "id": dimension_id or None,
+            "name": name,
+            "total_quantity": total_quantity,
+            "total_value": total_value,
+        }
+        for dimension_id, name, total_quantity, total_value in rows
+    ]
+    return {
+        "by": by,
+        "total_quantity": sum(group["total_quantity"] for group in groups),
+        "total_value": sum(group["total_value"] for group in groups),
+        "groups": groups,
+    }
+
+# ============================================
+# MOVIMENTAÇÕES - Volume diário
+# ============================================
+
+@analytics_router.get("/movements/daily", response_model=List[DailyMovementGet])
+async def get_daily_movements(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(366, ge=1, le=3660),
+    session: Session = Depends(read_session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """
+    Volume de entradas/saídas por dia no período start <= dia < end (apenas admin).
+
+    Sem período, retorna os dias mais recentes.
+    """
+    query = session.query(StockMovementDaily)
+    if start is not None:
+        query = query.filter(StockMovementDaily.day >= start)
+    if end is not None:
+        query = query.filter(StockMovementDaily.day < end)
+
+    rows = query.order_by(StockMovementDaily.day.desc()).limit(limit).all()
+    return rows[::-1]
+
+# ============================================
+# PEDIDOS - Receita e unidades
+# ============================================
+
+@analytics_router.get("/orders", response_model=OrderReportGet)
+async def get_order_report(
+    group_by: str = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    include_canceled: bool = False,
+    session: Session = Depends(read_session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """
+    Receita e unidades vendidas no período start <= dia < end (apenas admin).
+
+    group_by: day, week, product, user ou status.
+    """
+    if group_by not in REPORT_GROUPS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid grouping. Use: {', '.join(REPORT_GROUPS)}"
+        )
+
+    rows = order_report(session, group_by, start, end, include_canceled)
+    return {
+        "group_by": group_by,
+        "start": start,
+        "end": end,
+        "order_count": sum(row["order_count"] for row in rows),
+        "units": sum(row["units"] for row in rows),
+        "revenue": sum(row["revenue"] for row in rows),
+        "rows": rows,
+    }
+
+# ============================================
+# REBUILD - Recalcula os rollups
+# ============================================
+
+@analytics_router.post("/rebuild", response_model=JobGet, status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_analytics(current_user: User = Depends(verify_token)):
+    """
+    Recalcula todos os rollups a partir dos dados de origem (apenas admin).
+
+    Enfileira um job; acompanhe em GET /jobs/{job_id}.
+    """
+    return job_queue.enqueue("analytics_rebuild", user_id=current_user.id)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from models.models import User
 from .dependencies import session_dependencies, verify_token
 from security.security import bcrypt_context
@@ -6,6 +6,7 @@ from schemas.user_schema import UserBase, UserCreate, UserPatch
 from schemas.auth_schema import AuthBase, ChangePasswordRequest, Token
 from sqlalchemy.orm import Session
 from security.auth import create_token, auth
+from services.login_throttle import login_throttle
 from fastapi.security import OAuth2PasswordRequestForm
 
 auth_router = APIRouter(prefix="/auth", tags=["auth"])
@@ -16,23 +17,32 @@ async def get_current_user(current_user: User = Depends(verify_token)):
 
 @auth_router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     session: Session = Depends(session_dependencies)
 ):
     """
     Login - obter token JWT.
+
+    Muitas falhas seguidas por email ou IP bloqueiam novas tentativas (429).
     """
+    # Bloqueado: recusa antes de consultar o usuário e de rodar o bcrypt
+    login_throttle.check(request, form_data.username)
+
     # Busca usuário
     user = session.query(User).filter(User.email == form_data.username).first()
     
     # Verifica credenciais
     if not user or not bcrypt_context.verify(form_data.password, user.password):
+        login_throttle.failure(request, form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    login_throttle.success(request, form_data.username)
+
     # Verifica se está ativo
     if not user.active:
         raise HTTPException(
@@ -56,12 +66,16 @@ async def login(
     }
 
 @auth_router.post("/login_form")
-async def login_form(request_form_schema: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(session_dependencies)):
+async def login_form(request: Request, request_form_schema: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(session_dependencies)):
+
+    login_throttle.check(request, request_form_schema.username)
 
     user = auth(request_form_schema.username, request_form_schema.password, session)
 
     if not user:
+        login_throttle.failure(request, request_form_schema.username)
         raise HTTPException(status_code=400, detail="Invalid credentials")
+    login_throttle.success(request, request_form_schema.username)
     
     access_token = create_token(user.id)
     refresh_token = create_token(user.id, token_duration=60*24*7)
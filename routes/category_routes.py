@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from models.models import Category,Product, User 
-from .dependencies import session_dependencies, verify_token
+from .dependencies import session_dependencies, read_session_dependencies, verify_token
 from schemas.category_schema import CategoryBase, JsonCategoryGet, JsonCategoryPatch
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import exists, select
 from typing import List
 
 category_router = APIRouter(prefix="/category", tags=["category"])
@@ -12,7 +13,7 @@ category_router = APIRouter(prefix="/category", tags=["category"])
 # GET - Listar todas as categorias
 # ============================================
 @category_router.get("/", response_model=List[JsonCategoryGet])
-async def list_categories(session: Session = Depends(session_dependencies)):
+async def list_categories(session: Session = Depends(read_session_dependencies)):
 
     return session.query(Category).all()
 
@@ -22,7 +23,7 @@ async def list_categories(session: Session = Depends(session_dependencies)):
 @category_router.get("/{category_id}", response_model=JsonCategoryGet)
 async def get_category(
     category_id: int, 
-    session: Session = Depends(session_dependencies)
+    session: Session = Depends(read_session_dependencies)
 ):
 
     category = session.get(Category, category_id)
@@ -232,9 +233,9 @@ async def delete_category(
             detail="Only admins can delete categories"
         )
     
-    products_exist = session.query(Product).filter(
-        Product.category_id == category_id
-    ).first() is not None
+    products_exist = session.execute(
+        select(exists().where(Product.category_id == category_id))
+    ).scalar()
     
     if products_exist:
         raise HTTPException(
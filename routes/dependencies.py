@@ -1,11 +1,106 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from security.security import SECRET_KEY, ALGORITHM, oauth2_schema
-from models.models import db, User  # corrigido
+from models.models import db, read_db, replica_db, READ_REPLICA_URL, User  # corrigido
+from sqlalchemy import Delete, Insert, Update, event
 from sqlalchemy.orm import sessionmaker, Session
 from jose import jwt, JWTError
+import os
+import time
+
+# Eventos de sessão que invalidam os caches (e incrementam cache_versions)
+# em todo processo que usa estas sessões, não só no da API
+import services.cache  # noqa: F401
+
+# Após uma escrita, o mesmo cliente lê do primário por este tempo (read-your-writes)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+STICKY_COOKIE = "read_primary_until"
+
+
+class RoutingSession(Session):
+    """
+    Sessão que separa leituras e escritas no SQLite.
+
+    SELECTs vão para o pool somente leitura (read_db). A partir do primeiro
+    flush/INSERT/UPDATE/DELETE, a transação passa a usar a conexão única de
+    escrita (db) até o commit/rollback, então ela também enxerga o que escreveu.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("writing") or self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info["writing"] = True
+            return db
+        return self.info.get("read_engine", read_db)
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_writer(session, transaction):
+    # Fim da transação principal: devolve as próximas leituras ao pool de leitura
+    if transaction.parent is None:
+        session.info.pop("writing", None)
+
 
 # crie um SessionLocal reutilizável
-SessionLocal = sessionmaker(bind=db, autocommit=False, autoflush=False)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+# Sessões dos endpoints de leitura: SELECTs vão para a réplica
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    info={"read_engine": replica_db}
+)
+
+# cliente -> instante até o qual deve ler do primário
+_recent_writes: dict = {}
+
+
+def _client_key(request: Request) -> str:
+    return request.headers.get("authorization") or (request.client.host if request.client else "")
+
+
+def mark_write(request: Request, response):
+    """Chamado pelo middleware após uma escrita bem-sucedida (stickiness)"""
+    if not READ_REPLICA_URL:
+        return
+    until = time.time() + READ_YOUR_WRITES_SECONDS
+    _recent_writes[_client_key(request)] = until
+    # Cookie cobre o caso de a próxima leitura cair em outro worker
+    response.set_cookie(STICKY_COOKIE, str(until), max_age=int(READ_YOUR_WRITES_SECONDS) + 1, httponly=True)
+
+    # Limpeza simples das entradas vencidas
+    if len(_recent_writes) > 10000:
+        now = time.time()
+        for key in [key for key, value in _recent_writes.items() if value < now]:
+            _recent_writes.pop(key, None)
+
+
+def read_only(endpoint):
+    """
+    Marca um endpoint que não escreve apesar do método (ex.: POST de busca
+    em lote, com os ids no corpo): o read_your_writes não fixa o cliente
+    no primário depois dele.
+    """
+    endpoint.read_only = True
+    return endpoint
+
+
+def is_read_only(request: Request) -> bool:
+    """GET/HEAD/OPTIONS ou rota marcada com @read_only (a rota já resolvida no scope)"""
+    if request.method in ("GET", "HEAD", "OPTIONS"):
+        return True
+    route = request.scope.get("route")
+    return getattr(getattr(route, "endpoint", None), "read_only", False)
+
+
+def _reads_from_primary(request: Request) -> bool:
+    now = time.time()
+    if _recent_writes.get(_client_key(request), 0) > now:
+        return True
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > now
+    except ValueError:
+        return False
+
 
 def session_dependencies():
     session = SessionLocal()
@@ -14,6 +109,18 @@ def session_dependencies():
     finally:
         session.close()
 
+def read_session_dependencies(request: Request):
+    """
+    Sessão para endpoints somente leitura (list/get).
+
+    Lê da réplica, exceto logo após uma escrita do mesmo cliente.
+    """
+    session = SessionLocal() if _reads_from_primary(request) else ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
 def verify_token(token: str = Depends(oauth2_schema), session: Session = Depends(session_dependencies)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])  # corrigido
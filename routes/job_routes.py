@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from models.models import Job, User
+from .dependencies import session_dependencies, verify_token, verify_admin
+from services.rate_limit import RateLimit
+from schemas.job_schema import JobGet
+from services.jobs import job_queue
+from typing import List, Optional
+
+job_router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+    dependencies=[Depends(verify_admin), Depends(RateLimit("jobs"))]
+)
+
+# ============================================
+# GET - Listar jobs
+# ============================================
+@job_router.get("/", response_model=List[JobGet])
+async def list_jobs(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    session: Session = Depends(session_dependencies)
+):
+    """Lista os jobs mais recentes, com filtros opcionais (apenas admin)"""
+    query = session.query(Job)
+    if status_filter:
+        query = query.filter(Job.status == status_filter)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    return query.order_by(Job.created_at.desc()).limit(limit).all()
+
+# ============================================
+# GET - Status/progresso/resultado de um job
+# ============================================
+@job_router.get("/{job_id}", response_model=JobGet)
+async def get_job(
+    job_id: str,
+    session: Session = Depends(session_dependencies)
+):
+    job = session.get(Job, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found!"
+        )
+    return job
+
+# ============================================
+# POST - Cancelar job
+# ============================================
+@job_router.post("/{job_id}/cancel", response_model=JobGet)
+async def cancel_job(
+    job_id: str,
+    current_user: User = Depends(verify_token)
+):
+    """
+    Solicita o cancelamento de um job (apenas admin).
+
+    Jobs pendentes são cancelados na hora; jobs em execução param
+    no próximo registro de progresso.
+    """
+    job = job_queue.cancel(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found!"
+        )
+    if job.status in ("completed", "failed"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Cannot cancel job with status {job.status}"
+        )
+    return job
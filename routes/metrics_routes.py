@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from .dependencies import verify_admin
+from schemas.metrics_schema import MetricsGet
+from services.rate_limit import rate_limit_metrics
+
+# metrics_routes.py
+# Contadores em memória deste processo (cada worker tem os seus).
+# Fica fora do teto de requests em andamento para continuar respondendo
+# justamente quando o servidor está sobrecarregado.
+metrics_router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(verify_admin)]
+)
+
+# ============================================
+# GET - Rate limit e corte de carga
+# ============================================
+@metrics_router.get("", response_model=MetricsGet)
+async def get_metrics():
+    """Contadores do rate limit por router e do teto de requests em andamento"""
+    return rate_limit_metrics()
@@ -1,18 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from models.models import Order, Product, User
-from .dependencies import session_dependencies, verify_token, verify_admin
-from schemas.order_schema import OrderCreate, JsonOrderGet, JsonOrderPatch, JsonOrderPut
-from typing import List 
+from .dependencies import session_dependencies, read_session_dependencies, verify_token, verify_admin
+from services.rate_limit import RateLimit
+from schemas.order_schema import OrderCreate, JsonOrderGet, JsonOrderPatch, JsonOrderPut, OrderBatchGet
+from services.idempotency import Idempotency, IdempotentRequest
+from services.order_reports import record_order
+from services.batch import keyed, parse_ids
+from services.concurrency import check_version, if_match_version, set_etag
+from services.serialization import list_response, schema_columns
+from typing import List, Optional
 
-order_router = APIRouter(prefix="/order", tags=["order"],dependencies=[Depends(verify_admin)])
+order_router = APIRouter(prefix="/order", tags=["order"],dependencies=[Depends(verify_admin), Depends(RateLimit("order"))])
 
 # ============================================
 # GET - Listar todos os pedidos
 # ============================================
 @order_router.get("/", response_model=List[JsonOrderGet])
 async def list_orders(
-    session: Session = Depends(session_dependencies),
+    session: Session = Depends(read_session_dependencies),
     current_user: User = Depends(verify_token)
 ):
     """
@@ -20,10 +27,32 @@ async def list_orders(
     - Admin: vê todos os pedidos
     - Usuário comum: vê apenas seus pedidos
     """
-    if current_user.admin:
-        return session.query(Order).all()
-    else:
-        return session.query(Order).filter(Order.user_id == current_user.id).all()
+    stmt = select(*schema_columns(JsonOrderGet, Order)).order_by(Order.id)
+    if not current_user.admin:
+        stmt = stmt.where(Order.user_id == current_user.id)
+    result = session.execute(stmt)
+    return list_response(JsonOrderGet, result.all(), result.keys(), fast=True)
+
+# ============================================
+# GET - Buscar vários pedidos por ID
+# ============================================
+@order_router.get("/batch", response_model=OrderBatchGet)
+async def get_orders_batch(
+    ids: str,
+    session: Session = Depends(read_session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """
+    Busca vários pedidos em uma consulta: ?ids=1,2,3.
+
+    Mesma regra da listagem: usuário comum só recebe os próprios pedidos;
+    os demais ids vêm em missing.
+    """
+    ids = parse_ids(ids)
+    query = session.query(Order).filter(Order.id.in_(ids))
+    if not current_user.admin:
+        query = query.filter(Order.user_id == current_user.id)
+    return keyed(ids, {order.id: order for order in query.all()})
 
 # ============================================
 # GET - Buscar pedido por ID
@@ -31,7 +60,8 @@ async def list_orders(
 @order_router.get("/{order_id}", response_model=JsonOrderGet)
 async def get_order(
     order_id: int, 
-    session: Session = Depends(session_dependencies),
+    response: Response,
+    session: Session = Depends(read_session_dependencies),
     current_user: User = Depends(verify_token)
 ):
     order = session.get(Order, order_id)
@@ -41,6 +71,7 @@ async def get_order(
             detail="Order not found!"
         )
     
+    set_etag(response, order)
     return order
 
 # ============================================
@@ -50,8 +81,14 @@ async def get_order(
 async def create_order(
     order_base: OrderCreate, 
     session: Session = Depends(session_dependencies), 
-    current_user: User = Depends(verify_token)
+    current_user: User = Depends(verify_token),
+    idempotency: IdempotentRequest = Depends(Idempotency("POST /order/"))
 ):
+    # Retry com a mesma Idempotency-Key: devolve o pedido já criado
+    replay = idempotency.replay(order_base)
+    if replay:
+        return replay
+
     # # Valida quantidade
     # if order_base.quantity <= 0:
     #     raise HTTPException(
@@ -89,7 +126,12 @@ async def create_order(
     )
     
     session.add(new_order)
-    session.commit()
+    record_order(session, new_order)
+    session.flush()
+    idempotency.save(status.HTTP_201_CREATED, JsonOrderGet.model_validate(new_order))
+    replay = idempotency.commit()
+    if replay:
+        return replay
     session.refresh(new_order)
     return new_order
 
@@ -99,8 +141,10 @@ async def create_order(
 @order_router.patch("/{order_id}/cancel", response_model=JsonOrderGet)
 async def cancel_order(
     order_id: int,
+    response: Response,
     session: Session = Depends(session_dependencies),
     current_user: User = Depends(verify_token),
+    expected_version: Optional[int] = Depends(if_match_version)
 ):
     # Busca pedido
     order = session.get(Order, order_id)
@@ -116,6 +160,7 @@ async def cancel_order(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to delete this order"
         )
+    check_version(order, expected_version)
 
     # Valida se pode cancelar
     if order.status in ["DELIVERED", "CANCELED"]:
@@ -124,10 +169,13 @@ async def cancel_order(
             detail=f"Cannot cancel order with status {order.status}"
         )
     
-    # Cancela pedido
+    # Cancela pedido (move o pedido para a linha CANCELED do rollup)
+    record_order(session, order, -1)
     order.status = "CANCELED"
+    record_order(session, order)
     session.commit()
     session.refresh(order)
+    set_etag(response, order)
     return order
 
 # ============================================
@@ -137,8 +185,10 @@ async def cancel_order(
 async def update_order(
     order_id: int,
     order_update: JsonOrderPut,  
+    response: Response,
     session: Session = Depends(session_dependencies),
-    current_user: User = Depends(verify_token)
+    current_user: User = Depends(verify_token),
+    expected_version: Optional[int] = Depends(if_match_version)
 ):
     # Busca pedido
     order = session.get(Order, order_id)
@@ -154,6 +204,7 @@ async def update_order(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to update this order"
         )
+    check_version(order, expected_version)
     
     # Valida produto
     product = session.get(Product, order_update.product_id)
@@ -173,11 +224,14 @@ async def update_order(
         )
     
     # Aplica atualizações
+    record_order(session, order, -1)
     for key, value in update_data.items():
         setattr(order, key, value)
+    record_order(session, order)
     
     session.commit()
     session.refresh(order)
+    set_etag(response, order)
     return order
 
 # ============================================
@@ -187,8 +241,10 @@ async def update_order(
 async def partial_update_order(
     order_id: int,
     order_update: JsonOrderPatch,
+    response: Response,
     session: Session = Depends(session_dependencies),
-    current_user: User = Depends(verify_token)    
+    current_user: User = Depends(verify_token),
+    expected_version: Optional[int] = Depends(if_match_version)
 ):
     # Busca pedido
     order = session.get(Order, order_id)
@@ -204,6 +260,7 @@ async def partial_update_order(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to update this order"
         )
+    check_version(order, expected_version)
     
     # Extrai apenas campos enviados
     update_data = order_update.model_dump(exclude_unset=True)
@@ -216,6 +273,7 @@ async def partial_update_order(
         )
     needs_recalc = False 
     product = None  
+    record_order(session, order, -1)
     
     # Valida e atualiza product_id se enviado
     if "product_id" in update_data:
@@ -238,8 +296,10 @@ async def partial_update_order(
         
         order.total_price = float(product.price) * order.quantity
     
+    record_order(session, order)
     session.commit()
     session.refresh(order)
+    set_etag(response, order)
     return order
 
 # ============================================
@@ -260,6 +320,7 @@ async def delete_order(
         )
     
     # Deleta pedido
+    record_order(session, order, -1)
     session.delete(order)
     session.commit()
     # Não retorna nada com status 204
\ No newline at end of file
@@ -1,31 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from models.models import Product, User, Category, Supplier
-from .dependencies import session_dependencies, verify_token, verify_admin
-from schemas.product_schema import ProductCreate, ProductGet, ProductPatch, ProductUpdate
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from models.models import Product, ProductStockTotal, User, Category, Supplier
+from .dependencies import session_dependencies, read_session_dependencies, verify_token, verify_admin
+from services.rate_limit import RateLimit
+from schemas.product_schema import (
+    ProductCreate, ProductGet, ProductPatch, ProductUpdate, ProductImportResult, ProductBatchGet,
+    ProductPriceBulkUpdate, ProductPriceBulkResult
+)
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List
+from sqlalchemy import select
+from services.export import export_response
+from services.product_import import spool_request_body, save_request_body, import_products
+from services.jobs import job_queue
+from services.analytics import record_product_change, record_stock_change
+from services.serialization import FieldSelection, list_response, schema_columns
+from services.batch import keyed, parse_ids
+from services.pricing import bulk_update_prices
+from services.idempotency import Idempotency, IdempotentRequest
+from services.concurrency import check_version, if_match_version, set_etag
+from schemas.job_schema import JobGet
+from typing import List, Optional, Union
 
-product_router = APIRouter(prefix="/product", tags=["product"],dependencies=[Depends(verify_admin)])
+product_router = APIRouter(prefix="/product", tags=["product"],dependencies=[Depends(verify_admin), Depends(RateLimit("product"))])
 
 # ============================================
 # GET - Listar todos os produtos
 # ============================================
 @product_router.get("/", response_model=List[ProductGet])
-async def list_products(session: Session = Depends(session_dependencies)):
-    return session.query(Product).all()
+async def list_products(
+    fields: Optional[List[str]] = Depends(FieldSelection(ProductGet)),
+    session: Session = Depends(read_session_dependencies)
+):
+    """Lista produtos; fields=id,name,price projeta só essas colunas"""
+    result = session.execute(select(*schema_columns(ProductGet, Product, fields)).order_by(Product.id))
+    return list_response(ProductGet, result.all(), result.keys(), fields, fast=True)
+
+# ============================================
+# GET - Exportar produtos (CSV/NDJSON em streaming)
+# ============================================
+@product_router.get("/export")
+async def export_products(format: str = "csv", gzip: bool = False):
+    stmt = select(
+        Product.id,
+        Product.name,
+        Product.description,
+        Product.price,
+        Product.category_id,
+        Product.supplier_id,
+        Product.created_at
+    ).order_by(Product.id)
+    return export_response(stmt, "products", format, gzip)
+
+# ============================================
+# GET - Buscar vários produtos por ID
+# ============================================
+@product_router.get("/batch", response_model=ProductBatchGet)
+async def get_products_batch(ids: str, session: Session = Depends(read_session_dependencies)):
+    """Busca vários produtos em uma consulta: ?ids=1,2,3 (ids inexistentes vêm em missing)"""
+    ids = parse_ids(ids)
+    products = session.query(Product).filter(Product.id.in_(ids)).all()
+    return keyed(ids, {product.id: product for product in products})
 
 # ============================================
 # GET - Buscar produto por ID
 # ============================================
 @product_router.get("/{product_id}", response_model=ProductGet)
-async def get_product(product_id: int, session: Session = Depends(session_dependencies)):
+async def get_product(product_id: int, response: Response, session: Session = Depends(read_session_dependencies)):
     product = session.get(Product, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found!"
         )
+    set_etag(response, product)
     return product
 
 # ============================================
@@ -80,6 +128,37 @@ async def create_product(
     session.refresh(new_product)
     return new_product
 
+# ============================================
+# POST - Importar produtos em lote (CSV/NDJSON)
+# ============================================
+@product_router.post("/import", response_model=Union[ProductImportResult, JobGet])
+async def import_products_file(
+    request: Request,
+    format: str = "csv",
+    dry_run: bool = False,
+    background: bool = False,
+    session: Session = Depends(session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """
+    Importa produtos a partir do corpo do request (CSV com cabeçalho ou NDJSON).
+
+    Colunas: name, description, price, category_id, supplier_id.
+    Com dry_run=true apenas valida e retorna o relatório, sem gravar.
+    Com background=true enfileira um job e o relatório fica em GET /jobs/{job_id}.
+    """
+    if background:
+        path = await save_request_body(request)
+        return job_queue.enqueue(
+            "product_import",
+            {"path": path, "fmt": format, "dry_run": dry_run},
+            user_id=current_user.id
+        )
+
+    # O corpo é lido no event loop; validação e INSERTs (síncronos) rodam em uma thread
+    spool = await spool_request_body(request)
+    return await asyncio.to_thread(import_products, session, spool, format, dry_run)
+
 # ============================================
 # PUT - Atualizar produto completo
 # ============================================
@@ -87,7 +166,9 @@ async def create_product(
 async def update_product(
     product_id: int,
     product_update: ProductUpdate,
-    session: Session = Depends(session_dependencies)
+    response: Response,
+    session: Session = Depends(session_dependencies),
+    expected_version: Optional[int] = Depends(if_match_version)
 ):
     
     # Busca produto
@@ -97,6 +178,8 @@ async def update_product(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found!"
         )
+    check_version(product, expected_version)
+    old_values = (product.price, product.category_id, product.supplier_id)
     
     # Valida Category FK (se fornecido)
     if product_update.category_id is not None:
@@ -126,11 +209,42 @@ async def update_product(
     product.name = product_update.name
     product.description = product_update.description
     product.price = product_update.price
+
+    # Mantém os rollups de valor do estoque (preço/categoria/fornecedor)
+    record_product_change(session, product, *old_values)
     
     session.commit()
     session.refresh(product)
+    set_etag(response, product)
     return product
 
+# ============================================
+# PATCH - Atualizar preços em lote
+# ============================================
+@product_router.patch("/prices", response_model=ProductPriceBulkResult)
+async def bulk_update_product_prices(
+    price_update: ProductPriceBulkUpdate,
+    session: Session = Depends(session_dependencies),
+    idempotency: IdempotentRequest = Depends(Idempotency("PATCH /product/prices"))
+):
+    """
+    Atualiza preços em lote em uma única transação.
+
+    rules: reajuste percentual por categoria/fornecedor; items: preço
+    explícito por id (prevalece sobre as regras). Aceita Idempotency-Key,
+    que evita aplicar o mesmo reajuste percentual duas vezes num retry.
+    """
+    replay = idempotency.replay(price_update)
+    if replay:
+        return replay
+
+    summary = ProductPriceBulkResult(**bulk_update_prices(session, price_update.items, price_update.rules))
+    idempotency.save(status.HTTP_200_OK, summary)
+    replay = idempotency.commit()
+    if replay:
+        return replay
+    return summary
+
 # ============================================
 # PATCH - Atualizar produto parcialmente
 # ============================================
@@ -138,7 +252,9 @@ async def update_product(
 async def partial_update_product(
     product_id: int,
     product_update: ProductPatch,
-    session: Session = Depends(session_dependencies)
+    response: Response,
+    session: Session = Depends(session_dependencies),
+    expected_version: Optional[int] = Depends(if_match_version)
 ):
     # Busca produto
     product = session.get(Product, product_id)
@@ -147,6 +263,7 @@ async def partial_update_product(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found!"
         )
+    check_version(product, expected_version)
     
     # Atualiza apenas campos enviados 
     update_data = product_update.model_dump(exclude_unset=True)
@@ -184,11 +301,16 @@ async def partial_update_product(
         )
     
     # Aplica atualizações
+    old_values = (product.price, product.category_id, product.supplier_id)
     for key, value in update_data.items():
         setattr(product, key, value)
+
+    # Mantém os rollups de valor do estoque (preço/categoria/fornecedor)
+    record_product_change(session, product, *old_values)
     
     session.commit()
     session.refresh(product)
+    set_etag(response, product)
     return product
 
 # ============================================
@@ -208,6 +330,10 @@ async def delete_product(
         )
     
     try:
+        # Retira o estoque do produto dos rollups de valor
+        total = session.get(ProductStockTotal, product.id)
+        if total and total.total_quantity:
+            record_stock_change(session, product.id, -total.total_quantity)
         session.delete(product)
         session.commit()
     except IntegrityError:
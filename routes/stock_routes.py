@@ -1,15 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from models.models import StockLevel, StockMovement, User, Product
-from .dependencies import session_dependencies, verify_token, verify_admin
+from models.models import Location, ProductStockTotal, StockForecast, StockLevel, StockMovement, StockMovementArchive, User, Product
+from .dependencies import session_dependencies, read_session_dependencies, read_only, verify_token, verify_admin
+from services.rate_limit import RateLimit
 from schemas.stock_schema import (
     StockMovementGet, 
     StockMovementCreate,
     StockLevelGet,
     StockLevelPost, 
     StockLevelPatch, 
-    StockLevelPut
+    StockLevelPut,
+    StockLevelLookup,
+    StockLevelBatchGet,
+    StockTransferCreate,
+    StockTransferGet,
+    StockForecastGet,
+    SupplierPurchaseSuggestion,
+    ProductStockGet,
+    LocationCreate,
+    LocationGet
 )
+from schemas.job_schema import JobGet
+from services.jobs import job_queue
+import services.reconciliation  # registra o job stock_reconciliation
+from services.forecast import (
+    FORECAST_ALPHA,
+    FORECAST_LEAD_TIME_DAYS,
+    FORECAST_LOOKBACK_DAYS,
+    FORECAST_SERVICE_Z
+)
+from services.export import export_response
+from services.purchasing import purchase_suggestions
+from services.analytics import record_movement
+from services.serialization import FieldSelection, list_response, schema_columns
+from services.batch import check_ids, keyed
+from services.idempotency import Idempotency, IdempotentRequest
+from services.concurrency import check_version, if_match_version, set_etag
+from services.archive import movements_select, STOCK_ARCHIVE_AFTER_DAYS
+from services.stock import (
+    DEFAULT_LOCATION_ID,
+    add_to_total,
+    adjust_level,
+    apply_stock_movement,
+    apply_stock_transfers,
+    find_stock_level,
+    resolve_location_id
+)
+from services.group_commit import movement_writer
+from sqlalchemy import select, tuple_
 from typing import List, Optional
 from datetime import datetime
 
@@ -17,7 +55,7 @@ from datetime import datetime
 stock_router = APIRouter(
     prefix="/stock",
     tags=['stock'],
-    dependencies=[Depends(verify_admin)]
+    dependencies=[Depends(verify_admin), Depends(RateLimit("stock"))]
 )
 
 # ============================================
@@ -26,17 +64,24 @@ stock_router = APIRouter(
 
 @stock_router.get("/levels", response_model=List[StockLevelGet])
 async def list_stock_levels(
-    session: Session = Depends(session_dependencies),
+    fields: Optional[List[str]] = Depends(FieldSelection(StockLevelGet)),
+    session: Session = Depends(read_session_dependencies),
     current_user: User = Depends(verify_token)
 ):
-    """Lista todos os níveis de estoque (apenas admin)"""
-    return session.query(StockLevel).all()
+    """
+    Lista todos os níveis de estoque (apenas admin).
+
+    fields=id,product_id,... seleciona só essas colunas no SELECT e na resposta.
+    """
+    result = session.execute(select(*schema_columns(StockLevelGet, StockLevel, fields)).order_by(StockLevel.id))
+    return list_response(StockLevelGet, result.all(), result.keys(), fields, fast=True)
 
 
 @stock_router.get("/levels/{stock_id}", response_model=StockLevelGet)
 async def get_stock_level(
     stock_id: int,
-    session: Session = Depends(session_dependencies),
+    response: Response,
+    session: Session = Depends(read_session_dependencies),
     current_user: User = Depends(verify_token)
 ):
     """Busca nível de estoque por ID (apenas admin)"""
@@ -47,6 +92,7 @@ async def get_stock_level(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Stock level not found!"
         )
+    set_etag(response, stocklevel)
     return stocklevel
 
 
@@ -66,25 +112,27 @@ async def create_stock_level(
             detail="Product not found!"
         )
     
-    # Verifica se já existe stock level para este produto
-    existing = session.query(StockLevel).filter(
-        StockLevel.product_id == product.id
-    ).first()
+    location_id = resolve_location_id(session, stocklevel.location_id)
+
+    # Verifica se já existe stock level para este produto nesta localização
+    existing = find_stock_level(session, product.id, location_id)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail="Stock level already exists for this product!"
+            detail="Stock level already exists for this product in this location!"
         )
     
     new_stocklevel = StockLevel(
         product_id=product.id,
-        current_quantity=stocklevel.current_quantity,
+        location_id=location_id,
+        current_quantity=0,
         minimum_quantity=stocklevel.minimum_quantity,
         maximum_quantity=stocklevel.maximum_quantity,
         location=stocklevel.location
     ) 
     
     session.add(new_stocklevel)
+    adjust_level(session, new_stocklevel, stocklevel.current_quantity)
     session.commit()
     session.refresh(new_stocklevel)
     return new_stocklevel
@@ -94,8 +142,10 @@ async def create_stock_level(
 async def put_stock_level(
     stock_id: int,
     stock_update: StockLevelPut,
+    response: Response,
     session: Session = Depends(session_dependencies),
-    current_user: User = Depends(verify_token)
+    current_user: User = Depends(verify_token),
+    expected_version: Optional[int] = Depends(if_match_version)
 ):
     """Substitui completamente um nível de estoque (apenas admin)"""
 
@@ -105,8 +155,11 @@ async def put_stock_level(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Stock level not found!"
         )
+    check_version(stocklevel, expected_version)
     
-    # Atualiza todos os campos
+    # Atualiza todos os campos. A quantidade é um valor absoluto: o UPDATE do
+    # ORM compara a versão lida, então uma movimentação no meio do caminho dá 409
+    add_to_total(session, stocklevel.product_id, stock_update.current_quantity - (stocklevel.current_quantity or 0))
     stocklevel.current_quantity = stock_update.current_quantity
     stocklevel.minimum_quantity = stock_update.minimum_quantity
     stocklevel.maximum_quantity = stock_update.maximum_quantity
@@ -114,6 +167,7 @@ async def put_stock_level(
     
     session.commit()
     session.refresh(stocklevel)
+    set_etag(response, stocklevel)
     return stocklevel
 
 
@@ -121,8 +175,10 @@ async def put_stock_level(
 async def patch_stock_level(
     stock_id: int,
     stock_update: StockLevelPatch,
+    response: Response,
     session: Session = Depends(session_dependencies),
-    current_user: User = Depends(verify_token)
+    current_user: User = Depends(verify_token),
+    expected_version: Optional[int] = Depends(if_match_version)
 ):
     """Atualiza parcialmente um nível de estoque (apenas admin)"""
 
@@ -132,6 +188,7 @@ async def patch_stock_level(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Stock level not found!"
         )
+    check_version(stocklevel, expected_version)
     
     # Atualiza apenas campos enviados
     update_data = stock_update.model_dump(exclude_unset=True)
@@ -148,6 +205,7 @@ async def patch_stock_level(
     
     session.commit()
     session.refresh(stocklevel)
+    set_etag(response, stocklevel)
     return stocklevel
 
 
@@ -166,6 +224,7 @@ async def delete_stock_level(
             detail="Stock level not found!"
         )
     
+    add_to_total(session, stocklevel.product_id, -(stocklevel.current_quantity or 0))
     session.delete(stocklevel)
     session.commit()
 
@@ -176,23 +235,31 @@ async def delete_stock_level(
 
 @stock_router.get("/movements", response_model=List[StockMovementGet])
 async def list_stock_movements(
-    session: Session = Depends(session_dependencies),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    session: Session = Depends(read_session_dependencies),
     current_user: User = Depends(verify_token)
 ):
-    """Lista todas as movimentações de estoque (apenas admin)"""
+    """
+    Lista as movimentações de estoque (apenas admin).
 
-    return session.query(StockMovement).all()
+    Filtros opcionais por período (start <= created_at < end); movimentações
+    arquivadas só são consultadas quando o período alcança o arquivo.
+    """
+    result = session.execute(movements_select(session, start, end))
+    return list_response(StockMovementGet, result.all(), result.keys(), fast=True)
 
 
 @stock_router.get("/movements/{movement_id}", response_model=StockMovementGet)
 async def get_stock_movement_by_id(
     movement_id: int,
-    session: Session = Depends(session_dependencies),
+    session: Session = Depends(read_session_dependencies),
     current_user: User = Depends(verify_token)
 ):
     """Busca uma movimentação específica por ID (apenas admin)"""
     
-    movement = session.get(StockMovement, movement_id)
+    # Busca na tabela quente e, se não achar, no arquivo
+    movement = session.get(StockMovement, movement_id) or session.get(StockMovementArchive, movement_id)
     if not movement:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -204,7 +271,9 @@ async def get_stock_movement_by_id(
 @stock_router.get("/movements/product/{product_id}", response_model=List[StockMovementGet])
 async def get_stock_movements_by_product(
     product_id: int,
-    session: Session = Depends(session_dependencies),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    session: Session = Depends(read_session_dependencies),
     current_user: User = Depends(verify_token)
 ):
     """Lista todas as movimentações de um produto específico (apenas admin)"""
@@ -217,9 +286,8 @@ async def get_stock_movements_by_product(
             detail="Product not found!"
         )
     
-    stockmovements = session.query(StockMovement).filter(
-        StockMovement.product_id == product_id
-    ).all()
+    result = session.execute(movements_select(session, start, end, product_id=product_id))
+    stockmovements = result.all()
     
     if not stockmovements:
         raise HTTPException(
@@ -227,70 +295,71 @@ async def get_stock_movements_by_product(
             detail="No movements found for this product!"
         )
     
-    return stockmovements
+    return list_response(StockMovementGet, stockmovements, result.keys(), fast=True)
 
 
 @stock_router.post("/movements", response_model=StockMovementGet, status_code=status.HTTP_201_CREATED)
 async def create_stock_movement(
     stockmovement: StockMovementCreate,
     session: Session = Depends(session_dependencies),
-    current_user: User = Depends(verify_token)
+    current_user: User = Depends(verify_token),
+    idempotency: IdempotentRequest = Depends(Idempotency("POST /stock/movements"))
 ):
     """
     Cria nova movimentação de estoque e atualiza automaticamente o StockLevel (apenas admin).
+
+    Aceita o header Idempotency-Key: repetições devolvem a movimentação já criada.
     """
     
-    # Valida se produto existe
-    product = session.get(Product, stockmovement.product_id)
-    if not product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Product not found!"
-        )
-    
-    # Cria movimentação
-    new_stockmovement = StockMovement(
-        product_id = product.id,
-        movement_type = stockmovement.movement_type,
-        quantity = stockmovement.quantity,
-        reference_type = stockmovement.reference_type,
-        user_id = current_user.id,
-        created_at = datetime.now()
-    )
-    session.add(new_stockmovement)
-    
-    # Atualiza ou cria nível de estoque
-    stock_level = session.query(StockLevel).filter(
-        StockLevel.product_id == product.id
-    ).first()
-    
-    if not stock_level:
-        # Cria registro se não existir
-        stock_level = StockLevel(
-            product_id=product.id,
-            current_quantity=0,
-            minimum_quantity=0,
-            maximum_quantity=1000
-        )
-        session.add(stock_level)
-        session.flush()  # garante que o stock_level tenha ID antes de atualizar
-    
-    # Ajusta quantidade
-    if stockmovement.movement_type == 'in':
-        stock_level.current_quantity += stockmovement.quantity
-    elif stockmovement.movement_type == 'out':
-        if stock_level.current_quantity < stockmovement.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient stock! Available: {stock_level.current_quantity}, Requested: {stockmovement.quantity}"
-            )
-        stock_level.current_quantity -= stockmovement.quantity
-    
-    session.commit()
+    # Retry com a mesma Idempotency-Key: devolve a resposta original
+    replay = idempotency.replay(stockmovement)
+    if replay:
+        return replay
+
+    # Group commit: a movimentação entra no próximo lote do writer. A sessão do
+    # request é fechada antes de esperar: segurar a conexão durante a espera
+    # esgota o pool e o writer não consegue a dele
+    if movement_writer.enabled:
+        user_id = current_user.id
+        session.close()
+        return await movement_writer.submit(stockmovement, user_id, idempotency)
+
+    new_stockmovement = apply_stock_movement(session, stockmovement, current_user.id)
+    idempotency.save(status.HTTP_201_CREATED, StockMovementGet.model_validate(new_stockmovement))
+    replay = idempotency.commit()
+    if replay:
+        return replay
     session.refresh(new_stockmovement)
     return new_stockmovement
 
 
+@stock_router.post("/transfers", response_model=StockTransferGet, status_code=status.HTTP_201_CREATED)
+async def create_stock_transfer(
+    transfer: StockTransferCreate,
+    session: Session = Depends(session_dependencies),
+    current_user: User = Depends(verify_token),
+    idempotency: IdempotentRequest = Depends(Idempotency("POST /stock/transfers"))
+):
+    """
+    Transfere estoque entre localizações (apenas admin).
+
+    Cada item gera uma saída na origem e uma entrada no destino; o lote
+    inteiro é aplicado em um único commit, ou nada é aplicado.
+    Aceita o header Idempotency-Key.
+    """
+    replay = idempotency.replay(transfer)
+    if replay:
+        return replay
+
+    movements = apply_stock_transfers(session, transfer.items, current_user.id)
+    result = StockTransferGet(movements=[StockMovementGet.model_validate(movement) for movement in movements])
+    idempotency.save(status.HTTP_201_CREATED, result)
+    replay = idempotency.commit()
+    if replay:
+        return replay
+    return result
+
+
 @stock_router.delete("/movements/{movement_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_stock_movement(
     movement_id: int,
@@ -309,24 +378,22 @@ async def delete_stock_movement(
             detail="Stock movement not found!"
         )
     
-    # Reverte a movimentação no estoque
-    stock_level = session.query(StockLevel).filter(
-        StockLevel.product_id == stockmovement.product_id
-    ).first()
+    # Reverte a movimentação no estoque da mesma localização
+    stock_level = find_stock_level(session, stockmovement.product_id, stockmovement.location_id)
     
     if stock_level:
         if stockmovement.movement_type == 'in':
-            # Era entrada, agora remove do estoque
-            stock_level.current_quantity -= stockmovement.quantity
-            if stock_level.current_quantity < 0:
+            # Era entrada, agora remove do estoque (se ainda houver saldo no UPDATE)
+            if not adjust_level(session, stock_level, -stockmovement.quantity, require_available=True):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Cannot delete: would result in negative stock!"
                 )
         elif stockmovement.movement_type == 'out':
             # Era saída, agora adiciona de volta ao estoque
-            stock_level.current_quantity += stockmovement.quantity
+            adjust_level(session, stock_level, stockmovement.quantity)
     
+    record_movement(session, stockmovement, sign=-1)
     session.delete(stockmovement)
     session.commit()
 
@@ -338,10 +405,11 @@ async def delete_stock_movement(
 @stock_router.get("/levels/product/{product_id}", response_model=StockLevelGet)
 async def get_stock_level_by_product(
     product_id: int,
-    session: Session = Depends(session_dependencies),
+    location_id: int = Query(DEFAULT_LOCATION_ID, gt=0),
+    session: Session = Depends(read_session_dependencies),
     current_user: User = Depends(verify_token)
 ):
-    """Busca nível de estoque de um produto específico (apenas admin)"""
+    """Busca nível de estoque de um produto em uma localização (apenas admin)"""
     
     # Valida se produto existe
     product = session.get(Product, product_id)
@@ -351,9 +419,7 @@ async def get_stock_level_by_product(
             detail="Product not found!"
         )
     
-    stock_level = session.query(StockLevel).filter(
-        StockLevel.product_id == product_id
-    ).first()
+    stock_level = find_stock_level(session, product_id, location_id)
     
     if not stock_level:
         raise HTTPException(
@@ -364,16 +430,294 @@ async def get_stock_level_by_product(
     return stock_level
 
 
+@stock_router.post("/levels/lookup", response_model=StockLevelBatchGet)
+@read_only
+async def lookup_stock_levels(
+    lookup: StockLevelLookup,
+    session: Session = Depends(read_session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """
+    Busca os níveis de vários produtos em uma localização com uma consulta (apenas admin).
+
+    Resultado por product_id; produtos sem nível (ou inexistentes) vêm em missing.
+    """
+    product_ids = check_ids(lookup.product_ids)
+    location_id = lookup.location_id or DEFAULT_LOCATION_ID
+
+    levels = session.query(StockLevel).filter(
+        StockLevel.location_id == location_id,
+        StockLevel.product_id.in_(product_ids)
+    ).all()
+    return keyed(product_ids, {level.product_id: level for level in levels})
+
+
 @stock_router.get("/alerts", response_model=List[StockLevelGet])
 async def get_low_stock_alerts(
-    session: Session = Depends(session_dependencies),
+    use_forecast: bool = False,
+    session: Session = Depends(read_session_dependencies),
     current_user: User = Depends(verify_token)
 ):
     """
     Lista produtos com estoque abaixo do mínimo (apenas admin).
+
+    Com use_forecast=true, compara com o ponto de pedido calculado pelo
+    job de previsão em vez do mínimo cadastrado.
     """
-    low_stock = session.query(StockLevel).filter(
-        StockLevel.current_quantity <= StockLevel.minimum_quantity
-    ).all()
-    
-    return low_stock
\ No newline at end of file
+    stmt = select(*schema_columns(StockLevelGet, StockLevel)).order_by(StockLevel.id)
+    if use_forecast:
+        stmt = stmt.join(
+            StockForecast,
+            (StockForecast.product_id == StockLevel.product_id)
+            & (StockForecast.location_id == StockLevel.location_id)
+        ).where(StockLevel.current_quantity <= StockForecast.reorder_point)
+    else:
+        stmt = stmt.where(StockLevel.current_quantity <= StockLevel.minimum_quantity)
+
+    result = session.execute(stmt)
+    return list_response(StockLevelGet, result.all(), result.keys(), fast=True)
+
+
+@stock_router.get("/purchase-suggestions", response_model=List[SupplierPurchaseSuggestion])
+async def get_purchase_suggestions(
+    supplier_id: Optional[int] = Query(None, gt=0),
+    session: Session = Depends(read_session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """
+    Sugestões de compra agrupadas por fornecedor (apenas admin).
+
+    Cada item abaixo do mínimo é reposto até o máximo (ou até o mínimo,
+    se não houver máximo). O resultado fica em cache até a próxima
+    alteração de estoque, produto ou fornecedor.
+    """
+    return purchase_suggestions(session, supplier_id)
+
+
+# ============================================
+# LOCALIZAÇÕES - Multi-depósito
+# ============================================
+
+@stock_router.get("/locations", response_model=List[LocationGet])
+async def list_locations(
+    session: Session = Depends(read_session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """Lista todas as localizações (apenas admin)"""
+    return session.query(Location).order_by(Location.id).all()
+
+
+@stock_router.post("/locations", response_model=LocationGet, status_code=status.HTTP_201_CREATED)
+async def create_location(
+    location: LocationCreate,
+    session: Session = Depends(session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """Cria uma nova localização (depósito + posição) (apenas admin)"""
+    existing = session.query(Location.id).filter(
+        Location.warehouse == location.warehouse,
+        Location.bin == location.bin
+    ).first()
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Location already exists!"
+        )
+
+    new_location = Location(
+        warehouse=location.warehouse,
+        bin=location.bin,
+        description=location.description
+    )
+    session.add(new_location)
+    session.commit()
+    session.refresh(new_location)
+
+    return new_location
+
+
+@stock_router.get("/locations/{location_id}/levels", response_model=List[StockLevelGet])
+async def list_location_levels(
+    location_id: int,
+    after_product_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    session: Session = Depends(read_session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """
+    Lista os níveis de uma localização, paginados por product_id (apenas admin).
+
+    Usa o índice (location_id, product_id): passe o último product_id
+    recebido em after_product_id para buscar a próxima página.
+    """
+    if not session.get(Location, location_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Location not found!"
+        )
+
+    return session.query(StockLevel).filter(
+        StockLevel.location_id == location_id,
+        StockLevel.product_id > after_product_id
+    ).order_by(StockLevel.product_id).limit(limit).all()
+
+
+@stock_router.get("/products/{product_id}/locations", response_model=ProductStockGet)
+async def get_product_stock(
+    product_id: int,
+    session: Session = Depends(read_session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """
+    Estoque de um produto em todas as localizações (apenas admin).
+
+    O total vem de product_stock_totals, sem somar os níveis a cada chamada.
+    """
+    if not session.get(Product, product_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found!"
+        )
+
+    total = session.get(ProductStockTotal, product_id)
+    levels = session.query(StockLevel).filter(
+        StockLevel.product_id == product_id
+    ).order_by(StockLevel.location_id).all()
+
+    return ProductStockGet(
+        product_id=product_id,
+        total_quantity=total.total_quantity if total else 0,
+        levels=levels
+    )
+
+
+# ============================================
+# RECONCILIAÇÃO - Níveis x Movimentações
+# ============================================
+
+@stock_router.post("/reconcile", response_model=JobGet, status_code=status.HTTP_202_ACCEPTED)
+async def reconcile_stock_levels(
+    fix: bool = False,
+    current_user: User = Depends(verify_token)
+):
+    """
+    Recalcula os níveis de estoque a partir das movimentações (apenas admin).
+
+    Enfileira um job; acompanhe o progresso/resultado em GET /jobs/{job_id}.
+    Com fix=true, corrige as divergências encontradas.
+    """
+    return job_queue.enqueue("stock_reconciliation", {"fix": fix}, user_id=current_user.id)
+
+
+@stock_router.post("/movements/archive", response_model=JobGet, status_code=status.HTTP_202_ACCEPTED)
+async def archive_stock_movements(
+    older_than_days: int = Query(STOCK_ARCHIVE_AFTER_DAYS, ge=1),
+    current_user: User = Depends(verify_token)
+):
+    """
+    Arquiva movimentações mais antigas que older_than_days (apenas admin).
+
+    Enfileira um job; as movimentações saem da tabela quente mas continuam
+    consultáveis por período e contabilizadas na reconciliação.
+    """
+    return job_queue.enqueue("stock_archive", {"older_than_days": older_than_days}, user_id=current_user.id)
+
+
+# ============================================
+# PREVISÃO DE DEMANDA - Ponto de pedido
+# ============================================
+
+@stock_router.post("/forecast", response_model=JobGet, status_code=status.HTTP_202_ACCEPTED)
+async def run_stock_forecast(
+    lookback_days: int = Query(FORECAST_LOOKBACK_DAYS, ge=7, le=730),
+    lead_time_days: int = Query(FORECAST_LEAD_TIME_DAYS, ge=1, le=365),
+    service_z: float = Query(FORECAST_SERVICE_Z, ge=0, le=5),
+    alpha: float = Query(FORECAST_ALPHA, gt=0, le=1),
+    apply: bool = False,
+    current_user: User = Depends(verify_token)
+):
+    """
+    Recalcula a previsão de demanda e o ponto de pedido de todo o catálogo (apenas admin).
+
+    Enfileira um job; com apply=true o ponto de pedido sugerido vira o
+    minimum_quantity de cada nível.
+    """
+    params = {
+        "lookback_days": lookback_days,
+        "lead_time_days": lead_time_days,
+        "service_z": service_z,
+        "alpha": alpha,
+        "apply": apply,
+    }
+    return job_queue.enqueue("stock_forecast", params, user_id=current_user.id)
+
+
+@stock_router.get("/forecast", response_model=List[StockForecastGet])
+async def list_stock_forecast(
+    product_id: Optional[int] = Query(None, gt=0),
+    location_id: Optional[int] = Query(None, gt=0),
+    after_product_id: int = Query(0, ge=0),
+    after_location_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    session: Session = Depends(read_session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """
+    Lista a última previsão calculada (apenas admin).
+
+    Paginação por cursor: passe o product_id/location_id do último item
+    recebido em after_product_id/after_location_id.
+    """
+    query = session.query(StockForecast).filter(
+        tuple_(StockForecast.product_id, StockForecast.location_id) > tuple_(after_product_id, after_location_id)
+    )
+    if product_id is not None:
+        query = query.filter(StockForecast.product_id == product_id)
+    if location_id is not None:
+        query = query.filter(StockForecast.location_id == location_id)
+
+    return query.order_by(
+        StockForecast.product_id, StockForecast.location_id
+    ).limit(limit).all()
+
+
+# ============================================
+# EXPORTAÇÃO - Streaming CSV/NDJSON
+# ============================================
+
+@stock_router.get("/export/levels")
+async def export_stock_levels(
+    format: str = "csv",
+    gzip: bool = False,
+    current_user: User = Depends(verify_token)
+):
+    """Exporta todos os níveis de estoque em streaming (apenas admin)"""
+
+    stmt = select(
+        StockLevel.id,
+        StockLevel.product_id,
+        StockLevel.location_id,
+        StockLevel.current_quantity,
+        StockLevel.minimum_quantity,
+        StockLevel.maximum_quantity,
+        StockLevel.location
+    ).order_by(StockLevel.id)
+    return export_response(stmt, "stock_levels", format, gzip)
+
+
+@stock_router.get("/export/movements")
+async def export_stock_movements(
+    format: str = "csv",
+    gzip: bool = False,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    session: Session = Depends(read_session_dependencies),
+    current_user: User = Depends(verify_token)
+):
+    """
+    Exporta o histórico de movimentações em streaming (apenas admin).
+
+    Filtros opcionais por período: start <= created_at < end.
+    """
+    stmt = movements_select(session, start, end)
+    return export_response(stmt, "stock_movements", format, gzip)
\ No newline at end of file
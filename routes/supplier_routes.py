@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from models.models import Supplier, User, Product
-from .dependencies import session_dependencies, verify_token
+from .dependencies import session_dependencies, read_session_dependencies, verify_token
 from schemas.supplier_schema import SupplierBase, SupplierCreate, SupplierPatch
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import exists, select
 from typing import List
 
 supplier_router = APIRouter(
@@ -16,7 +17,7 @@ supplier_router = APIRouter(
 # ============================================
 @supplier_router.get("/", response_model=List[SupplierBase])
 async def list_suppliers(
-    session: Session = Depends(session_dependencies),
+    session: Session = Depends(read_session_dependencies),
     current_user: User = Depends(verify_token)
 ):
 
@@ -28,7 +29,7 @@ async def list_suppliers(
 @supplier_router.get("/{supplier_id}", response_model=SupplierBase)
 async def get_supplier(
     supplier_id: int,
-    session: Session = Depends(session_dependencies),
+    session: Session = Depends(read_session_dependencies),
     current_user: User = Depends(verify_token)
 ):
 
@@ -246,15 +247,15 @@ async def delete_supplier(
             detail="Supplier not found!"
         )
     
-    # Verifica se há produtos associados
-    products_count = session.query(Product).filter(
-        Product.supplier_id == supplier_id
-    ).count()
+    # Verifica se há produtos associados (EXISTS indexado, sem COUNT)
+    products_exist = session.execute(
+        select(exists().where(Product.supplier_id == supplier_id))
+    ).scalar()
     
-    if products_count > 0:
+    if products_exist:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail=f"Cannot delete supplier. {products_count} product(s) are associated"
+            detail="Cannot delete supplier. There are products associated"
         )
     
     # Deleta fornecedor
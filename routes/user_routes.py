@@ -1,31 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from models.models import User, Order, StockMovement
-from .dependencies import session_dependencies, verify_token, verify_admin
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from models.models import User, Order, StockMovement, search_key
+from .dependencies import session_dependencies, read_session_dependencies, verify_token, verify_admin
+from services.rate_limit import RateLimit
 from security.security import bcrypt_context
-from schemas.user_schema import UserBase, UserCreate, UserPatch
+from schemas.user_schema import UserBase, UserCreate, UserPatch, UserListPage
 from schemas.auth_schema import AuthBase
 from sqlalchemy.orm import Session
+from sqlalchemy import exists, func, select
 from security.auth import create_token, auth
 from fastapi.security import OAuth2PasswordRequestForm
-from typing import List
+from typing import Optional
 
 user_router = APIRouter(
     prefix="/user", 
     tags=["user"],
-    dependencies=[Depends(verify_admin)]
+    dependencies=[Depends(verify_admin), Depends(RateLimit("user"))]
 )
 
 # ============================================
 # USER - Lista de Usuários
 # ============================================
-@user_router.get("/list", response_model=List[UserBase])
-async def listUsers(session: Session = Depends(session_dependencies)):
-    return session.query(User).all()
+@user_router.get("/list", response_model=UserListPage)
+async def listUsers(
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    occupation: Optional[str] = None,
+    active: Optional[bool] = None,
+    admin: Optional[bool] = None,
+    name: Optional[str] = None,
+    email: Optional[str] = None,
+    session: Session = Depends(read_session_dependencies)
+):
+    """
+    Lista usuários paginados por cursor (id do último item da página anterior).
+
+    Filtros: occupation, active, admin e prefixo de name/email.
+    """
+    query = session.query(
+        User.id, User.name, User.email, User.occupation, User.admin, User.active
+    )
+
+    if cursor is not None:
+        query = query.filter(User.id > cursor)
+    if occupation:
+        query = query.filter(User.occupation_search == search_key(occupation))
+    if active is not None:
+        query = query.filter(User.active == active)
+    if admin is not None:
+        query = query.filter(User.admin == admin)
+
+    # name/occupation comparam as colunas *_search (sem acento e casefold, ver
+    # search_key); prefixo como intervalo (>= / <) para aproveitar os índices
+    if name:
+        prefix = search_key(name)
+        query = query.filter(User.name_search >= prefix, User.name_search < prefix + '\uffff')
+    if email:
+        prefix = email.strip().lower()
+        query = query.filter(func.lower(User.email) >= prefix, func.lower(User.email) < prefix + '\uffff')
+
+    # Busca um item a mais para saber se existe próxima página
+    rows = query.order_by(User.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "items": rows,
+        "next_cursor": rows[-1].id if has_more else None
+    }
 
 @user_router.get("/{user_id}", response_model=UserBase)
 async def getUser(
     user_id: int,
-    session: Session = Depends(session_dependencies)
+    session: Session = Depends(read_session_dependencies)
 ):
     user = session.get(User,user_id)
     if not user:
@@ -144,19 +190,20 @@ async def delete_user(
             detail="Você não pode deletar sua própria conta"
         )
     
-    # Verifica se tem pedidos associados
-    has_orders = session.query(Order).filter(Order.user_id == user_id).count() > 0
+    # Verifica pedidos e movimentações com EXISTS indexados, numa única query
+    has_orders, has_movements = session.execute(
+        select(
+            exists().where(Order.user_id == user_id),
+            exists().where(StockMovement.user_id == user_id)
+        )
+    ).one()
+
     if has_orders:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Não é possível deletar. Usuário tem pedidos associados. Desative a conta ao invés de deletar."
         )
     
-    # Verifica se tem movimentações de estoque
-    has_movements = session.query(StockMovement).filter(
-        StockMovement.user_id == user_id
-    ).count() > 0
-    
     if has_movements:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
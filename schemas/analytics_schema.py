@@ -0,0 +1,57 @@
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+from datetime import date
+
+class ValuationGroup(BaseModel):
+    """Valor do estoque de uma categoria/fornecedor (id None = sem categoria/fornecedor)"""
+    id: Optional[int]
+    name: Optional[str]
+    total_quantity: int
+    total_value: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ValuationGet(BaseModel):
+    """Schema para retornar a valoração do estoque agrupada"""
+    by: str
+    total_quantity: int
+    total_value: float
+    groups: List[ValuationGroup]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DailyMovementGet(BaseModel):
+    """Schema para retornar o volume de movimentações de um dia"""
+    day: date
+    in_count: int
+    in_quantity: int
+    out_count: int
+    out_quantity: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrderReportRow(BaseModel):
+    """Uma linha do relatório: dia, semana (YYYY-Www), produto, usuário ou status"""
+    key: Optional[str]
+    label: Optional[str] = None
+    order_count: int
+    units: int
+    revenue: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrderReportGet(BaseModel):
+    """Schema para retornar relatório de pedidos"""
+    group_by: str
+    start: Optional[date] = None
+    end: Optional[date] = None
+    order_count: int
+    units: int
+    revenue: float
+    rows: List[OrderReportRow]
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing import Any, Optional
+from datetime import datetime
+import json
+
+class JobGet(BaseModel):
+    """Schema para retornar um job em background"""
+    id: str
+    kind: str
+    status: str
+    params: Optional[Any] = None
+    progress: int
+    total: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    user_id: Optional[int] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    worker_id: Optional[str] = None
+    heartbeat_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator('params', 'result', mode='before')
+    @classmethod
+    def parse_json(cls, v: Any) -> Any:
+        """params/result são gravados como JSON no banco"""
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Dict
+
+
+class InFlightMetrics(BaseModel):
+    """Requests em andamento e quantos foram recusados com 503"""
+    limit: int
+    current: int
+    peak: int
+    shed: int
+
+
+class RateLimitMetrics(BaseModel):
+    """Limite de um router (tokens/s e rajada) e seus contadores"""
+    rate: float
+    burst: int
+    allowed: int
+    limited: int
+    buckets: int
+
+
+class MetricsGet(BaseModel):
+    """Schema para retornar os contadores de limitação do processo"""
+    in_flight: InFlightMetrics
+    rate_limits: Dict[str, RateLimitMetrics]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, Field, field_validator
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class OrderCreate(BaseModel):
@@ -21,6 +21,7 @@ class JsonOrderGet(BaseModel):
     total_price: float
     status: str
     created_at: Optional[datetime] = None  # se tiver no modelo
+    version: int # enviar em If-Match nas alterações
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -62,4 +63,10 @@ class JsonOrderPatch(BaseModel):
         v_upper = v.upper()
         if v_upper not in valid_statuses:
             raise ValueError(f"Status inválido. Use: {', '.join(valid_statuses)}")
-        return v_upper
\ No newline at end of file
+        return v_upper
+
+
+class OrderBatchGet(BaseModel):
+    """Pedidos encontrados por id e ids inexistentes (ou de outro usuário)"""
+    items: Dict[int, JsonOrderGet]
+    missing: List[int]
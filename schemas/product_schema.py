@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict, Field, field_validator
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from typing import Dict, List, Optional
 
 class ProductGet(BaseModel): # Modelo para visualizar produtos
     id: int
@@ -8,6 +8,7 @@ class ProductGet(BaseModel): # Modelo para visualizar produtos
     price: float
     category_id: int
     supplier_id: int
+    version: int # enviar em If-Match nas alterações
 
     # Permite ler de objetos SQLAlchemy
     model_config = ConfigDict(from_attributes=True)
@@ -86,4 +87,81 @@ class ProductPatch(BaseModel):
     def round_price(cls, v: Optional[float]) -> Optional[float]:
         if v is not None:
             return round(v, 2)
-        return v
\ No newline at end of file
+        return v
+
+# ========================================
+# PRODUTO - IMPORTAÇÃO EM LOTE
+# ========================================
+
+class ProductImportError(BaseModel):
+    """Erros de uma linha do arquivo importado"""
+    row: int
+    errors: List[str]
+
+
+class ProductImportResult(BaseModel):
+    """Relatório da importação em lote"""
+    dry_run: bool
+    total_rows: int
+    created: int
+    failed: int
+    errors: List[ProductImportError]
+
+# ========================================
+# PRODUTO - LEITURA EM LOTE
+# ========================================
+
+class ProductBatchGet(BaseModel):
+    """Produtos encontrados por id e ids inexistentes"""
+    items: Dict[int, ProductGet]
+    missing: List[int]
+
+# ========================================
+# PRODUTO - PREÇOS EM LOTE
+# ========================================
+
+class ProductPriceItem(BaseModel):
+    """Novo preço de um produto"""
+    id: int = Field(..., gt=0)
+    price: float = Field(..., gt=0, le=1000000)
+
+    @field_validator('price')
+    @classmethod
+    def round_price(cls, v: float) -> float:
+        return round(v, 2)
+
+
+class ProductPriceRule(BaseModel):
+    """Reajuste percentual dos produtos de uma categoria e/ou fornecedor"""
+    category_id: Optional[int] = Field(None, gt=0)
+    supplier_id: Optional[int] = Field(None, gt=0)
+    percent: float = Field(..., gt=-100, le=1000, description="Ex.: 10 = +10%, -5 = -5%")
+
+    @model_validator(mode='after')
+    def has_target(self):
+        if self.category_id is None and self.supplier_id is None:
+            raise ValueError("Informe category_id e/ou supplier_id")
+        return self
+
+
+class ProductPriceBulkUpdate(BaseModel):
+    """
+    Atualização de preços em lote. As regras são aplicadas primeiro;
+    preços explícitos em items prevalecem sobre as regras.
+    """
+    items: List[ProductPriceItem] = Field(default_factory=list, max_length=10000)
+    rules: List[ProductPriceRule] = Field(default_factory=list, max_length=100)
+
+    @model_validator(mode='after')
+    def not_empty(self):
+        if not self.items and not self.rules:
+            raise ValueError("Informe items e/ou rules")
+        return self
+
+
+class ProductPriceBulkResult(BaseModel):
+    """Resumo da atualização de preços em lote"""
+    updated: int
+    unchanged: int
+    missing: List[int]
+    stock_value_delta: float
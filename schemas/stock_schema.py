@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict, Field, field_validator
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from typing import Dict, List, Optional
 from datetime import datetime
 
 # ========================================
@@ -12,6 +12,7 @@ class StockMovementCreate(BaseModel):
     movement_type: str = Field(..., description="'in' ou 'out'")
     quantity: int = Field(..., gt=0)
     reference_type: Optional[str] = Field(None, max_length=20)
+    location_id: Optional[int] = Field(None, gt=0, description="Localização (padrão: depósito principal)")
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -43,6 +44,7 @@ class StockMovementGet(BaseModel):
     quantity: int
     user_id: int
     reference_type: Optional[str]
+    location_id: Optional[int] = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -63,6 +65,39 @@ class StockMovementPatch(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+# ========================================
+# STOCK TRANSFER SCHEMAS
+# ========================================
+
+class StockTransferItem(BaseModel):
+    """Uma transferência de um produto entre duas localizações"""
+    product_id: int = Field(..., gt=0)
+    from_location_id: int = Field(..., gt=0)
+    to_location_id: int = Field(..., gt=0)
+    quantity: int = Field(..., gt=0)
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @model_validator(mode='after')
+    def different_locations(self):
+        if self.from_location_id == self.to_location_id:
+            raise ValueError("from_location_id e to_location_id devem ser diferentes")
+        return self
+
+
+class StockTransferCreate(BaseModel):
+    """Schema para transferir estoque (lote atômico: tudo ou nada)"""
+    items: List[StockTransferItem] = Field(..., min_length=1, max_length=500)
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StockTransferGet(BaseModel):
+    """Schema para retornar as movimentações geradas (saída + entrada por item)"""
+    movements: List[StockMovementGet]
+
+    model_config = ConfigDict(from_attributes=True)
+
 # ========================================
 # STOCK LEVEL SCHEMAS
 # ========================================
@@ -71,10 +106,12 @@ class StockLevelGet(BaseModel):
     """Schema para retornar nível de estoque"""
     id: int
     product_id: int
+    location_id: int
     current_quantity: int
     minimum_quantity: int
     maximum_quantity: Optional[int]
     location: Optional[str]
+    version: int # enviar em If-Match nas alterações
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -82,6 +119,7 @@ class StockLevelGet(BaseModel):
 class StockLevelPost(BaseModel):
     """Schema para criar nível de estoque"""
     product_id: int = Field(..., gt=0)
+    location_id: Optional[int] = Field(None, gt=0, description="Localização (padrão: depósito principal)")
     current_quantity: int = Field(default=0, ge=0)
     minimum_quantity: int = Field(default=0, ge=0)
     maximum_quantity: Optional[int] = Field(None, ge=0)
@@ -117,3 +155,97 @@ class StockLevelPatch(BaseModel):
     location: Optional[str] = Field(None, max_length=60)
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class StockLevelLookup(BaseModel):
+    """Schema para buscar níveis de vários produtos em uma localização"""
+    product_ids: List[int] = Field(..., min_length=1)
+    location_id: Optional[int] = Field(None, gt=0, description="Localização (padrão: depósito principal)")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StockLevelBatchGet(BaseModel):
+    """Níveis encontrados por product_id e produtos sem nível na localização"""
+    items: Dict[int, StockLevelGet]
+    missing: List[int]
+
+
+class ProductStockGet(BaseModel):
+    """Schema para retornar o estoque de um produto em todas as localizações"""
+    product_id: int
+    total_quantity: int
+    levels: List[StockLevelGet]
+
+    model_config = ConfigDict(from_attributes=True)
+
+# ========================================
+# LOCATION SCHEMAS
+# ========================================
+
+class LocationCreate(BaseModel):
+    """Schema para criar localização (depósito + posição)"""
+    warehouse: str = Field(..., min_length=1, max_length=50)
+    bin: str = Field(default="", max_length=50)
+    description: Optional[str] = Field(None, max_length=200)
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LocationGet(BaseModel):
+    """Schema para retornar localização"""
+    id: int
+    warehouse: str
+    bin: str
+    description: Optional[str]
+
+    model_config = ConfigDict(from_attributes=True)
+
+# ========================================
+# FORECAST SCHEMAS
+# ========================================
+
+class StockForecastGet(BaseModel):
+    """Schema para retornar previsão de demanda e ponto de pedido sugerido"""
+    product_id: int
+    location_id: int
+    average_daily_demand: float
+    smoothed_daily_demand: float
+    demand_std: float
+    safety_stock: int
+    reorder_point: int
+    lookback_days: int
+    lead_time_days: int
+    computed_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+# ========================================
+# PURCHASE SUGGESTION SCHEMAS
+# ========================================
+
+class PurchaseSuggestionItem(BaseModel):
+    """Item a repor: nível abaixo do mínimo e quantidade até o máximo"""
+    product_id: int
+    product_name: Optional[str]
+    location_id: int
+    current_quantity: int
+    minimum_quantity: int
+    maximum_quantity: Optional[int]
+    suggested_quantity: int
+    unit_price: float
+    estimated_cost: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SupplierPurchaseSuggestion(BaseModel):
+    """Lista de reposição de um fornecedor (supplier_id None = produtos sem fornecedor)"""
+    supplier_id: Optional[int]
+    supplier_name: Optional[str]
+    item_count: int
+    total_quantity: int
+    estimated_cost: float
+    items: List[PurchaseSuggestionItem]
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, Field, field_validator, EmailStr
-from typing import Optional
+from typing import List, Optional
 
 class UserBase(BaseModel): # Modelo base para usuário
     occupation: str
@@ -76,3 +76,18 @@ class UserPatch(BaseModel): # Modelo para atualização parcial de usuários
     active: Optional[bool] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserListItem(BaseModel): # Modelo enxuto para listagem (sem senha)
+    id: int
+    name: Optional[str]
+    email: str
+    occupation: Optional[str]
+    admin: Optional[bool]
+    active: Optional[bool]
+
+    model_config = ConfigDict(from_attributes=True)
+
+class UserListPage(BaseModel): # Página da listagem com cursor
+    items: List[UserListItem]
+    next_cursor: Optional[int] = None
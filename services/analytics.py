@@ -0,0 +1,175 @@
+from datetime import datetime
+
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from models.models import Product, ProductStockTotal, StockMovement, StockMovementDaily, StockValueRollup
+from routes.dependencies import SessionLocal
+from services.archive import movements_select
+from services.jobs import JobContext, job_handler
+from services.order_reports import rebuild_order_rollups
+
+# services/analytics.py
+# Rollups para dashboards: valor do estoque por categoria/fornecedor e volume
+# de movimentações por dia. Atualizados na mesma transação de cada mudança de
+# estoque ou de produto; o job analytics_rebuild recalcula tudo do zero.
+
+DIMENSIONS = ("category", "supplier")
+
+
+def _add_value(session: Session, category_id, supplier_id, quantity: int, value: float):
+    for dimension, dimension_id in (("category", category_id), ("supplier", supplier_id)):
+        updated = session.execute(
+            update(StockValueRollup)
+            .where(
+                StockValueRollup.dimension == dimension,
+                StockValueRollup.dimension_id == (dimension_id or 0)
+            )
+            .values(
+                total_quantity=StockValueRollup.total_quantity + quantity,
+                total_value=StockValueRollup.total_value + value,
+                updated_at=datetime.now()
+            )
+        ).rowcount
+        if not updated:
+            session.add(StockValueRollup(dimension, dimension_id or 0, quantity, value))
+            session.flush()
+
+
+def record_stock_change(session: Session, product_id: int, delta: int):
+    """Quantidade total do produto mudou em delta (chamado por add_to_total)"""
+    product = session.get(Product, product_id)
+    if product is None:
+        return
+    _add_value(session, product.category_id, product.supplier_id, delta, delta * (product.price or 0))
+
+
+def record_product_change(session: Session, product: Product, old_price, old_category_id, old_supplier_id):
+    """
+    Preço, categoria ou fornecedor do produto mudou: move o valor do
+    estoque atual do grupo/preço antigo para o novo.
+    """
+    if (product.price, product.category_id, product.supplier_id) == (old_price, old_category_id, old_supplier_id):
+        return
+    quantity = session.scalar(
+        select(ProductStockTotal.total_quantity).where(ProductStockTotal.product_id == product.id)
+    )
+    if not quantity:
+        return
+    _add_value(session, old_category_id, old_supplier_id, -quantity, -quantity * (old_price or 0))
+    _add_value(session, product.category_id, product.supplier_id, quantity, quantity * (product.price or 0))
+
+
+def record_price_changes(session: Session, changes) -> float:
+    """
+    Vários preços mudaram de uma vez: changes = [(product_id, category_id,
+    supplier_id, old_price, new_price)]. Aplica um delta por par
+    categoria/fornecedor e retorna a variação total do valor do estoque.
+    """
+    quantities = {}
+    product_ids = [change[0] for change in changes]
+    for start in range(0, len(product_ids), 500):
+        chunk = product_ids[start:start + 500]
+        quantities.update(session.execute(
+            select(ProductStockTotal.product_id, ProductStockTotal.total_quantity)
+            .where(ProductStockTotal.product_id.in_(chunk))
+        ).all())
+
+    deltas = {}
+    for product_id, category_id, supplier_id, old_price, new_price in changes:
+        quantity = quantities.get(product_id) or 0
+        if quantity:
+            key = (category_id, supplier_id)
+            deltas[key] = deltas.get(key, 0) + quantity * ((new_price or 0) - (old_price or 0))
+
+    for (category_id, supplier_id), value in deltas.items():
+        _add_value(session, category_id, supplier_id, 0, value)
+    return sum(deltas.values())
+
+
+def record_movement(session: Session, movement: StockMovement, sign: int = 1):
+    """Soma (sign=1) ou remove (sign=-1) a movimentação do rollup diário"""
+    day = (movement.created_at or datetime.now()).date()
+    is_in = movement.movement_type == 'in'
+    values = {
+        "in_count": sign if is_in else 0,
+        "in_quantity": sign * movement.quantity if is_in else 0,
+        "out_count": 0 if is_in else sign,
+        "out_quantity": 0 if is_in else sign * movement.quantity,
+    }
+    updated = session.execute(
+        update(StockMovementDaily)
+        .where(StockMovementDaily.day == day)
+        .values(**{
+            name: getattr(StockMovementDaily, name) + value
+            for name, value in values.items()
+        })
+    ).rowcount
+    if not updated:
+        session.add(StockMovementDaily(day, **values))
+        session.flush()
+
+
+def rebuild_value_rollups(session: Session):
+    """Recalcula stock_value_rollups a partir de product_stock_totals e products"""
+    session.execute(delete(StockValueRollup))
+    for dimension, column in (("category", Product.category_id), ("supplier", Product.supplier_id)):
+        source = (
+            select(
+                literal(dimension),
+                func.coalesce(column, 0),
+                func.sum(ProductStockTotal.total_quantity),
+                func.sum(ProductStockTotal.total_quantity * Product.price),
+                literal(datetime.now())
+            )
+            .join(Product, Product.id == ProductStockTotal.product_id)
+            .group_by(func.coalesce(column, 0))
+        )
+        session.execute(
+            insert(StockValueRollup).from_select(
+                ["dimension", "dimension_id", "total_quantity", "total_value", "updated_at"], source
+            )
+        )
+
+
+def rebuild_daily_rollups(session: Session):
+    """Recalcula stock_movement_daily a partir do histórico completo (quente + arquivo)"""
+    movements = movements_select(session).subquery()
+    is_in = movements.c.movement_type == 'in'
+    day = func.date(movements.c.created_at)
+    source = (
+        select(
+            day,
+            func.sum(case((is_in, 1), else_=0)),
+            func.sum(case((is_in, movements.c.quantity), else_=0)),
+            func.sum(case((is_in, 0), else_=1)),
+            func.sum(case((is_in, 0), else_=movements.c.quantity))
+        )
+        .where(movements.c.created_at.is_not(None))
+        .group_by(day)
+    )
+    session.execute(delete(StockMovementDaily))
+    session.execute(
+        insert(StockMovementDaily).from_select(
+            ["day", "in_count", "in_quantity", "out_count", "out_quantity"], source
+        )
+    )
+
+
+@job_handler("analytics_rebuild")
+def run_rebuild(ctx: JobContext) -> dict:
+    """Recalcula todos os rollups em uma transação"""
+    session = SessionLocal()
+    try:
+        ctx.report_progress(0, 3, force=True)
+        rebuild_value_rollups(session)
+        rebuild_daily_rollups(session)
+        rebuild_order_rollups(session)
+        session.commit()
+        ctx.report_progress(3, force=True)
+        return {"rebuilt": ["stock_value_rollups", "stock_movement_daily", "order_daily_rollups"]}
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
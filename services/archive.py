@@ -0,0 +1,150 @@
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import case, delete, func, insert, literal, select, union_all, update
+from sqlalchemy.orm import Session
+
+from models.models import StockArchiveBalance, StockMovement, StockMovementArchive
+from routes.dependencies import SessionLocal
+from services.jobs import JobContext, job_handler
+
+# services/archive.py
+# Arquivamento de movimentações antigas: saem da tabela quente (stock_movements)
+# para stock_movements_archive, particionada logicamente por período (YYYY-MM).
+
+STOCK_ARCHIVE_AFTER_DAYS = int(os.getenv("STOCK_ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_CHUNK_SIZE = 1000
+
+MOVEMENT_COLUMNS = (
+    "id", "product_id", "location_id", "movement_type", "quantity", "reference_type", "user_id", "created_at"
+)
+
+
+def archive_watermark(session: Session) -> Optional[datetime]:
+    """Data até a qual as movimentações já foram arquivadas (None = nada arquivado)"""
+    return session.execute(select(func.max(StockArchiveBalance.archived_until))).scalar()
+
+
+def movements_select(
+    session: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    product_id: Optional[int] = None
+):
+    """
+    SELECT das movimentações no período [start, end).
+
+    Só faz UNION com o arquivo quando o período começa antes do watermark.
+    """
+    def columns_of(model):
+        stmt = select(*(getattr(model, name) for name in MOVEMENT_COLUMNS))
+        if start is not None:
+            stmt = stmt.where(model.created_at >= start)
+        if end is not None:
+            stmt = stmt.where(model.created_at < end)
+        if product_id is not None:
+            stmt = stmt.where(model.product_id == product_id)
+        return stmt
+
+    hot = columns_of(StockMovement)
+    watermark = archive_watermark(session)
+    if watermark is None or (start is not None and start >= watermark):
+        return hot.order_by(StockMovement.id)
+
+    movements = union_all(hot, columns_of(StockMovementArchive)).subquery()
+    return select(movements).order_by(movements.c.id)
+
+
+def archived_balances():
+    """Saldo arquivado por produto/localização, no mesmo formato de reconciliation.movement_balances"""
+    return select(
+        StockArchiveBalance.product_id.label("product_id"),
+        StockArchiveBalance.location_id.label("location_id"),
+        StockArchiveBalance.archived_net.label("expected")
+    )
+
+
+def _add_balances(session: Session, ids, cutoff: datetime):
+    """Acumula o saldo das movimentações arquivadas (ids) em stock_archive_balances"""
+    signed_quantity = case(
+        (StockMovement.movement_type == 'in', StockMovement.quantity),
+        else_=-StockMovement.quantity
+    )
+    rows = session.execute(
+        select(
+            StockMovement.product_id,
+            StockMovement.location_id,
+            func.sum(signed_quantity),
+            func.count(StockMovement.id)
+        )
+        .where(StockMovement.id.in_(ids))
+        .group_by(StockMovement.product_id, StockMovement.location_id)
+    ).all()
+
+    for product_id, location_id, net, count in rows:
+        updated = session.execute(
+            update(StockArchiveBalance)
+            .where(
+                StockArchiveBalance.product_id == product_id,
+                StockArchiveBalance.location_id == location_id
+            )
+            .values(
+                archived_net=StockArchiveBalance.archived_net + net,
+                archived_count=StockArchiveBalance.archived_count + count,
+                archived_until=func.max(func.coalesce(StockArchiveBalance.archived_until, cutoff), cutoff)
+            )
+        ).rowcount
+        if not updated:
+            session.add(StockArchiveBalance(product_id, location_id, net, count, cutoff))
+
+
+@job_handler("stock_archive")
+def run_archive(ctx: JobContext, older_than_days: int = STOCK_ARCHIVE_AFTER_DAYS) -> dict:
+    """
+    Move movimentações mais antigas que older_than_days para o arquivo.
+
+    Cada bloco (INSERT no arquivo + saldo + DELETE) é uma transação, então
+    reconciliação e saldos continuam corretos mesmo se o job for interrompido.
+    """
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    session = SessionLocal()
+    try:
+        total = session.execute(
+            select(func.count(StockMovement.id)).where(StockMovement.created_at < cutoff)
+        ).scalar()
+        ctx.report_progress(0, total, force=True)
+
+        archived = 0
+        while True:
+            ids = session.scalars(
+                select(StockMovement.id)
+                .where(StockMovement.created_at < cutoff)
+                .order_by(StockMovement.id)
+                .limit(ARCHIVE_CHUNK_SIZE)
+            ).all()
+            if not ids:
+                break
+
+            source = select(
+                *(getattr(StockMovement, name) for name in MOVEMENT_COLUMNS),
+                func.strftime('%Y-%m', StockMovement.created_at),
+                literal(datetime.now())
+            ).where(StockMovement.id.in_(ids))
+            session.execute(
+                insert(StockMovementArchive).from_select(MOVEMENT_COLUMNS + ("period", "archived_at"), source)
+            )
+            _add_balances(session, ids, cutoff)
+            session.execute(delete(StockMovement).where(StockMovement.id.in_(ids)))
+            session.commit()
+
+            archived += len(ids)
+            ctx.report_progress(archived)
+
+        ctx.report_progress(archived, force=True)
+        return {"cutoff": cutoff, "archived": archived}
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,44 @@
+import os
+from typing import Iterable, List
+
+from fastapi import HTTPException, status
+
+# services/batch.py
+# Leituras em lote por ids: uma consulta IN no lugar de N requests.
+
+MAX_BATCH_IDS = int(os.getenv("MAX_BATCH_IDS", "500"))
+
+
+def parse_ids(raw: str) -> List[int]:
+    """Converte '1,2,3' em [1, 2, 3] (sem repetições, na ordem recebida)"""
+    try:
+        ids = list(dict.fromkeys(int(value) for value in raw.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of integers"
+        )
+    return check_ids(ids)
+
+
+def check_ids(ids: Iterable[int]) -> List[int]:
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one id is required"
+        )
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many ids (max {MAX_BATCH_IDS})"
+        )
+    return ids
+
+
+def keyed(ids: List[int], found: dict) -> dict:
+    """Monta {items: {id: item}, missing: [ids não encontrados]} na ordem pedida"""
+    return {
+        "items": {id_: found[id_] for id_ in ids if id_ in found},
+        "missing": [id_ for id_ in ids if id_ not in found],
+    }
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from typing import Any, Hashable, Iterable, Optional
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from models.models import CacheVersion
+
+# services/cache.py
+# Cache em memória de resultados de consultas, invalidado quando as tabelas
+# de que dependem recebem um commit (em qualquer sessão deste processo).
+#
+# Escritas de outros processos (workers, jobs) não passam pelos contadores
+# deste: caches com shared=True também comparam a geração das tabelas em
+# cache_versions, incrementada no mesmo commit que altera a tabela. A leitura
+# é uma busca pela chave primária, não uma varredura das tabelas.
+
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "300"))
+
+# tabela -> contador incrementado a cada commit que a altera
+_generations: dict = {}
+_lock = threading.Lock()
+
+# Tabelas com geração em cache_versions. Fixo (não depende de quais caches
+# cada processo importou): jobs e scripts também precisam incrementar
+SHARED_CACHE_TABLES = frozenset({"stock_levels", "products", "suppliers"})
+
+
+def table_generation(tables: Iterable[str]) -> tuple:
+    return tuple(_generations.get(table, 0) for table in tables)
+
+
+def invalidate_tables(tables: Iterable[str]):
+    """Invalida todos os caches que dependem destas tabelas"""
+    with _lock:
+        for table in tables:
+            _generations[table] = _generations.get(table, 0) + 1
+
+
+def _mark(session: Session, table_name: str):
+    session.info.setdefault("changed_tables", set()).add(table_name)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_flush(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            _mark(session, table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk(orm_execute_state):
+    # update(StockLevel), insert(...) executemany etc. não passam pelo flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _mark(orm_execute_state.session, table.name)
+
+
+def shared_generation(session: Session, tables: Iterable[str]) -> tuple:
+    """Gerações das tabelas em cache_versions (0 para as que ainda não têm linha)"""
+    tables = tuple(tables)
+    rows = dict(session.execute(
+        select(CacheVersion.name, CacheVersion.generation).where(CacheVersion.name.in_(tables))
+    ).all())
+    return tuple(rows.get(table, 0) for table in tables)
+
+
+def _bump_shared(session: Session, tables: set):
+    bumped = session.execute(
+        update(CacheVersion)
+        .where(CacheVersion.name.in_(tables))
+        .values(generation=CacheVersion.generation + 1)
+        .returning(CacheVersion.name)
+    ).scalars().all()
+    missing = tables.difference(bumped)
+    if missing:
+        session.execute(insert(CacheVersion), [{"name": name, "generation": 1} for name in sorted(missing)])
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_on_commit(session):
+    # Mesma transação da escrita: ou as duas valem, ou nenhuma. O flush final
+    # do commit ainda não rodou, por isso as tabelas pendentes são marcadas aqui
+    session.flush()
+    shared = session.info.get("changed_tables", set()) & SHARED_CACHE_TABLES
+    if shared:
+        _bump_shared(session, shared)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    changed = session.info.pop("changed_tables", None)
+    if changed:
+        invalidate_tables(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("changed_tables", None)
+
+
+class QueryCache:
+    """
+    Resultados por chave, válidos enquanto nenhuma das tabelas mudar
+    e o TTL não vencer.
+
+        cache = QueryCache(("stock_levels", "products"))
+        value = cache.get(key)
+        if value is None:
+            generation = cache.generation()
+            value = cache.set(key, compute(), generation)
+
+    Com shared=True, a generation é lida com a sessão e repassada ao get;
+    assim a entrada também é invalidada por escritas de outros processos,
+    ao custo de uma busca em cache_versions por leitura:
+
+        generation = cache.generation(session)
+        value = cache.get(key, generation=generation)
+    """
+
+    def __init__(
+        self,
+        tables: Iterable[str],
+        ttl: float = QUERY_CACHE_TTL_SECONDS,
+        max_entries: int = 256,
+        shared: bool = False
+    ):
+        self.tables = tuple(tables)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self._entries: dict = {}
+        if shared and not SHARED_CACHE_TABLES.issuperset(self.tables):
+            raise ValueError(f"Tables without shared generation: {sorted(set(self.tables) - SHARED_CACHE_TABLES)}")
+
+    def get(self, key: Hashable, generation: Optional[tuple] = None) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored, expires_at, value = entry
+        if generation is None:
+            generation = self.generation()
+        if stored != generation or expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[tuple] = None) -> Any:
+        """
+        Guarda o valor. Passe a generation lida ANTES de consultar o banco:
+        se algo mudou durante a consulta, a entrada já nasce inválida.
+        """
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        if generation is None:
+            generation = self.generation()
+        self._entries[key] = (generation, time.monotonic() + self.ttl, value)
+        return value
+
+    def generation(self, session: Optional[Session] = None) -> tuple:
+        generation = table_generation(self.tables)
+        if self.shared and session is not None:
+            generation += shared_generation(session, self.tables)
+        return generation
+
+    def clear(self):
+        self._entries.clear()
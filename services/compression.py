@@ -0,0 +1,81 @@
+import brotli as brotli_lib
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# services/compression.py
+# Compressão das respostas: brotli para quem aceita br, senão gzip.
+# Os dois responders herdam o IdentityResponder do Starlette, que decide no
+# http.response.start: respostas com Content-Encoding definido, parciais (206)
+# ou de tipos já comprimidos (exports .gz) passam intactas; o resto vai para
+# apply_compression. O brotli usa só a API pública do pacote brotli.
+
+ALREADY_COMPRESSED_TYPES = DEFAULT_EXCLUDED_CONTENT_TYPES
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        quality: int = 4,
+        *,
+        exclude_content_types: tuple[str, ...] = ALREADY_COMPRESSED_TYPES
+    ):
+        super().__init__(app, minimum_size, exclude_content_types=exclude_content_types)
+        self.quality = quality
+        self.compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self.compressor is None:
+            self.compressor = brotli_lib.Compressor(mode=brotli_lib.MODE_TEXT, quality=self.quality, lgwin=22)
+        compressed = self.compressor.process(body)
+        # Em streaming, flush a cada pedaço para o cliente receber o que já foi gerado
+        return compressed + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware:
+    """
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, brotli=True)
+
+    Com brotli=False, só gzip. Respostas menores que minimum_size vão sem
+    compressão.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        brotli: bool = True,
+        brotli_quality: int = 4,
+        gzip_level: int = 6
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.brotli = brotli
+        self.brotli_quality = brotli_quality
+        self.gzip_level = gzip_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+        if self.brotli and "br" in accept_encoding:
+            responder = BrotliResponder(
+                self.app,
+                self.minimum_size,
+                self.brotli_quality,
+                exclude_content_types=ALREADY_COMPRESSED_TYPES
+            )
+        elif "gzip" in accept_encoding:
+            responder = GZipResponder(
+                self.app,
+                self.minimum_size,
+                self.gzip_level,
+                exclude_content_types=ALREADY_COMPRESSED_TYPES
+            )
+        else:
+            responder = self.app
+        await responder(scope, receive, send)
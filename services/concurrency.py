@@ -0,0 +1,52 @@
+from typing import Optional
+
+from fastapi import Header, HTTPException, Response, status
+
+# services/concurrency.py
+# Controle de concorrência otimista: products, stock_levels e orders têm a
+# coluna version (version_id_col do SQLAlchemy). Todo UPDATE do ORM leva
+# "WHERE version = <lida>" e incrementa a versão; se outra escrita passou
+# antes, o flush levanta StaleDataError (tratado em main.py como 409).
+#
+# O cliente envia a versão que leu em If-Match (ETag das respostas ou o campo
+# version) e recebe 409 se ela já mudou, sem lock de tabela.
+
+
+def version_etag(version: int) -> str:
+    # Fraco: o corpo pode variar (fields, compressão) para a mesma versão
+    return f'W/"{version}"'
+
+
+def if_match_version(if_match: Optional[str] = Header(None, description='Versão esperada: 3, "3" ou W/"3"')) -> Optional[int]:
+    """
+    Dependência que lê a versão esperada do header If-Match.
+
+    Sem header (ou com *) devolve None: a alteração não compara a versão
+    enviada, mas continua protegida contra escritas concorrentes pelo
+    version_id_col.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="If-Match must be a version number or an ETag returned by the API"
+        )
+
+
+def check_version(obj, expected: Optional[int]):
+    """409 se o registro não está mais na versão que o cliente leu"""
+    if expected is not None and obj.version != expected:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Version conflict: expected version {expected}, current version is {obj.version}"
+        )
+
+
+def set_etag(response: Response, obj):
+    response.headers["ETag"] = version_etag(obj.version)
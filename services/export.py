@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from routes.dependencies import ReadSessionLocal
+
+# services/export.py
+# Exportação em streaming (CSV/NDJSON) sem materializar a tabela em memória.
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+YIELD_PER = 1000
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode_rows(rows, columns, fmt):
+    """Serializa um lote de linhas no formato pedido"""
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        writer.writerows(rows)
+    else:
+        for row in rows:
+            buffer.write(json.dumps(dict(zip(columns, row)), default=_json_default))
+            buffer.write("\n")
+    return buffer.getvalue().encode("utf-8")
+
+
+def _iter_export(stmt, columns, fmt, compress):
+    """
+    Gera o arquivo em blocos a partir de um cursor no servidor (yield_per).
+
+    Abre sessão própria: a sessão do request é fechada antes do streaming terminar.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+
+    def emit(chunk: bytes):
+        return compressor.compress(chunk) if compressor else chunk
+
+    session = ReadSessionLocal()
+    try:
+        if fmt == "csv":
+            header = io.StringIO()
+            csv.writer(header).writerow(columns)
+            yield emit(header.getvalue().encode("utf-8"))
+
+        result = session.execute(stmt.execution_options(yield_per=YIELD_PER))
+        for rows in result.partitions():
+            chunk = emit(_encode_rows(rows, columns, fmt))
+            if chunk:
+                yield chunk
+
+        if compressor:
+            yield compressor.flush()
+    finally:
+        session.close()
+
+
+def export_response(stmt, filename: str, fmt: str = "csv", compress: bool = False) -> StreamingResponse:
+    """Monta o StreamingResponse para um SELECT de colunas"""
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Use: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    media_type, extension = EXPORT_FORMATS[fmt]
+    filename = f"{filename}.{extension}"
+    if compress:
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    columns = [column.name for column in stmt.selected_columns]
+    return StreamingResponse(
+        _iter_export(stmt, columns, fmt, compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
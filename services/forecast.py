@@ -0,0 +1,177 @@
+import math
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import bindparam, delete, func, insert, select, update
+
+from models.models import StockForecast, StockLevel
+from routes.dependencies import SessionLocal
+from services.archive import movements_select
+from services.jobs import JobContext, job_handler
+
+# services/forecast.py
+# Previsão de demanda e ponto de pedido calculados para o catálogo inteiro
+# de uma vez: uma consulta agregada + operações vetorizadas no NumPy.
+
+FORECAST_LOOKBACK_DAYS = int(os.getenv("FORECAST_LOOKBACK_DAYS", "90"))
+FORECAST_LEAD_TIME_DAYS = int(os.getenv("FORECAST_LEAD_TIME_DAYS", "7"))
+FORECAST_SERVICE_Z = float(os.getenv("FORECAST_SERVICE_Z", "1.65"))  # ~95% de nível de serviço
+FORECAST_ALPHA = float(os.getenv("FORECAST_ALPHA", "0.3"))
+WRITE_CHUNK_SIZE = 1000
+
+
+def _as_date(value) -> date:
+    # SQLite devolve DATE() como texto 'YYYY-MM-DD'
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _demand_matrix(session, start: date, lookback_days: int):
+    """
+    Monta a matriz de demanda diária (níveis x dias) a partir das saídas.
+
+    Transferências entre localizações não contam como demanda.
+    """
+    movements = movements_select(session, datetime.combine(start, datetime.min.time())).subquery()
+    day = func.date(movements.c.created_at)
+    rows = session.execute(
+        select(
+            movements.c.product_id,
+            movements.c.location_id,
+            day,
+            func.sum(movements.c.quantity)
+        )
+        .where(
+            movements.c.movement_type == 'out',
+            movements.c.reference_type.is_distinct_from('transfer')
+        )
+        .group_by(movements.c.product_id, movements.c.location_id, day)
+    ).all()
+
+    # Todo nível recebe previsão, mesmo sem saídas no período
+    levels = session.execute(
+        select(StockLevel.id, StockLevel.product_id, StockLevel.location_id)
+        .order_by(StockLevel.product_id, StockLevel.location_id)
+    ).all()
+    keys = [(row.product_id, row.location_id) for row in levels]
+    level_ids = [row.id for row in levels]
+    index = {key: position for position, key in enumerate(keys)}
+    for product_id, location_id, _, _ in rows:
+        if (product_id, location_id) not in index:
+            index[(product_id, location_id)] = len(keys)
+            keys.append((product_id, location_id))
+            level_ids.append(None)
+
+    demand = np.zeros((len(keys), lookback_days), dtype=np.float64)
+    if rows:
+        row_idx = np.fromiter((index[(r[0], r[1])] for r in rows), dtype=np.int64, count=len(rows))
+        day_idx = np.fromiter(((_as_date(r[2]) - start).days for r in rows), dtype=np.int64, count=len(rows))
+        quantity = np.fromiter((r[3] for r in rows), dtype=np.float64, count=len(rows))
+        valid = (day_idx >= 0) & (day_idx < lookback_days)
+        np.add.at(demand, (row_idx[valid], day_idx[valid]), quantity[valid])
+
+    return keys, level_ids, demand
+
+
+def compute_reorder_points(demand: np.ndarray, lead_time_days: int, alpha: float, service_z: float):
+    """
+    Calcula, para cada linha da matriz de demanda diária:
+    - média móvel da janela
+    - suavização exponencial simples (pesos alpha * (1 - alpha)^k, como produto matricial)
+    - desvio padrão, estoque de segurança e ponto de pedido
+    """
+    days = demand.shape[1]
+    average = demand.mean(axis=1)
+    std = demand.std(axis=1, ddof=1) if days > 1 else np.zeros(demand.shape[0])
+
+    # s_t = alpha * d_t + (1 - alpha) * s_{t-1}, com s_0 = d_0, expandido em pesos
+    weights = alpha * (1 - alpha) ** np.arange(days - 1, -1, -1, dtype=np.float64)
+    weights[0] = (1 - alpha) ** (days - 1)
+    smoothed = demand @ weights
+
+    safety_stock = np.ceil(service_z * std * math.sqrt(lead_time_days))
+    reorder_point = np.ceil(smoothed * lead_time_days + safety_stock)
+    return average, smoothed, std, safety_stock.astype(np.int64), reorder_point.astype(np.int64)
+
+
+@job_handler("stock_forecast")
+def run_forecast(
+    ctx: JobContext,
+    lookback_days: int = FORECAST_LOOKBACK_DAYS,
+    lead_time_days: int = FORECAST_LEAD_TIME_DAYS,
+    service_z: float = FORECAST_SERVICE_Z,
+    alpha: float = FORECAST_ALPHA,
+    apply: bool = False
+) -> dict:
+    """
+    Recalcula stock_forecasts para todos os níveis de estoque.
+
+    Com apply=True, grava o ponto de pedido sugerido em StockLevel.minimum_quantity,
+    o que passa a valer para /stock/alerts.
+    """
+    start = date.today() - timedelta(days=lookback_days)
+    session = SessionLocal()
+    try:
+        keys, level_ids, demand = _demand_matrix(session, start, lookback_days)
+        ctx.report_progress(0, len(keys), force=True)
+        average, smoothed, std, safety_stock, reorder_point = compute_reorder_points(
+            demand, lead_time_days, alpha, service_z
+        )
+
+        computed_at = datetime.now()
+        # minimum_quantity gravado direto na tabela, incrementando version
+        levels = StockLevel.__table__
+        apply_stmt = (
+            update(levels)
+            .where(levels.c.id == bindparam("level_id"))
+            .values(minimum_quantity=bindparam("reorder_point"), version=levels.c.version + 1)
+        )
+        session.execute(delete(StockForecast))
+        written = 0
+        for start_at in range(0, len(keys), WRITE_CHUNK_SIZE):
+            chunk = range(start_at, min(start_at + WRITE_CHUNK_SIZE, len(keys)))
+            session.execute(
+                insert(StockForecast),
+                [
+                    {
+                        "product_id": keys[i][0],
+                        "location_id": keys[i][1],
+                        "average_daily_demand": float(average[i]),
+                        "smoothed_daily_demand": float(smoothed[i]),
+                        "demand_std": float(std[i]),
+                        "safety_stock": int(safety_stock[i]),
+                        "reorder_point": int(reorder_point[i]),
+                        "lookback_days": lookback_days,
+                        "lead_time_days": lead_time_days,
+                        "computed_at": computed_at,
+                    }
+                    for i in chunk
+                ]
+            )
+            if apply:
+                updates = [
+                    {"level_id": level_ids[i], "reorder_point": int(reorder_point[i])}
+                    for i in chunk if level_ids[i] is not None
+                ]
+                if updates:
+                    session.execute(apply_stmt, updates)
+            written += len(chunk)
+
+        # Uma transação só: a tabela nunca fica com a previsão pela metade.
+        # O progresso é gravado depois do commit (usa outra sessão de escrita).
+        session.commit()
+        ctx.report_progress(written, force=True)
+        return {
+            "lookback_days": lookback_days,
+            "lead_time_days": lead_time_days,
+            "service_z": service_z,
+            "alpha": alpha,
+            "applied": apply,
+            "forecasts": written,
+            "computed_at": computed_at,
+        }
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+
+from routes.dependencies import SessionLocal
+from schemas.stock_schema import StockMovementCreate, StockMovementGet
+from services.idempotency import IdempotentRequest
+from services.stock import apply_stock_movement
+
+# services/group_commit.py
+# Group commit de movimentações: requisições que chegam dentro de uma janela
+# de poucos milissegundos são gravadas por um único writer numa só transação
+# (um fsync por lote em vez de um por requisição).
+
+logger = logging.getLogger(__name__)
+
+STOCK_GROUP_COMMIT = os.getenv("STOCK_GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+GROUP_COMMIT_WINDOW_MS = float(os.getenv("STOCK_GROUP_COMMIT_WINDOW_MS", "5"))
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("STOCK_GROUP_COMMIT_MAX_BATCH", "200"))
+
+
+class _PendingMovement:
+    def __init__(self, data: StockMovementCreate, user_id: int, idempotency: Optional[IdempotentRequest], future):
+        self.data = data
+        self.user_id = user_id
+        self.idempotency = idempotency
+        self.future = future
+
+
+class MovementWriter:
+    def __init__(
+        self,
+        enabled: bool = STOCK_GROUP_COMMIT,
+        window_ms: float = GROUP_COMMIT_WINDOW_MS,
+        max_batch: int = GROUP_COMMIT_MAX_BATCH
+    ):
+        self.enabled = enabled
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if not self.enabled:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # Falha quem ainda estava esperando na fila
+        while self._queue and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if not item.future.done():
+                item.future.set_exception(HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server shutting down, retry the request"
+                ))
+
+    async def submit(
+        self,
+        data: StockMovementCreate,
+        user_id: int,
+        idempotency: Optional[IdempotentRequest] = None
+    ) -> StockMovementGet:
+        """Enfileira a movimentação e aguarda o commit do lote em que ela entrou"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingMovement(data, user_id, idempotency, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+
+            # Junta o que chegar dentro da janela (ou até encher o lote)
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = await asyncio.to_thread(self._write_batch, batch)
+            except Exception as exc:
+                logger.exception("Group commit batch failed")
+                results = [exc] * len(batch)
+
+            for item, result in zip(batch, results):
+                if item.future.done():
+                    continue
+                if isinstance(result, Exception):
+                    item.future.set_exception(result)
+                else:
+                    item.future.set_result(result)
+
+    def _apply(self, session, item: _PendingMovement, written: dict):
+        """Aplica uma movimentação na sessão do lote; retorna a resposta ou a exceção"""
+        key = item.idempotency.key if item.idempotency else None
+
+        # Mesma Idempotency-Key repetida dentro do lote: reaproveita a resposta
+        if key and (key, item.user_id) in written:
+            first_item, body = written[(key, item.user_id)]
+            if first_item.idempotency.fingerprint != item.idempotency.fingerprint:
+                return HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key already used with a different request"
+                )
+            return body
+
+        try:
+            movement = apply_stock_movement(session, item.data, item.user_id)
+        except HTTPException as exc:
+            return exc
+
+        body = StockMovementGet.model_validate(movement)
+        if item.idempotency:
+            item.idempotency.save(status.HTTP_201_CREATED, body, session=session)
+            if key:
+                written[(key, item.user_id)] = (item, body)
+        return body
+
+    def _write_batch(self, batch: List[_PendingMovement]) -> list:
+        """Grava o lote numa transação; se o commit falhar, grava item a item"""
+        # Leituras e escritas do lote na conexão de escrita: o writer não
+        # disputa o pool de leitura com os requests
+        session = SessionLocal(info={"writing": True})
+        try:
+            written = {}
+            results = [self._apply(session, item, written) for item in batch]
+            session.commit()
+            return results
+        except Exception:
+            session.rollback()
+            if len(batch) == 1:
+                raise
+        finally:
+            session.close()
+
+        # Fallback: isola o item problemático sem derrubar os demais
+        results = []
+        for item in batch:
+            try:
+                results.append(self._write_batch([item]))
+            except IntegrityError as exc:
+                # Retry concorrente já gravou esta Idempotency-Key: devolve a resposta original
+                replay = item.idempotency.lookup() if item.idempotency and item.idempotency.key else None
+                results.append(replay or exc)
+            except Exception as exc:
+                results.append(exc)
+        return [result[0] if isinstance(result, list) else result for result in results]
+
+
+movement_writer = MovementWriter()
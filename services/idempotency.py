@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.models import IdempotencyKey, User
+from routes.dependencies import session_dependencies, verify_token
+
+# services/idempotency.py
+# Suporte ao header Idempotency-Key: repetições devolvem a resposta gravada
+# sem executar a transação de novo.
+
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+CLEANUP_INTERVAL = 600  # segundos entre limpezas de chaves expiradas
+MAX_KEY_LENGTH = 64
+
+_last_cleanup = 0.0
+
+
+def _cleanup_expired(session: Session):
+    """Remove chaves expiradas, no máximo uma vez a cada CLEANUP_INTERVAL"""
+    global _last_cleanup
+    now = time.monotonic()
+    if now - _last_cleanup < CLEANUP_INTERVAL:
+        return
+    _last_cleanup = now
+    cutoff = datetime.now() - timedelta(hours=IDEMPOTENCY_TTL_HOURS)
+    session.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff))
+
+
+class IdempotentRequest:
+    """
+    Controle de idempotência de um request.
+
+    Sem header Idempotency-Key, todos os métodos são transparentes.
+    """
+
+    def __init__(self, session: Session, key: Optional[str], user_id: int, scope: str):
+        self.session = session
+        self.key = key
+        self.user_id = user_id
+        self.scope = scope
+        self.fingerprint = None
+        self.expired = False
+
+    def replay(self, payload: BaseModel) -> Optional[JSONResponse]:
+        """Retorna a resposta gravada se a chave já foi usada"""
+        if not self.key:
+            return None
+        self.fingerprint = hashlib.sha256(payload.model_dump_json().encode("utf-8")).hexdigest()
+        return self.lookup()
+
+    def lookup(self) -> Optional[JSONResponse]:
+        record = self.session.get(IdempotencyKey, (self.key, self.user_id))
+        if not record:
+            return None
+
+        # Chave expirada: executa normalmente; o registro antigo é trocado em save()
+        if record.created_at < datetime.now() - timedelta(hours=IDEMPOTENCY_TTL_HOURS):
+            self.expired = True
+            return None
+
+        if record.scope != self.scope or record.request_hash != self.fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key already used with a different request"
+            )
+
+        return JSONResponse(
+            status_code=record.status_code,
+            content=json.loads(record.response_body),
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    def save(self, status_code: int, body: BaseModel, session: Optional[Session] = None):
+        """
+        Grava a resposta na mesma transação da operação.
+
+        session permite gravar numa transação de outro contexto (ex.: group commit).
+        """
+        if not self.key:
+            return
+        session = session or self.session
+        if self.expired:
+            session.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.key == self.key,
+                IdempotencyKey.user_id == self.user_id
+            ))
+        session.add(IdempotencyKey(
+            key=self.key,
+            user_id=self.user_id,
+            scope=self.scope,
+            request_hash=self.fingerprint,
+            status_code=status_code,
+            response_body=body.model_dump_json()
+        ))
+        _cleanup_expired(session)
+
+    def commit(self) -> Optional[JSONResponse]:
+        """
+        Faz o commit. Se outra requisição com a mesma chave gravou primeiro
+        (retry concorrente), desfaz esta e devolve a resposta da primeira.
+        """
+        try:
+            self.session.commit()
+        except IntegrityError:
+            self.session.rollback()
+            if not self.key:
+                raise
+            replay = self.lookup()
+            if replay is None:
+                raise
+            return replay
+        return None
+
+
+class Idempotency:
+    """Dependência: Depends(Idempotency('POST /stock/movements'))"""
+
+    def __init__(self, scope: str):
+        self.scope = scope
+
+    def __call__(
+        self,
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+        session: Session = Depends(session_dependencies),
+        current_user: User = Depends(verify_token)
+    ) -> IdempotentRequest:
+        if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Idempotency-Key must have between 1 and {MAX_KEY_LENGTH} characters"
+            )
+        return IdempotentRequest(session, idempotency_key, current_user.id, self.scope)
@@ -0,0 +1,260 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import func, update
+
+from models.models import Job
+from routes.dependencies import SessionLocal
+
+# services/jobs.py
+# Fila de jobs persistida no SQLite (tabela jobs) e executada por um pool de threads.
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+PROGRESS_INTERVAL = 0.5  # segundos entre gravações de progresso
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "10"))  # segundos
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "60"))  # sem heartbeat por este tempo = processo morto
+
+# Identifica este processo nos jobs que ele executa (vários workers do uvicorn
+# compartilham a tabela jobs; cada um só responde pelos próprios)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# kind -> função(ctx, **params)
+_handlers: dict = {}
+
+
+class JobCancelled(Exception):
+    """Levantada dentro do handler quando o cancelamento foi solicitado"""
+
+
+def job_handler(kind: str):
+    """Registra uma função como handler de um tipo de job"""
+    def decorator(func: Callable):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value) -> Optional[str]:
+    return json.dumps(value, default=_json_default) if value is not None else None
+
+
+class JobContext:
+    """Passado ao handler para reportar progresso e checar cancelamento"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._last_report = 0.0
+
+    def _save(self, **fields):
+        session = SessionLocal()
+        try:
+            session.execute(update(Job).where(Job.id == self.job_id).values(**fields))
+            session.commit()
+        finally:
+            session.close()
+
+    def _finish(self, **fields) -> bool:
+        """
+        Grava o estado final só se o job ainda está running neste processo.
+        Um job já recolhido por fail_stale_jobs (heartbeat perdido) não volta
+        a ser completed: o registro do que aconteceu primeiro prevalece.
+        """
+        session = SessionLocal()
+        try:
+            finished = session.execute(
+                update(Job)
+                .where(Job.id == self.job_id, Job.status == "running", Job.worker_id == WORKER_ID)
+                .values(**fields)
+            ).rowcount
+            session.commit()
+        finally:
+            session.close()
+        if not finished:
+            logger.warning(
+                "Job %s finished as %s but is no longer running on this worker; final state not saved",
+                self.job_id, fields.get("status")
+            )
+        return bool(finished)
+
+    def is_cancelled(self) -> bool:
+        session = SessionLocal()
+        try:
+            job = session.get(Job, self.job_id)
+            return bool(job and job.cancel_requested)
+        finally:
+            session.close()
+
+    def report_progress(self, done: int, total: Optional[int] = None, force: bool = False):
+        """
+        Grava o progresso (no máximo a cada PROGRESS_INTERVAL) e
+        levanta JobCancelled se o job foi cancelado.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_report < PROGRESS_INTERVAL:
+            return
+        self._last_report = now
+
+        fields = {"progress": done}
+        if total is not None:
+            fields["total"] = total
+        self._save(**fields)
+
+        if self.is_cancelled():
+            raise JobCancelled()
+
+
+class JobQueue:
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Inicia o pool e retoma jobs pendentes de execuções anteriores"""
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+
+        self.fail_stale_jobs()
+        session = SessionLocal()
+        try:
+            pending = session.query(Job.id).filter(Job.status == "pending").order_by(Job.created_at).all()
+        finally:
+            session.close()
+
+        for (job_id,) in pending:
+            self._executor.submit(self._run, job_id)
+
+        self._stopping.clear()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def shutdown(self):
+        self._stopping.set()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def fail_stale_jobs(self) -> int:
+        """
+        Marca como falhos os jobs running cujo processo parou de mandar
+        heartbeat (caiu ou foi reiniciado). Jobs de outros workers vivos
+        continuam intactos.
+        """
+        cutoff = datetime.now() - timedelta(seconds=JOB_STALE_AFTER)
+        session = SessionLocal()
+        try:
+            failed = session.execute(
+                update(Job)
+                .where(
+                    Job.status == "running",
+                    # Jobs sem heartbeat (anteriores ao campo) usam o início da execução
+                    func.coalesce(Job.heartbeat_at, Job.started_at) < cutoff
+                )
+                .values(status="failed", error="Interrupted: worker stopped responding", finished_at=datetime.now())
+            ).rowcount
+            session.commit()
+            return failed
+        finally:
+            session.close()
+
+    def _heartbeat_loop(self):
+        # Mantém vivos os jobs deste processo e recolhe os de processos mortos
+        while not self._stopping.wait(JOB_HEARTBEAT_INTERVAL):
+            try:
+                session = SessionLocal()
+                try:
+                    session.execute(
+                        update(Job)
+                        .where(Job.status == "running", Job.worker_id == WORKER_ID)
+                        .values(heartbeat_at=datetime.now())
+                    )
+                    session.commit()
+                finally:
+                    session.close()
+                self.fail_stale_jobs()
+            except Exception:
+                logger.exception("Job heartbeat failed")
+
+    def enqueue(self, kind: str, params: Optional[dict] = None, user_id: Optional[int] = None) -> Job:
+        """Persiste o job e o envia para o pool"""
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        session = SessionLocal()
+        try:
+            job = Job(id=uuid.uuid4().hex, kind=kind, params=_dumps(params or {}), user_id=user_id)
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+            session.expunge(job)
+        finally:
+            session.close()
+
+        if self._executor:
+            self._executor.submit(self._run, job.id)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Solicita cancelamento; jobs ainda pendentes são cancelados na hora"""
+        session = SessionLocal()
+        try:
+            job = session.get(Job, job_id)
+            if not job:
+                return None
+            if job.status == "pending":
+                job.status = "cancelled"
+                job.finished_at = datetime.now()
+            if job.status in ("pending", "running", "cancelled"):
+                job.cancel_requested = True
+            session.commit()
+            session.refresh(job)
+            session.expunge(job)
+            return job
+        finally:
+            session.close()
+
+    def _run(self, job_id: str):
+        session = SessionLocal()
+        try:
+            # Marca como running apenas se ainda estiver pendente (pode ter sido cancelado)
+            claimed = session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "pending")
+                .values(status="running", started_at=datetime.now(), worker_id=WORKER_ID, heartbeat_at=datetime.now())
+            ).rowcount
+            session.commit()
+            if not claimed:
+                return
+            job = session.get(Job, job_id)
+            kind, params = job.kind, json.loads(job.params or "{}")
+        finally:
+            session.close()
+
+        ctx = JobContext(job_id)
+        try:
+            result = _handlers[kind](ctx, **params)
+            ctx._finish(status="completed", result=_dumps(result), finished_at=datetime.now())
+        except JobCancelled:
+            ctx._finish(status="cancelled", finished_at=datetime.now())
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job_id, kind)
+            ctx._finish(status="failed", error=str(exc), finished_at=datetime.now())
+
+
+job_queue = JobQueue()
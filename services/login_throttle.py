@@ -0,0 +1,199 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import delete, select
+
+from models.models import LoginFailure
+from routes.dependencies import SessionLocal
+
+# services/login_throttle.py
+# Proteção contra força bruta no login: janela deslizante de falhas por
+# email e por IP. Tentativas bloqueadas são recusadas com 429 antes de
+# consultar o usuário e antes do bcrypt (o custo de CPU do login).
+#
+# Backend "memory" (padrão) vale por processo; "database" grava as falhas
+# em login_failures e é compartilhado entre workers e reinícios. Só o backend
+# memory guarda os bloqueios já conhecidos num atalho em memória: no database
+# cada check consulta o banco, senão um login bem-sucedido em outro worker
+# não liberaria o email neste.
+
+LOGIN_THROTTLE_BACKEND = os.getenv("LOGIN_THROTTLE_BACKEND", "memory").lower()  # memory, database ou off
+LOGIN_FAILURE_WINDOW = int(os.getenv("LOGIN_FAILURE_WINDOW", "900"))  # segundos
+LOGIN_MAX_FAILURES_PER_EMAIL = int(os.getenv("LOGIN_MAX_FAILURES_PER_EMAIL", "5"))
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "50"))
+MAX_TRACKED_KEYS = 100000  # acima disso, chaves sem falhas na janela são descartadas
+
+
+class MemoryFailureStore:
+    """Falhas recentes por chave em memória (deque de instantes, em ordem)"""
+
+    shared = False
+
+    def __init__(self):
+        self._failures: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, now: float, window: int) -> List[float]:
+        with self._lock:
+            if key not in self._failures and len(self._failures) >= MAX_TRACKED_KEYS:
+                self._prune(now - window)
+            failures = self._failures.setdefault(key, deque())
+            failures.append(now)
+            return self._recent(failures, now - window)
+
+    def recent(self, key: str, now: float, window: int) -> List[float]:
+        with self._lock:
+            failures = self._failures.get(key)
+            return self._recent(failures, now - window) if failures else []
+
+    def clear(self, key: str):
+        with self._lock:
+            self._failures.pop(key, None)
+
+    @staticmethod
+    def _recent(failures: deque, since: float) -> List[float]:
+        while failures and failures[0] <= since:
+            failures.popleft()
+        return list(failures)
+
+    def _prune(self, since: float):
+        for key in [key for key, failures in self._failures.items() if not failures or failures[-1] <= since]:
+            del self._failures[key]
+
+
+class DatabaseFailureStore:
+    """Falhas em login_failures, compartilhadas entre processos"""
+
+    shared = True
+
+    def add(self, key: str, now: float, window: int) -> List[float]:
+        session = SessionLocal()
+        try:
+            session.add(LoginFailure(key, datetime.fromtimestamp(now)))
+            # Limpa as falhas vencidas da própria chave junto com a gravação
+            session.execute(delete(LoginFailure).where(
+                LoginFailure.key == key,
+                LoginFailure.failed_at <= datetime.fromtimestamp(now - window)
+            ))
+            session.commit()
+            return self._recent(session, key, now - window)
+        finally:
+            session.close()
+
+    def recent(self, key: str, now: float, window: int) -> List[float]:
+        session = SessionLocal()
+        try:
+            return self._recent(session, key, now - window)
+        finally:
+            session.close()
+
+    def clear(self, key: str):
+        session = SessionLocal()
+        try:
+            session.execute(delete(LoginFailure).where(LoginFailure.key == key))
+            session.commit()
+        finally:
+            session.close()
+
+    @staticmethod
+    def _recent(session, key: str, since: float) -> List[float]:
+        failed_at = session.execute(
+            select(LoginFailure.failed_at)
+            .where(LoginFailure.key == key, LoginFailure.failed_at > datetime.fromtimestamp(since))
+            .order_by(LoginFailure.failed_at)
+        ).scalars()
+        return [value.timestamp() for value in failed_at]
+
+
+class LoginThrottle:
+    """
+    Uso no endpoint de login:
+
+        login_throttle.check(request, email)     # 429 se bloqueado
+        ... consulta usuário / bcrypt ...
+        login_throttle.failure(request, email)   # credenciais inválidas
+        login_throttle.success(request, email)   # login ok: zera o email
+    """
+
+    def __init__(self, store, window: int, max_per_email: int, max_per_ip: int):
+        self.store = store
+        self.window = window
+        self.limits = {"email": max_per_email, "ip": max_per_ip}
+        # chave -> instante até o qual está bloqueada (dispensa o store).
+        # Só com store local: o de outro processo pode ter sido liberado lá
+        self.cache_blocks = store is not None and not store.shared
+        self._blocked_until: Dict[str, float] = {}
+
+    def _keys(self, request: Request, email: str) -> Dict[str, str]:
+        host = request.client.host if request.client else ""
+        return {"email": f"email:{email.strip().lower()}", "ip": f"ip:{host}"}
+
+    def _blocked_for(self, failures: List[float], limit: int, now: float) -> float:
+        """Segundos até a janela voltar a ter menos de limit falhas (0 = livre)"""
+        if limit <= 0 or len(failures) < limit:
+            return 0.0
+        return max(0.0, failures[-limit] + self.window - now)
+
+    def _reject(self, wait: float):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, try again later",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))}
+        )
+
+    def check(self, request: Request, email: str):
+        if self.store is None:
+            return
+        now = time.time()
+        for kind, key in self._keys(request, email).items():
+            until = self._blocked_until.get(key)
+            if until is not None:
+                if until > now:
+                    self._reject(until - now)
+                self._blocked_until.pop(key, None)
+            wait = self._blocked_for(self.store.recent(key, now, self.window), self.limits[kind], now)
+            if wait:
+                if self.cache_blocks:
+                    self._blocked_until[key] = now + wait
+                self._reject(wait)
+
+    def failure(self, request: Request, email: str):
+        if self.store is None:
+            return
+        now = time.time()
+        if len(self._blocked_until) > MAX_TRACKED_KEYS:
+            self._blocked_until = {key: until for key, until in self._blocked_until.items() if until > now}
+        for kind, key in self._keys(request, email).items():
+            wait = self._blocked_for(self.store.add(key, now, self.window), self.limits[kind], now)
+            if wait and self.cache_blocks:
+                self._blocked_until[key] = now + wait
+
+    def success(self, request: Request, email: str):
+        # Só o email é liberado: um IP com muitas falhas continua contando
+        if self.store is None:
+            return
+        key = self._keys(request, email)["email"]
+        self._blocked_until.pop(key, None)
+        self.store.clear(key)
+
+
+def _store():
+    if LOGIN_THROTTLE_BACKEND == "off":
+        return None
+    if LOGIN_THROTTLE_BACKEND == "database":
+        return DatabaseFailureStore()
+    return MemoryFailureStore()
+
+
+login_throttle = LoginThrottle(
+    _store(),
+    LOGIN_FAILURE_WINDOW,
+    LOGIN_MAX_FAILURES_PER_EMAIL,
+    LOGIN_MAX_FAILURES_PER_IP
+)
@@ -0,0 +1,152 @@
+from datetime import date, datetime, time
+from typing import List, Optional
+
+from sqlalchemy import delete, func, insert, null, select, update
+from sqlalchemy.orm import Session
+
+from models.models import Order, OrderDailyRollup, Product, User
+
+# services/order_reports.py
+# Relatórios de pedidos (receita/unidades) agrupados por período, produto,
+# usuário ou status. Dia/semana/produto/status leem order_daily_rollups;
+# usuário agrega direto em orders pelo índice de cobertura.
+
+REPORT_GROUPS = ("day", "week", "product", "user", "status")
+CANCELED_STATUS = "CANCELED"
+
+
+def record_order(session: Session, order: Order, sign: int = 1):
+    """
+    Soma (sign=1) ou remove (sign=-1) o pedido do rollup diário.
+
+    Para alterações, chame com -1 antes de mudar o pedido e com +1 depois.
+    """
+    day = order.created_at.date()
+    updated = session.execute(
+        update(OrderDailyRollup)
+        .where(
+            OrderDailyRollup.day == day,
+            OrderDailyRollup.product_id == order.product_id,
+            OrderDailyRollup.status == order.status
+        )
+        .values(
+            order_count=OrderDailyRollup.order_count + sign,
+            units=OrderDailyRollup.units + sign * (order.quantity or 0),
+            revenue=OrderDailyRollup.revenue + sign * (order.total_price or 0)
+        )
+    ).rowcount
+    if not updated:
+        session.add(OrderDailyRollup(
+            day, order.product_id, order.status,
+            sign, sign * (order.quantity or 0), sign * (order.total_price or 0)
+        ))
+        session.flush()
+
+
+def rebuild_order_rollups(session: Session):
+    """Recalcula order_daily_rollups a partir de orders"""
+    day = func.date(Order.created_at)
+    source = (
+        select(
+            day,
+            Order.product_id,
+            Order.status,
+            func.count(Order.id),
+            func.sum(Order.quantity),
+            func.sum(Order.total_price)
+        )
+        .group_by(day, Order.product_id, Order.status)
+    )
+    session.execute(delete(OrderDailyRollup))
+    session.execute(
+        insert(OrderDailyRollup).from_select(
+            ["day", "product_id", "status", "order_count", "units", "revenue"], source
+        )
+    )
+
+
+def _rollup_report(session: Session, group_by: str, start, end, include_canceled: bool):
+    if group_by == "day":
+        key, label = OrderDailyRollup.day, None
+    elif group_by == "week":
+        key, label = func.strftime('%Y-W%W', OrderDailyRollup.day), None
+    elif group_by == "product":
+        key, label = OrderDailyRollup.product_id, Product.name
+    else:
+        key, label = OrderDailyRollup.status, None
+
+    stmt = select(
+        key.label("key"),
+        (label if label is not None else null()).label("label"),
+        func.sum(OrderDailyRollup.order_count).label("order_count"),
+        func.sum(OrderDailyRollup.units).label("units"),
+        func.sum(OrderDailyRollup.revenue).label("revenue")
+    )
+    if group_by == "product":
+        stmt = stmt.outerjoin(Product, Product.id == OrderDailyRollup.product_id)
+    if start is not None:
+        stmt = stmt.where(OrderDailyRollup.day >= start)
+    if end is not None:
+        stmt = stmt.where(OrderDailyRollup.day < end)
+    if not include_canceled:
+        stmt = stmt.where(OrderDailyRollup.status != CANCELED_STATUS)
+
+    group = (key, label) if label is not None else (key,)
+    # Linhas zeradas (pedidos que mudaram de status) não aparecem
+    return session.execute(
+        stmt.group_by(*group).having(func.sum(OrderDailyRollup.order_count) != 0).order_by(key)
+    ).all()
+
+
+def _user_report(session: Session, start, end, include_canceled: bool):
+    stmt = (
+        select(
+            Order.user_id.label("key"),
+            User.name.label("label"),
+            func.count().label("order_count"),
+            func.sum(Order.quantity).label("units"),
+            func.sum(Order.total_price).label("revenue")
+        )
+        .outerjoin(User, User.id == Order.user_id)
+        .group_by(Order.user_id, User.name)
+        .order_by(Order.user_id)
+    )
+    if start is not None:
+        stmt = stmt.where(Order.created_at >= datetime.combine(start, time.min))
+    if end is not None:
+        stmt = stmt.where(Order.created_at < datetime.combine(end, time.min))
+    if not include_canceled:
+        stmt = stmt.where(Order.status != CANCELED_STATUS)
+    return session.execute(stmt).all()
+
+
+def order_report(
+    session: Session,
+    group_by: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    include_canceled: bool = False
+) -> List[dict]:
+    """
+    Receita e unidades no período start <= dia < end, agrupadas por group_by.
+
+    Cancelados só entram com include_canceled=True (ou no agrupamento por status).
+    """
+    if group_by == "status":
+        include_canceled = True
+
+    if group_by == "user":
+        rows = _user_report(session, start, end, include_canceled)
+    else:
+        rows = _rollup_report(session, group_by, start, end, include_canceled)
+
+    return [
+        {
+            "key": str(row.key) if row.key is not None else None,
+            "label": row.label,
+            "order_count": row.order_count,
+            "units": row.units or 0,
+            "revenue": row.revenue or 0,
+        }
+        for row in rows
+    ]
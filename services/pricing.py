@@ -0,0 +1,75 @@
+from typing import List
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from models.models import Product
+from schemas.product_schema import ProductPriceItem, ProductPriceRule
+from services.analytics import record_price_changes
+
+# services/pricing.py
+# Reajuste de preços em lote: calcula os novos preços em memória e grava
+# tudo com um único UPDATE executemany, na mesma transação dos rollups.
+
+UPDATE_CHUNK_SIZE = 1000
+
+
+def bulk_update_prices(session: Session, items: List[ProductPriceItem], rules: List[ProductPriceRule]) -> dict:
+    """Aplica regras percentuais e preços explícitos (sem commit) e retorna o resumo"""
+    # id -> [category_id, supplier_id, preço atual, novo preço]
+    products = {}
+
+    def load(stmt):
+        for product_id, category_id, supplier_id, price in session.execute(stmt):
+            products.setdefault(product_id, [category_id, supplier_id, price, price])
+
+    columns = select(Product.id, Product.category_id, Product.supplier_id, Product.price)
+
+    for rule in rules:
+        stmt = columns
+        if rule.category_id is not None:
+            stmt = stmt.where(Product.category_id == rule.category_id)
+        if rule.supplier_id is not None:
+            stmt = stmt.where(Product.supplier_id == rule.supplier_id)
+        factor = 1 + rule.percent / 100
+        for product_id, category_id, supplier_id, price in session.execute(stmt):
+            entry = products.setdefault(product_id, [category_id, supplier_id, price, price])
+            # Regras se acumulam; o preço nunca chega a zero
+            entry[3] = max(round(entry[3] * factor, 2), 0.01)
+
+    item_ids = [item.id for item in items]
+    for start in range(0, len(item_ids), UPDATE_CHUNK_SIZE):
+        load(columns.where(Product.id.in_(item_ids[start:start + UPDATE_CHUNK_SIZE])))
+    missing = [item.id for item in items if item.id not in products]
+    for item in items:
+        if item.id in products:
+            products[item.id][3] = item.price
+
+    changed = [
+        (product_id, category_id, supplier_id, old_price, new_price)
+        for product_id, (category_id, supplier_id, old_price, new_price) in products.items()
+        if new_price != old_price
+    ]
+    # UPDATE na tabela (Core) para também incrementar version: edições
+    # concorrentes com If-Match antigo recebem 409
+    products_table = Product.__table__
+    stmt = (
+        update(products_table)
+        .where(products_table.c.id == bindparam("product_id"))
+        .values(price=bindparam("new_price"), version=products_table.c.version + 1)
+    )
+    for start in range(0, len(changed), UPDATE_CHUNK_SIZE):
+        session.execute(
+            stmt,
+            [{"product_id": change[0], "new_price": change[4]} for change in changed[start:start + UPDATE_CHUNK_SIZE]]
+        )
+
+    # Mantém os rollups de valor do estoque (e invalida caches de products no commit)
+    value_delta = record_price_changes(session, changed) if changed else 0
+
+    return {
+        "updated": len(changed),
+        "unchanged": len(products) - len(changed),
+        "missing": missing,
+        "stock_value_delta": round(value_delta, 2),
+    }
@@ -0,0 +1,198 @@
+import csv
+import io
+import json
+import os
+import tempfile
+
+from fastapi import HTTPException, Request, status
+from typing import Optional
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from models.models import Category, Product, Supplier
+from routes.dependencies import SessionLocal
+from schemas.product_schema import ProductCreate
+from services.jobs import JobContext, job_handler
+
+# services/product_import.py
+# Importação em lote de produtos, validada e inserida em blocos.
+
+IMPORT_FORMATS = ("csv", "ndjson")
+CHUNK_SIZE = 500
+SPOOL_MAX_SIZE = 1024 * 1024  # acima disso o corpo vai para disco
+
+
+async def spool_request_body(request: Request):
+    """Lê o corpo do request em streaming para um arquivo temporário"""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+b")
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+async def save_request_body(request: Request) -> str:
+    """Grava o corpo do request em disco (para importação via job)"""
+    with tempfile.NamedTemporaryFile(mode="wb", suffix=".import", delete=False) as file:
+        async for chunk in request.stream():
+            file.write(chunk)
+        return file.name
+
+
+def _iter_raw_rows(spool, fmt):
+    """Gera (número_da_linha, dict | erro) a partir do arquivo"""
+    text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for number, row in enumerate(reader, start=1):
+            # Campos vazios do CSV viram None (campos opcionais)
+            yield number, {key: (value if value != "" else None) for key, value in row.items()}
+    else:
+        for number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield number, exc
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validation_messages(exc: ValidationError):
+    return [f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in exc.errors()]
+
+
+def import_products(
+    session: Session,
+    spool,
+    fmt: str = "csv",
+    dry_run: bool = False,
+    ctx: Optional[JobContext] = None
+) -> dict:
+    """
+    Valida e insere produtos em blocos de CHUNK_SIZE linhas.
+
+    Por bloco: uma query para nomes duplicados, uma para categorias e uma para
+    fornecedores, seguidas de um INSERT em lote. Linhas inválidas entram no
+    relatório de erros e não impedem a importação das demais.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Use: {', '.join(IMPORT_FORMATS)}"
+        )
+
+    report = {"dry_run": dry_run, "total_rows": 0, "created": 0, "failed": 0, "errors": []}
+    seen_names = set()
+
+    def fail(number, messages):
+        report["failed"] += 1
+        report["errors"].append({"row": number, "errors": messages})
+
+    try:
+        for chunk in _chunks(_iter_raw_rows(spool, fmt), CHUNK_SIZE):
+            report["total_rows"] += len(chunk)
+
+            # 1. Validação de schema
+            valid = []
+            for number, raw in chunk:
+                if isinstance(raw, Exception):
+                    fail(number, [f"Invalid JSON: {raw}"])
+                    continue
+                if not isinstance(raw, dict):
+                    fail(number, ["Row must be an object"])
+                    continue
+                try:
+                    valid.append((number, ProductCreate.model_validate(raw)))
+                except ValidationError as exc:
+                    fail(number, _validation_messages(exc))
+
+            if not valid:
+                continue
+
+            # 2. Resolução de duplicados e FKs com queries por conjunto
+            names = {product.name for _, product in valid}
+            existing_names = set(session.scalars(
+                select(Product.name).where(Product.name.in_(names))
+            ))
+            category_ids = {product.category_id for _, product in valid if product.category_id is not None}
+            found_categories = set(session.scalars(
+                select(Category.id).where(Category.id.in_(category_ids))
+            )) if category_ids else set()
+            supplier_ids = {product.supplier_id for _, product in valid if product.supplier_id is not None}
+            found_suppliers = set(session.scalars(
+                select(Supplier.id).where(Supplier.id.in_(supplier_ids))
+            )) if supplier_ids else set()
+
+            # 3. Validação de regras de negócio
+            to_insert = []
+            for number, product in valid:
+                messages = []
+                if product.price is None:
+                    messages.append("price: Field required")
+                if product.name in existing_names:
+                    messages.append("Product already registered, try another name")
+                elif product.name in seen_names:
+                    messages.append("Duplicated name in import file")
+                if product.category_id is not None and product.category_id not in found_categories:
+                    messages.append("Category not found")
+                if product.supplier_id is not None and product.supplier_id not in found_suppliers:
+                    messages.append("Supplier not found")
+
+                seen_names.add(product.name)
+                if messages:
+                    fail(number, messages)
+                    continue
+                to_insert.append(product.model_dump())
+
+            # 4. INSERT em lote
+            if to_insert and not dry_run:
+                session.execute(insert(Product), to_insert)
+            report["created"] += len(to_insert)
+
+            if ctx:
+                # Em background cada bloco é commitado antes de gravar o progresso:
+                # a conexão de escrita é única e o progresso usa outra sessão
+                if not dry_run:
+                    session.commit()
+                ctx.report_progress(report["total_rows"])
+
+        if dry_run:
+            session.rollback()
+        else:
+            session.commit()
+    except UnicodeDecodeError:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be UTF-8 encoded"
+        )
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        spool.close()
+
+    return report
+
+
+@job_handler("product_import")
+def run_product_import(ctx: JobContext, path: str, fmt: str = "csv", dry_run: bool = False) -> dict:
+    """Importação em background a partir do arquivo salvo por save_request_body"""
+    session = SessionLocal()
+    try:
+        return import_products(session, open(path, "rb"), fmt, dry_run, ctx)
+    finally:
+        session.close()
+        os.remove(path)
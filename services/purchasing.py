@@ -0,0 +1,85 @@
+from itertools import groupby
+from typing import List, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from models.models import Product, StockLevel, Supplier
+from services.cache import QueryCache
+
+# services/purchasing.py
+# Sugestões de pedido de compra: níveis abaixo do mínimo, agrupados por fornecedor.
+
+# Invalidado por qualquer commit em níveis, produtos ou fornecedores, deste
+# ou de outro processo (gerações compartilhadas em cache_versions)
+suggestions_cache = QueryCache(("stock_levels", "products", "suppliers"), shared=True)
+
+
+def _suggestions_select(supplier_id: Optional[int]):
+    """
+    Uma consulta só: stock_levels ⋈ products ⟕ suppliers, com os totais
+    de cada fornecedor calculados por window functions.
+    """
+    current = func.coalesce(StockLevel.current_quantity, 0)
+    # Sem máximo cadastrado, repõe até o mínimo
+    target = func.coalesce(StockLevel.maximum_quantity, StockLevel.minimum_quantity)
+    suggested = (target - current).label("suggested_quantity")
+    cost = (suggested * Product.price).label("estimated_cost")
+    by_supplier = {"partition_by": Product.supplier_id}
+
+    stmt = (
+        select(
+            Product.supplier_id,
+            Supplier.name.label("supplier_name"),
+            StockLevel.product_id,
+            Product.name.label("product_name"),
+            StockLevel.location_id,
+            current.label("current_quantity"),
+            StockLevel.minimum_quantity,
+            StockLevel.maximum_quantity,
+            suggested,
+            Product.price.label("unit_price"),
+            cost,
+            func.count().over(**by_supplier).label("supplier_item_count"),
+            func.sum(suggested).over(**by_supplier).label("supplier_total_quantity"),
+            func.sum(cost).over(**by_supplier).label("supplier_estimated_cost"),
+        )
+        .join(Product, Product.id == StockLevel.product_id)
+        .outerjoin(Supplier, Supplier.id == Product.supplier_id)
+        .where(current <= StockLevel.minimum_quantity, target > current)
+        # Produtos sem fornecedor ficam por último
+        .order_by(
+            case((Product.supplier_id.is_(None), 1), else_=0),
+            Product.supplier_id,
+            StockLevel.product_id,
+            StockLevel.location_id
+        )
+    )
+    if supplier_id is not None:
+        stmt = stmt.where(Product.supplier_id == supplier_id)
+    return stmt
+
+
+def purchase_suggestions(session: Session, supplier_id: Optional[int] = None) -> List[dict]:
+    """Lista de reposição por fornecedor (cacheada até a próxima mudança de estoque)"""
+    generation = suggestions_cache.generation(session)
+    cached = suggestions_cache.get(supplier_id, generation=generation)
+    if cached is not None:
+        return cached
+
+    rows = session.execute(_suggestions_select(supplier_id)).all()
+
+    suppliers = []
+    for _, group in groupby(rows, key=lambda row: row.supplier_id):
+        group = list(group)
+        first = group[0]
+        suppliers.append({
+            "supplier_id": first.supplier_id,
+            "supplier_name": first.supplier_name,
+            "item_count": first.supplier_item_count,
+            "total_quantity": first.supplier_total_quantity,
+            "estimated_cost": first.supplier_estimated_cost,
+            "items": [row._asdict() for row in group],
+        })
+
+    return suggestions_cache.set(supplier_id, suppliers, generation)
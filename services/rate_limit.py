@@ -0,0 +1,169 @@
+import math
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from models.models import User
+from routes.dependencies import verify_token
+
+# services/rate_limit.py
+# Limites em memória, por processo:
+# - RateLimit: token bucket por usuário + rota (dependência dos routers);
+#   quem excede recebe 429 com Retry-After sem afetar os demais usuários.
+# - InFlightLimiter: teto global de requests em andamento (LoadShedding,
+#   middleware em main.py); acima dele o request é recusado com 503 +
+#   Retry-After em vez de entrar na fila do pool de threads/conexões.
+# Os contadores aparecem em GET /metrics.
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "20/40")  # tokens por segundo / rajada
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", "64"))  # 0 desliga o corte de carga
+SHED_RETRY_AFTER = int(os.getenv("SHED_RETRY_AFTER", "1"))  # segundos
+MAX_BUCKETS = 10000  # acima disso, buckets cheios (inativos) são descartados
+
+
+def parse_limit(value: str) -> Tuple[float, int]:
+    """'20/40' -> (20.0, 40); '5' -> (5.0, 5); '0' desliga o limite"""
+    rate, _, burst = value.partition("/")
+    rate = float(rate)
+    return rate, int(burst) if burst else max(1, math.ceil(rate))
+
+
+class RateLimit:
+    """
+    Dependência de router: Depends(RateLimit("stock")).
+
+    O limite vem de RATE_LIMIT_<NOME> (ex.: RATE_LIMIT_STOCK=50/100) ou de
+    RATE_LIMIT_DEFAULT. Cada usuário (verify_token) tem um bucket por
+    método + rota, então um cliente que inunda GET /stock/movements não
+    consome o limite dos demais nem o das outras rotas.
+    """
+
+    instances: Dict[str, "RateLimit"] = {}
+
+    def __init__(self, name: str, limit: Optional[str] = None):
+        self.name = name
+        self.rate, self.burst = parse_limit(limit or os.getenv(f"RATE_LIMIT_{name.upper()}", RATE_LIMIT_DEFAULT))
+        # (user_id, rota) -> [tokens, instante da última atualização]
+        self._buckets: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+        RateLimit.instances[name] = self
+
+    def _take(self, key: tuple) -> float:
+        """Consome um token; retorna 0 ou os segundos até o próximo token"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= MAX_BUCKETS:
+                    self._prune(now)
+                bucket = self._buckets[key] = [float(self.burst), now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                self.allowed += 1
+                return 0.0
+            bucket[0] = tokens
+            self.limited += 1
+            return (1 - tokens) / self.rate
+
+    def _prune(self, now: float):
+        # Buckets que já teriam reabastecido por completo equivalem a buckets novos
+        refill = self.burst / self.rate
+        for key in [key for key, (_, updated) in self._buckets.items() if now - updated >= refill]:
+            del self._buckets[key]
+
+    def __call__(self, request: Request, current_user: User = Depends(verify_token)):
+        if not RATE_LIMIT_ENABLED or self.rate <= 0:
+            return
+        route = request.scope.get("route")
+        key = (current_user.id, request.method, getattr(route, "path", request.url.path))
+        wait = self._take(key)
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded, slow down",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+    def metrics(self) -> dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "buckets": len(self._buckets),
+        }
+
+
+class InFlightLimiter:
+    """Contador global de requests em andamento com teto (MAX_IN_FLIGHT)"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.current = 0
+        self.peak = 0
+        self.shed = 0
+
+    def try_acquire(self) -> bool:
+        # Chamado só no event loop (middleware), sem concorrência entre threads
+        if self.limit and self.current >= self.limit:
+            self.shed += 1
+            return False
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        return True
+
+    def release(self):
+        self.current -= 1
+
+    def metrics(self) -> dict:
+        return {"limit": self.limit, "current": self.current, "peak": self.peak, "shed": self.shed}
+
+
+in_flight = InFlightLimiter(MAX_IN_FLIGHT)
+
+
+class LoadShedding:
+    """
+    app.add_middleware(LoadShedding, limiter=in_flight, exempt=("/metrics",))
+
+    Middleware ASGI puro: a vaga só é liberada quando a aplicação termina de
+    enviar a resposta, inclusive o corpo das respostas em streaming (exports).
+    Rotas em exempt não contam nem são recusadas.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: InFlightLimiter, exempt: Tuple[str, ...] = ()):
+        self.app = app
+        self.limiter = limiter
+        self.exempt = exempt
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt):
+            return await self.app(scope, receive, send)
+        if not self.limiter.try_acquire():
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Server busy, retry later"},
+                headers={"Retry-After": str(SHED_RETRY_AFTER)}
+            )
+            return await response(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+
+def rate_limit_metrics() -> dict:
+    return {
+        "in_flight": in_flight.metrics(),
+        "rate_limits": {name: limiter.metrics() for name, limiter in RateLimit.instances.items()},
+    }
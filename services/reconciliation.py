@@ -0,0 +1,219 @@
+from sqlalchemy import bindparam, case, func, select, update, union_all
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from models.models import StockLevel, StockMovement
+from routes.dependencies import SessionLocal
+from services.jobs import JobContext, job_handler
+from services.archive import archived_balances
+from services.stock import rebuild_product_totals
+from services.analytics import rebuild_value_rollups
+
+# services/reconciliation.py
+# Recalcula StockLevel.current_quantity a partir do histórico de StockMovement.
+
+FIX_CHUNK_SIZE = 500
+
+
+def movement_balances():
+    """
+    Subquery com o saldo SUM(in) - SUM(out) agrupado por produto e localização.
+
+    Soma as movimentações da tabela quente com o saldo já arquivado.
+    """
+    signed_quantity = case(
+        (StockMovement.movement_type == 'in', StockMovement.quantity),
+        else_=-StockMovement.quantity
+    )
+    hot = (
+        select(
+            StockMovement.product_id.label("product_id"),
+            StockMovement.location_id.label("location_id"),
+            func.sum(signed_quantity).label("expected")
+        )
+        .group_by(StockMovement.product_id, StockMovement.location_id)
+    )
+    combined = union_all(hot, archived_balances()).subquery()
+    return (
+        select(
+            combined.c.product_id.label("product_id"),
+            combined.c.location_id.label("location_id"),
+            func.sum(combined.c.expected).label("expected")
+        )
+        .group_by(combined.c.product_id, combined.c.location_id)
+        .subquery()
+    )
+
+
+def find_stock_drift(session: Session):
+    """
+    Compara stock_levels com o saldo das movimentações.
+
+    Retorna (drift, missing):
+    - drift: níveis cuja quantidade difere do saldo calculado
+    - missing: produto/localização com movimentações mas sem nível de estoque
+    """
+    balances = movement_balances()
+    expected = func.coalesce(balances.c.expected, 0)
+    current = func.coalesce(StockLevel.current_quantity, 0)
+
+    drift = session.execute(
+        select(
+            StockLevel.id,
+            StockLevel.product_id,
+            StockLevel.location_id,
+            StockLevel.current_quantity,
+            StockLevel.version,
+            expected.label("expected")
+        )
+        .outerjoin(
+            balances,
+            (balances.c.product_id == StockLevel.product_id)
+            & (balances.c.location_id == StockLevel.location_id)
+        )
+        .where(current != expected)
+        .order_by(StockLevel.id)
+    ).all()
+
+    missing = session.execute(
+        select(balances.c.product_id, balances.c.location_id, balances.c.expected)
+        .outerjoin(
+            StockLevel,
+            (StockLevel.product_id == balances.c.product_id)
+            & (StockLevel.location_id == balances.c.location_id)
+        )
+        .where(StockLevel.id.is_(None))
+        .order_by(balances.c.product_id, balances.c.location_id)
+    ).all()
+
+    return drift, missing
+
+
+@job_handler("stock_reconciliation")
+def run_reconciliation(ctx: JobContext, fix: bool = False) -> dict:
+    """
+    Executa a reconciliação como job em background.
+
+    Retorna o relatório de divergências; com fix=True corrige em blocos.
+
+    A correção só vale para níveis que continuam como no levantamento:
+    o UPDATE compara version e current_quantity, e o INSERT de níveis
+    ausentes ignora os que foram criados nesse meio tempo. Os que mudaram
+    (movimentação gravada durante o job) ficam em skipped para uma nova
+    reconciliação, em vez de terem a movimentação apagada.
+    """
+    session = SessionLocal()
+    try:
+        drift, missing = find_stock_drift(session)
+
+        items = [
+            {
+                "stock_level_id": row.id,
+                "product_id": row.product_id,
+                "location_id": row.location_id,
+                "current_quantity": row.current_quantity,
+                "expected_quantity": row.expected,
+            }
+            for row in drift
+        ] + [
+            {
+                "stock_level_id": None,
+                "product_id": row.product_id,
+                "location_id": row.location_id,
+                "current_quantity": None,
+                "expected_quantity": row.expected,
+            }
+            for row in missing
+        ]
+        ctx.report_progress(0, len(items), force=True)
+
+        fixed = 0
+        skipped = []
+        if fix:
+            # Atualização por chave primária, condicionada ao estado lido (incrementa version)
+            levels = StockLevel.__table__
+            stmt = (
+                update(levels)
+                .where(
+                    levels.c.id == bindparam("level_id"),
+                    levels.c.version == bindparam("snapshot_version"),
+                    levels.c.current_quantity.is_not_distinct_from(bindparam("snapshot_quantity"))
+                )
+                .values(current_quantity=bindparam("expected"), version=levels.c.version + 1)
+            )
+            # Um executemany por bloco; o rowcount é o total de linhas atualizadas
+            for start in range(0, len(drift), FIX_CHUNK_SIZE):
+                chunk = drift[start:start + FIX_CHUNK_SIZE]
+                updated = session.execute(stmt, [
+                    {
+                        "level_id": row.id,
+                        "snapshot_version": row.version,
+                        "snapshot_quantity": row.current_quantity,
+                        "expected": row.expected,
+                    }
+                    for row in chunk
+                ]).rowcount
+                fixed += updated
+                if updated < len(chunk):
+                    # Alguns mudaram desde o levantamento: os corrigidos estão com
+                    # version + 1 e a quantidade esperada, os demais vão para skipped
+                    applied = set(session.execute(
+                        select(levels.c.id, levels.c.version, levels.c.current_quantity)
+                        .where(levels.c.id.in_([row.id for row in chunk]))
+                    ).all())
+                    skipped.extend(
+                        {"stock_level_id": row.id, "product_id": row.product_id, "location_id": row.location_id}
+                        for row in chunk
+                        if (row.id, row.version + 1, row.expected) not in applied
+                    )
+                session.commit()
+                ctx.report_progress(fixed + len(skipped))
+
+            # Recria níveis removidos que ainda possuem histórico; o RETURNING diz
+            # quais foram inseridos (os que já existiam ficam em skipped)
+            create = (
+                insert(StockLevel.__table__)
+                .on_conflict_do_nothing(index_elements=["product_id", "location_id"])
+                .returning(levels.c.product_id, levels.c.location_id)
+            )
+            for start in range(0, len(missing), FIX_CHUNK_SIZE):
+                chunk = missing[start:start + FIX_CHUNK_SIZE]
+                created = set(session.execute(create, [
+                    {
+                        "product_id": row.product_id,
+                        "location_id": row.location_id,
+                        "current_quantity": row.expected,
+                        "minimum_quantity": 0,
+                        "version": 1,
+                    }
+                    for row in chunk
+                ]).all())
+                fixed += len(created)
+                skipped.extend(
+                    {"stock_level_id": None, "product_id": row.product_id, "location_id": row.location_id}
+                    for row in chunk
+                    if (row.product_id, row.location_id) not in created
+                )
+                session.commit()
+                ctx.report_progress(fixed + len(skipped))
+
+            # Totais por produto derivados dos níveis corrigidos
+            rebuild_product_totals(session, {row.product_id for row in drift} | {row.product_id for row in missing})
+            rebuild_value_rollups(session)
+            session.commit()
+
+        ctx.report_progress(len(items), force=True)
+        return {
+            "fix": fix,
+            "drift_count": len(drift),
+            "missing_count": len(missing),
+            "fixed": fixed,
+            "skipped_count": len(skipped),
+            "skipped": skipped,
+            "items": items,
+        }
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,113 @@
+import os
+from decimal import Decimal
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Type
+
+import orjson
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import Annotated, TypedDict
+
+# services/serialization.py
+# Caminho rápido para listas grandes, escolhido por endpoint
+# (list_response(..., fast=True)): o endpoint seleciona só as colunas do schema
+# e as linhas são validadas por um TypeAdapter compilado uma vez por schema e
+# serializadas pelo orjson direto para bytes JSON. Os tipos saem iguais aos do
+# response_model (datetime, enum, Decimal), sem objetos ORM nem um model
+# pydantic por linha.
+# O schema continua no response_model, para a documentação (OpenAPI) e para
+# os endpoints que não optam pelo caminho rápido.
+
+# Desliga o caminho rápido em todos os endpoints (comparar ou depurar)
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "true").lower() == "true"
+
+
+class FieldSelection:
+    """
+    Dependência para sparse fieldsets: ?fields=id,name,price.
+
+    Depends(FieldSelection(ProductGet)) devolve os campos pedidos (na ordem
+    do schema) ou None quando o parâmetro não foi enviado.
+    """
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.schema = schema
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(None, description="Campos separados por vírgula (padrão: todos)")
+    ) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested - set(self.schema.model_fields)
+        if not requested or unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid fields: {', '.join(sorted(unknown)) or fields}. Use: {', '.join(self.schema.model_fields)}"
+            )
+        return [field for field in self.schema.model_fields if field in requested]
+
+
+def schema_columns(schema: Type[BaseModel], model, fields: Optional[List[str]] = None) -> list:
+    """Colunas do model com os mesmos nomes dos campos do schema (ou só os de fields), na ordem do schema"""
+    return [getattr(model, field) for field in (fields or schema.model_fields)]
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None) -> TypeAdapter:
+    """
+    TypeAdapter de uma lista de linhas do schema (ou só dos campos em fields),
+    compilado uma vez por schema/campos.
+
+    Cada linha é um TypedDict com os mesmos tipos e restrições dos campos do
+    schema: a validação converte os valores do banco como o response_model
+    faria, mas sem instanciar um model por linha.
+    """
+    types = {}
+    for field in fields or schema.model_fields:
+        info = schema.model_fields[field]
+        types[field] = Annotated[(info.annotation, *info.metadata)] if info.metadata else info.annotation
+    return TypeAdapter(List[TypedDict(f"{schema.__name__}Row", types)])
+
+
+def dumps_rows(schema: Type[BaseModel], rows: Sequence, keys: Sequence[str], fields: Optional[List[str]] = None) -> bytes:
+    """
+    Serializa as linhas como lista de objetos JSON com os campos do schema
+    (ou apenas os de fields), validadas pelo TypeAdapter do schema.
+
+    keys são os nomes das colunas das linhas (result.keys()); colunas fora do
+    schema são ignoradas.
+    """
+    adapter = list_adapter(schema, tuple(fields) if fields else None)
+    fields = list(fields or schema.model_fields)
+    positions = [list(keys).index(field) for field in fields]
+    items = [{field: row[position] for field, position in zip(fields, positions)} for row in rows]
+    return orjson.dumps(adapter.validate_python(items), default=_json_default)
+
+
+def _json_default(value):
+    # Único tipo dos schemas que o orjson não serializa; string, como no pydantic
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def list_response(
+    schema: Type[BaseModel],
+    rows: Sequence,
+    keys: Sequence[str],
+    fields: Optional[List[str]] = None,
+    fast: bool = False
+):
+    """
+    Resposta para uma lista de linhas.
+
+    Com fast=True (e FAST_SERIALIZATION ligado), devolve a resposta JSON já
+    serializada pelo TypeAdapter; senão devolve dicts e o response_model do
+    endpoint valida/serializa normalmente. Respostas parciais (fields) sempre
+    usam o TypeAdapter: o response_model exigiria todos os campos.
+    """
+    if fields or (fast and FAST_SERIALIZATION):
+        return Response(content=dumps_rows(schema, rows, keys, fields), media_type="application/json")
+    return [dict(zip(keys, row)) for row in rows]
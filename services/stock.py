@@ -0,0 +1,292 @@
+import os
+from collections import defaultdict
+from typing import Iterable, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models.models import Location, Product, ProductStockTotal, StockLevel, StockMovement
+from schemas.stock_schema import StockMovementCreate, StockTransferItem
+from services.analytics import record_movement, record_stock_change
+
+# services/stock.py
+# Regras de movimentação de estoque compartilhadas entre rotas e writers.
+
+# Localização usada quando o cliente não informa location_id (criada na migração)
+DEFAULT_LOCATION_ID = int(os.getenv("DEFAULT_LOCATION_ID", "1"))
+
+
+def add_to_total(session: Session, product_id: int, delta: int):
+    """Soma delta ao total agregado do produto (product_stock_totals) e aos rollups de valor"""
+    if not delta:
+        return
+    record_stock_change(session, product_id, delta)
+    updated = session.execute(
+        update(ProductStockTotal)
+        .where(ProductStockTotal.product_id == product_id)
+        .values(total_quantity=ProductStockTotal.total_quantity + delta)
+    ).rowcount
+    if not updated:
+        session.add(ProductStockTotal(product_id, delta))
+        session.flush()
+
+
+def adjust_level(session: Session, stock_level: StockLevel, delta: int, require_available: bool = False) -> bool:
+    """
+    Ajusta a quantidade do nível e mantém o total do produto em dia.
+
+    Em níveis já gravados o ajuste é um UPDATE atômico na conexão de escrita
+    (current_quantity = current_quantity + delta), não o valor calculado a
+    partir da leitura: movimentações concorrentes no mesmo nível somam em vez
+    de uma sobrescrever a outra, e não geram conflito de versão entre si
+    (a versão é incrementada, então edições com If-Match antigo dão 409).
+
+    Com require_available, uma saída só é aplicada se ainda houver saldo no
+    momento do UPDATE; retorna False (sem alterar nada) quando não há.
+    """
+    if stock_level.id is None:
+        # Nível novo, ainda não gravado: vai inteiro no INSERT
+        stock_level.current_quantity = (stock_level.current_quantity or 0) + delta
+    else:
+        levels = StockLevel.__table__
+        current = func.coalesce(levels.c.current_quantity, 0)
+        stmt = update(levels).where(levels.c.id == stock_level.id)
+        if require_available and delta < 0:
+            stmt = stmt.where(current >= -delta)
+        row = session.execute(
+            stmt.values(current_quantity=current + delta, version=levels.c.version + 1)
+            .returning(levels.c.current_quantity, levels.c.version)
+        ).first()
+        if row is None:
+            return False
+        # Sincroniza o objeto sem marcá-lo como alterado: um flush posterior
+        # compara a versão nova, não a lida antes do ajuste
+        set_committed_value(stock_level, "current_quantity", row.current_quantity)
+        set_committed_value(stock_level, "version", row.version)
+    add_to_total(session, stock_level.product_id, delta)
+    return True
+
+
+def rebuild_product_totals(session: Session, product_ids: Optional[Iterable[int]] = None):
+    """Recalcula product_stock_totals a partir de stock_levels (todos ou alguns produtos)"""
+    source = select(
+        StockLevel.product_id,
+        func.coalesce(func.sum(StockLevel.current_quantity), 0)
+    ).group_by(StockLevel.product_id)
+    clear = delete(ProductStockTotal)
+
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        source = source.where(StockLevel.product_id.in_(product_ids))
+        clear = clear.where(ProductStockTotal.product_id.in_(product_ids))
+
+    session.execute(clear)
+    session.execute(insert(ProductStockTotal).from_select(["product_id", "total_quantity"], source))
+
+
+def resolve_location_id(session: Session, location_id: Optional[int]) -> int:
+    """Valida a localização informada (ou usa a padrão)"""
+    if location_id is None:
+        return DEFAULT_LOCATION_ID
+    if not session.get(Location, location_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Location not found!"
+        )
+    return location_id
+
+
+def find_stock_level(session: Session, product_id: int, location_id: int) -> Optional[StockLevel]:
+    return session.query(StockLevel).filter(
+        StockLevel.product_id == product_id,
+        StockLevel.location_id == location_id
+    ).first()
+
+
+def apply_stock_movement(session: Session, data: StockMovementCreate, user_id: int) -> StockMovement:
+    """
+    Registra a movimentação e ajusta o StockLevel do produto na localização (sem commit).
+
+    Todas as validações acontecem antes de qualquer alteração na sessão,
+    então um erro não deixa mudanças pela metade (importante no group commit).
+    """
+    # Valida se produto existe
+    product = session.get(Product, data.product_id)
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found!"
+        )
+    location_id = resolve_location_id(session, data.location_id)
+
+    stock_level = find_stock_level(session, product.id, location_id)
+
+    # Valida estoque disponível para saídas
+    available = (stock_level.current_quantity or 0) if stock_level else 0
+    if data.movement_type == 'out' and available < data.quantity:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient stock! Available: {available}, Requested: {data.quantity}"
+        )
+
+    delta = data.quantity if data.movement_type == 'in' else -data.quantity
+    if stock_level:
+        # Saldo conferido de novo no próprio UPDATE (a leitura acima pode estar
+        # desatualizada); ainda nada foi alterado na sessão se faltar estoque
+        if not adjust_level(session, stock_level, delta, require_available=True):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Insufficient stock! Available: {_current_quantity(session, stock_level.id)}, Requested: {data.quantity}"
+            )
+
+    # Cria movimentação
+    movement = StockMovement(
+        product_id=product.id,
+        movement_type=data.movement_type,
+        quantity=data.quantity,
+        reference_type=data.reference_type,
+        user_id=user_id,
+        location_id=location_id
+    )
+    session.add(movement)
+    record_movement(session, movement)
+
+    if not stock_level:
+        # Cria registro se não existir
+        stock_level = StockLevel(
+            product_id=product.id,
+            location_id=location_id,
+            current_quantity=0,
+            minimum_quantity=0,
+            maximum_quantity=1000
+        )
+        session.add(stock_level)
+        adjust_level(session, stock_level, delta)
+
+    session.flush()
+    return movement
+
+
+def _current_quantity(session: Session, level_id: int) -> int:
+    return session.scalar(select(func.coalesce(StockLevel.current_quantity, 0)).where(StockLevel.id == level_id)) or 0
+
+
+def _raise_insufficient_transfer(items: List[StockTransferItem], product_id: int, location_id: int, available: int):
+    """400 com o primeiro item que, na ordem do request, deixaria a localização negativa"""
+    balance = available
+    for index, item in enumerate(items):
+        if item.product_id != product_id:
+            continue
+        if item.from_location_id == location_id:
+            if item.quantity > balance:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=(
+                        f"Insufficient stock for transfer {index}! "
+                        f"Available: {balance}, Requested: {item.quantity}"
+                    )
+                )
+            balance -= item.quantity
+        elif item.to_location_id == location_id:
+            balance += item.quantity
+    # O saldo mudou entre o UPDATE e a leitura (outro writer): aponta só o nível
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Insufficient stock for product {product_id} at location {location_id}!"
+    )
+
+
+def apply_stock_transfers(session: Session, items: List[StockTransferItem], user_id: int) -> List[StockMovement]:
+    """
+    Transfere estoque entre localizações: para cada item, uma saída na
+    origem e uma entrada no destino, tudo na mesma transação (sem commit).
+
+    Os itens viram um saldo líquido por (product_id, location_id), e cada
+    nível recebe um único UPDATE, emitidos em ordem de (product_id,
+    location_id): duas transferências concorrentes travam as linhas na mesma
+    ordem e não entram em deadlock num primário com locks por linha
+    (Postgres). No SQLite o writer é único e a ordem não muda nada.
+
+    As saídas são UPDATEs condicionais na conexão de escrita
+    (current_quantity = current_quantity - q WHERE current_quantity >= q):
+    o saldo é conferido no próprio UPDATE, não numa leitura anterior, então
+    duas transferências concorrentes não tiram o mesmo estoque. Se uma
+    localização não cobre o saldo, o 400 aponta o primeiro item (na ordem do
+    request) que a deixaria negativa e desfaz a transação inteira.
+    """
+    # Valida produtos e localizações com uma consulta cada
+    product_ids = {item.product_id for item in items}
+    found = set(session.scalars(select(Product.id).where(Product.id.in_(product_ids))))
+    if found != product_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product not found! ids: {sorted(product_ids - found)}"
+        )
+    location_ids = {item.from_location_id for item in items} | {item.to_location_id for item in items}
+    found = set(session.scalars(select(Location.id).where(Location.id.in_(location_ids))))
+    if found != location_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Location not found! ids: {sorted(location_ids - found)}"
+        )
+
+    deltas = defaultdict(int)
+    for item in items:
+        deltas[(item.product_id, item.from_location_id)] -= item.quantity
+        deltas[(item.product_id, item.to_location_id)] += item.quantity
+
+    levels = StockLevel.__table__
+    current = func.coalesce(levels.c.current_quantity, 0)
+    # O total do produto não muda: as saídas e entradas se anulam
+    for (product_id, location_id), delta in sorted(deltas.items()):
+        level = (levels.c.product_id == product_id) & (levels.c.location_id == location_id)
+        if delta < 0:
+            taken = session.execute(
+                update(levels)
+                .where(level, current >= -delta)
+                .values(current_quantity=current + delta, version=levels.c.version + 1)
+            ).rowcount
+            if not taken:
+                available = session.scalar(select(current).where(level)) or 0
+                _raise_insufficient_transfer(items, product_id, location_id, available)
+        elif delta > 0:
+            added = session.execute(
+                update(levels)
+                .where(level)
+                .values(current_quantity=current + delta, version=levels.c.version + 1)
+            ).rowcount
+            if not added:
+                # Cria registro no destino se não existir
+                session.add(StockLevel(
+                    product_id=product_id,
+                    location_id=location_id,
+                    current_quantity=delta,
+                    minimum_quantity=0,
+                    maximum_quantity=1000
+                ))
+                session.flush()
+
+    movements = []
+    for item in items:
+        for movement_type, location_id in (
+            ('out', item.from_location_id),
+            ('in', item.to_location_id),
+        ):
+            movement = StockMovement(
+                product_id=item.product_id,
+                movement_type=movement_type,
+                quantity=item.quantity,
+                reference_type='transfer',
+                user_id=user_id,
+                location_id=location_id
+            )
+            session.add(movement)
+            record_movement(session, movement)
+            movements.append(movement)
+
+    session.flush()
+    return movements
@@ -0,0 +1,82 @@
+import os
+import tempfile
+
+# Configuração do ambiente antes de importar a aplicação: os módulos leem
+# as variáveis na importação (engines, limites, chave do JWT).
+_tmp = tempfile.mkdtemp(prefix="estoque-tests-")
+os.environ["DATABASE_PATH"] = os.path.join(_tmp, "test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ["DB_READ_POOL_SIZE"] = "2"  # pool pequeno: testes de concorrência o esgotam fácil
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["LOGIN_THROTTLE_BACKEND"] = "off"
+
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+from models.models import Base, Location, Product, StockLevel, User, db
+from routes.dependencies import SessionLocal
+from security.auth import create_token
+
+Base.metadata.create_all(db)
+
+_session = SessionLocal()
+_session.add(Location("MAIN", "", "Default location"))
+_session.commit()
+_session.close()
+
+_counter = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from main import app
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def session():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def admin():
+    session = SessionLocal()
+    user = User("admin", "Admin", "admin@tests.local", "x", admin=True)
+    session.add(user)
+    session.commit()
+    user_id = user.id
+    session.close()
+    return user_id
+
+
+@pytest.fixture(scope="session")
+def headers(admin):
+    return {"Authorization": f"Bearer {create_token(admin)}"}
+
+
+@pytest.fixture
+def make_product(session):
+    """Cria um produto (e, se pedido, seu nível na localização padrão)"""
+    def make(price=10.0, quantity=None, location_id=1):
+        product = Product(f"Produto {next(_counter)}", "teste", price, None, None)
+        session.add(product)
+        session.flush()
+        if quantity is not None:
+            session.add(StockLevel(product.id, location_id, current_quantity=quantity))
+        session.commit()
+        return product.id
+    return make
@@ -0,0 +1,35 @@
+import gzip
+
+
+def test_gzip_export_is_not_compressed_again(client, headers, make_product):
+    make_product()
+    for accept_encoding in ("br", "gzip"):
+        response = client.get(
+            "/product/export?gzip=true",
+            headers={**headers, "Accept-Encoding": accept_encoding}
+        )
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"] == "application/gzip"
+        assert "content-encoding" not in response.headers
+        assert gzip.decompress(response.content).startswith(b"id,name")
+
+
+def test_json_lists_are_compressed(client, headers, make_product):
+    for _ in range(30):
+        make_product(quantity=1)
+    for accept_encoding in ("br", "gzip"):
+        response = client.get("/stock/levels", headers={**headers, "Accept-Encoding": accept_encoding})
+        assert response.status_code == 200, response.text
+        assert response.headers["content-encoding"] == accept_encoding
+        assert len(response.json()) >= 30
+
+
+def test_streamed_export_is_compressed_per_chunk(client, headers, make_product):
+    for _ in range(30):
+        make_product()
+    for accept_encoding in ("br", "gzip"):
+        response = client.get("/product/export", headers={**headers, "Accept-Encoding": accept_encoding})
+        assert response.status_code == 200, response.text
+        assert response.headers["content-encoding"] == accept_encoding
+        assert response.text.startswith("id,name")
+        assert len(response.text.splitlines()) >= 31
@@ -0,0 +1,44 @@
+import asyncio
+
+import httpx
+import pytest
+
+from models.models import StockLevel, read_db
+from services.group_commit import movement_writer
+
+# Mais requisições simultâneas do que conexões no pool de leitura
+CONCURRENT_REQUESTS = read_db.pool.size() * 2 + 8
+
+
+@pytest.fixture
+def group_commit():
+    movement_writer.enabled = True
+    yield movement_writer
+    movement_writer.enabled = False
+
+
+def test_concurrent_movements_do_not_exhaust_the_pool(app, headers, make_product, session, group_commit):
+    product_id = make_product(quantity=0)
+
+    async def run():
+        await group_commit.start()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                requests = [
+                    client.post(
+                        "/stock/movements",
+                        json={"product_id": product_id, "movement_type": "in", "quantity": 1},
+                        headers=headers
+                    )
+                    for _ in range(CONCURRENT_REQUESTS)
+                ]
+                return await asyncio.wait_for(asyncio.gather(*requests), timeout=20)
+        finally:
+            await group_commit.stop()
+
+    responses = asyncio.run(run())
+
+    assert [response.status_code for response in responses] == [201] * CONCURRENT_REQUESTS
+    level = session.query(StockLevel).filter_by(product_id=product_id).one()
+    assert level.current_quantity == CONCURRENT_REQUESTS
@@ -0,0 +1,80 @@
+import uuid
+
+from models.models import StockLevel, StockMovement
+from routes.dependencies import SessionLocal
+from schemas.stock_schema import StockMovementCreate, StockMovementGet
+from services.idempotency import IdempotentRequest
+from services.stock import apply_stock_movement
+
+SCOPE = "POST /stock/movements"
+
+
+def _level(session, product_id):
+    session.expire_all()
+    return session.query(StockLevel).filter_by(product_id=product_id, location_id=1).one().current_quantity
+
+
+def _movements(session, product_id):
+    return session.query(StockMovement).filter_by(product_id=product_id).count()
+
+
+def test_repeated_key_replays_the_first_response(client, headers, make_product, session):
+    product_id = make_product(quantity=10)
+    body = {"product_id": product_id, "movement_type": "in", "quantity": 3}
+    key = {**headers, "Idempotency-Key": uuid.uuid4().hex}
+
+    first = client.post("/stock/movements", json=body, headers=key)
+    second = client.post("/stock/movements", json=body, headers=key)
+
+    assert first.status_code == second.status_code == 201, second.text
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert _level(session, product_id) == 13
+    assert _movements(session, product_id) == 1
+
+
+def test_same_key_with_a_different_body_conflicts(client, headers, make_product, session):
+    product_id = make_product(quantity=10)
+    key = {**headers, "Idempotency-Key": uuid.uuid4().hex}
+
+    first = client.post("/stock/movements", headers=key, json={"product_id": product_id, "movement_type": "in", "quantity": 3})
+    second = client.post("/stock/movements", headers=key, json={"product_id": product_id, "movement_type": "in", "quantity": 4})
+
+    assert first.status_code == 201, first.text
+    assert second.status_code == 422
+    assert second.json()["detail"] == "Idempotency-Key already used with a different request"
+    assert _level(session, product_id) == 13
+
+
+def test_concurrent_retry_loses_the_insert_race_and_replays(make_product, admin, session):
+    product_id = make_product(quantity=10)
+    payload = StockMovementCreate(product_id=product_id, movement_type="in", quantity=5)
+    key = uuid.uuid4().hex
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        request_a = IdempotentRequest(first, key, admin, SCOPE)
+        request_b = IdempotentRequest(second, key, admin, SCOPE)
+        # As duas tentativas procuram a chave antes de qualquer gravação
+        assert request_a.replay(payload) is None
+        assert request_b.replay(payload) is None
+
+        movement = apply_stock_movement(first, payload, admin)
+        request_a.save(201, StockMovementGet.model_validate(movement))
+        assert request_a.commit() is None
+        first.refresh(movement)
+
+        # A segunda bate na PK (key, user_id): desfaz a própria movimentação e devolve a da primeira
+        duplicate = apply_stock_movement(second, payload, admin)
+        request_b.save(201, StockMovementGet.model_validate(duplicate))
+        replay = request_b.commit()
+    finally:
+        first.close()
+        second.close()
+
+    assert replay is not None
+    assert replay.status_code == 201
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert b'"id":%d' % movement.id in replay.body
+    assert _level(session, product_id) == 15
+    assert _movements(session, product_id) == 1
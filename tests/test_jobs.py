@@ -0,0 +1,54 @@
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from models.models import Job
+from routes.dependencies import SessionLocal
+from services.jobs import JobQueue, job_handler
+
+
+def _pending_job(session, kind):
+    job = Job(id=uuid.uuid4().hex, kind=kind)
+    session.add(job)
+    session.commit()
+    return job.id
+
+
+def _status(job_id):
+    session = SessionLocal()
+    try:
+        return session.get(Job, job_id).status
+    finally:
+        session.close()
+
+
+@job_handler("test_ok")
+def _ok(ctx):
+    return {"done": True}
+
+
+@job_handler("test_goes_stale")
+def _goes_stale(ctx):
+    # Enquanto roda, outro worker recolhe o job como morto (heartbeat atrasado)
+    session = SessionLocal()
+    session.execute(update(Job).where(Job.id == ctx.job_id).values(heartbeat_at=datetime.now() - timedelta(hours=1)))
+    session.commit()
+    session.close()
+    assert JobQueue().fail_stale_jobs() >= 1
+    return {"done": True}
+
+
+def test_job_completes(session):
+    job_id = _pending_job(session, "test_ok")
+    JobQueue()._run(job_id)
+    assert _status(job_id) == "completed"
+
+
+def test_stale_failed_job_is_not_rewritten_as_completed(session, caplog):
+    job_id = _pending_job(session, "test_goes_stale")
+    with caplog.at_level(logging.WARNING, logger="services.jobs"):
+        JobQueue()._run(job_id)
+    assert _status(job_id) == "failed"
+    assert "no longer running on this worker" in caplog.text
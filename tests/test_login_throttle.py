@@ -0,0 +1,93 @@
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import routes.auth_routes as auth_routes
+from models.models import LoginFailure, User
+from security.security import bcrypt_context
+from services.login_throttle import DatabaseFailureStore, LoginThrottle, MemoryFailureStore
+
+PASSWORD = "senha-correta"
+
+
+@pytest.fixture
+def user_email(session):
+    email = f"{uuid.uuid4().hex[:12]}@throttle.local"
+    session.add(User("packer", "Throttle", email, bcrypt_context.hash(PASSWORD)))
+    session.commit()
+    return email
+
+
+@pytest.fixture
+def throttle(monkeypatch):
+    """Throttle em memória no lugar do global (os testes rodam com o backend off)"""
+    throttle = LoginThrottle(MemoryFailureStore(), window=900, max_per_email=3, max_per_ip=10)
+    monkeypatch.setattr(auth_routes, "login_throttle", throttle)
+    return throttle
+
+
+def _login(client, email, password):
+    return client.post("/auth/login", data={"username": email, "password": password})
+
+
+def _request(host="10.0.0.1"):
+    return Request({"type": "http", "headers": [], "client": (host, 50000)})
+
+
+def test_blocks_with_retry_after_after_n_failures(client, throttle, user_email):
+    for _ in range(3):
+        assert _login(client, user_email, "errada").status_code == 401
+
+    # Bloqueado antes do bcrypt: nem a senha certa passa
+    response = _login(client, user_email, PASSWORD)
+    assert response.status_code == 429
+    assert 0 < int(response.headers["Retry-After"]) <= 900
+
+
+def test_success_clears_only_the_email_key(client, throttle, user_email):
+    for _ in range(2):
+        assert _login(client, user_email, "errada").status_code == 401
+    assert _login(client, user_email, PASSWORD).status_code == 200
+
+    now = time.time()
+    assert throttle.store.recent(f"email:{user_email}", now, 900) == []
+    assert len(throttle.store.recent("ip:testclient", now, 900)) == 2
+
+    # O email volta a ter as 3 tentativas
+    for _ in range(2):
+        assert _login(client, user_email, "errada").status_code == 401
+    assert _login(client, user_email, PASSWORD).status_code == 200
+
+
+def test_ip_limit_blocks_other_emails(client, monkeypatch, user_email):
+    throttle = LoginThrottle(MemoryFailureStore(), window=900, max_per_email=10, max_per_ip=3)
+    monkeypatch.setattr(auth_routes, "login_throttle", throttle)
+    for attempt in range(3):
+        assert _login(client, f"outro{attempt}@throttle.local", "errada").status_code == 401
+    assert _login(client, user_email, PASSWORD).status_code == 429
+
+
+def test_database_backend_is_shared_between_workers(session):
+    email = f"{uuid.uuid4().hex[:12]}@throttle.local"
+    # Dois workers, cada um com seu LoginThrottle sobre a mesma tabela
+    worker_a = LoginThrottle(DatabaseFailureStore(), window=900, max_per_email=3, max_per_ip=100)
+    worker_b = LoginThrottle(DatabaseFailureStore(), window=900, max_per_email=3, max_per_ip=100)
+
+    for _ in range(3):
+        worker_a.failure(_request(), email)
+    assert session.query(LoginFailure).filter_by(key=f"email:{email}").count() == 3
+
+    for worker in (worker_a, worker_b):
+        with pytest.raises(HTTPException) as error:
+            worker.check(_request(), email)
+        assert error.value.status_code == 429
+        assert int(error.value.headers["Retry-After"]) > 0
+
+    # Login ok no worker B libera o email também no A (sem bloqueio guardado em memória)
+    worker_b.success(_request(), email)
+    worker_a.check(_request(), email)
+    assert session.query(LoginFailure).filter_by(key=f"email:{email}").count() == 0
+    assert session.query(LoginFailure).filter_by(key="ip:10.0.0.1").count() >= 3
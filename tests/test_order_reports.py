@@ -0,0 +1,21 @@
+from datetime import date, datetime
+
+from models.models import Order
+from services.order_reports import order_report, record_order
+
+
+def test_rollup_and_live_groupings_count_the_same_orders(make_product, admin, session):
+    product_id = make_product()
+    for created_at in (datetime(2026, 3, 2, 9), datetime(2026, 3, 2, 18), datetime(2026, 3, 4, 12)):
+        order = Order("PENDING", admin, product_id, 2, 20.0, created_at=created_at)
+        session.add(order)
+        record_order(session, order)
+    session.commit()
+
+    period = {"start": date(2026, 3, 1), "end": date(2026, 3, 5)}
+    by_day = order_report(session, "day", **period)
+    by_user = order_report(session, "user", **period)
+
+    assert [(row["key"], row["order_count"]) for row in by_day] == [("2026-03-02", 2), ("2026-03-04", 1)]
+    assert sum(row["order_count"] for row in by_user) == 3
+    assert sum(row["revenue"] for row in by_user) == sum(row["revenue"] for row in by_day) == 60.0
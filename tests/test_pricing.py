@@ -0,0 +1,111 @@
+import uuid
+
+import pytest
+
+from models.models import CacheVersion, Category, Product, StockValueRollup, Supplier
+
+
+@pytest.fixture
+def catalog(session):
+    """Duas categorias x dois fornecedores, um produto por par e um extra"""
+    tag = uuid.uuid4().hex[:8]
+    category_a, category_b = Category(f"Categoria A {tag}", ""), Category(f"Categoria B {tag}", "")
+    supplier_x, supplier_y = Supplier(f"Fornecedor X {tag}", ""), Supplier(f"Fornecedor Y {tag}", "")
+    session.add_all([category_a, category_b, supplier_x, supplier_y])
+    session.flush()
+    products = {
+        "ax": Product(f"AX {tag}", "", 10.0, category_a.id, supplier_x.id),
+        "ay": Product(f"AY {tag}", "", 20.0, category_a.id, supplier_y.id),
+        "bx": Product(f"BX {tag}", "", 30.0, category_b.id, supplier_x.id),
+        "by": Product(f"BY {tag}", "", 40.0, category_b.id, supplier_y.id),
+        "other": Product(f"Outro {tag}", "", 50.0, category_b.id, supplier_y.id),
+    }
+    session.add_all(products.values())
+    session.commit()
+    return {
+        "category_a": category_a.id, "supplier_x": supplier_x.id,
+        **{key: product.id for key, product in products.items()}
+    }
+
+
+def _prices_and_versions(session, ids):
+    session.expire_all()
+    return {
+        product_id: (price, version)
+        for product_id, price, version in session.query(Product.id, Product.price, Product.version).filter(Product.id.in_(ids))
+    }
+
+
+def _generation(session, name):
+    session.expire_all()
+    row = session.get(CacheVersion, name)
+    return row.generation if row else 0
+
+
+def _category_value(session, category_id):
+    session.expire_all()
+    rollup = session.get(StockValueRollup, ("category", category_id))
+    return rollup.total_value if rollup else 0
+
+
+def test_rules_and_items_update_prices_versions_and_rollups(client, headers, session, catalog):
+    # 10 unidades do AX em estoque: o reajuste dele muda o valor do estoque
+    response = client.post("/stock/movements", headers=headers, json={
+        "product_id": catalog["ax"], "movement_type": "in", "quantity": 10
+    })
+    assert response.status_code == 201, response.text
+
+    ids = [catalog[key] for key in ("ax", "ay", "bx", "by", "other")]
+    before = _prices_and_versions(session, ids)
+    value_before = _category_value(session, catalog["category_a"])
+    generation_before = _generation(session, "products")
+
+    response = client.patch("/product/prices", headers=headers, json={
+        "rules": [
+            {"category_id": catalog["category_a"], "percent": 10},
+            {"supplier_id": catalog["supplier_x"], "percent": -50},
+        ],
+        "items": [
+            {"id": catalog["by"], "price": 45},
+            {"id": catalog["other"], "price": 50},  # mesmo preço: unchanged
+            {"id": 999999999, "price": 1},
+        ],
+    })
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "updated": 4,
+        "unchanged": 1,
+        "missing": [999999999],
+        "stock_value_delta": -45.0,  # 10 x (5.50 - 10.00)
+    }
+
+    after = _prices_and_versions(session, ids)
+    # Regras se acumulam (categoria A +10%, fornecedor X -50%); items prevalecem
+    assert {product_id: price for product_id, (price, _) in after.items()} == {
+        catalog["ax"]: 5.5,
+        catalog["ay"]: 22.0,
+        catalog["bx"]: 15.0,
+        catalog["by"]: 45.0,
+        catalog["other"]: 50.0,
+    }
+    for product_id in ids:
+        bump = 0 if product_id == catalog["other"] else 1
+        assert after[product_id][1] == before[product_id][1] + bump
+
+    # Variação gravada no rollup da categoria e caches de products invalidados no commit
+    assert _category_value(session, catalog["category_a"]) == pytest.approx(value_before - 45.0)
+    assert _generation(session, "products") > generation_before
+
+
+def test_stale_if_match_after_bulk_update_conflicts(client, headers, session, catalog):
+    product = client.get(f"/product/{catalog['ay']}", headers=headers)
+    assert product.status_code == 200, product.text
+    etag = product.headers["ETag"]
+
+    response = client.patch("/product/prices", headers=headers, json={"items": [{"id": catalog["ay"], "price": 21}]})
+    assert response.status_code == 200, response.text
+
+    response = client.patch(
+        f"/product/{catalog['ay']}", headers={**headers, "If-Match": etag}, json={"price": 25}
+    )
+    assert response.status_code == 409
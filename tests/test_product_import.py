@@ -0,0 +1,51 @@
+from sqlalchemy import func, select
+
+from models.models import Product
+
+CSV_HEADER = "name,description,price,category_id,supplier_id\n"
+
+
+def _import(client, headers, body, **params):
+    response = client.post(
+        "/product/import",
+        params={"format": "csv", **params},
+        content=body.encode(),
+        headers={**headers, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _count(session, *names):
+    return session.scalar(select(func.count()).select_from(Product).where(Product.name.in_(names)))
+
+
+def test_dry_run_reports_invalid_and_duplicate_rows_without_writing(client, headers, session):
+    created = _import(client, headers, CSV_HEADER + "Cadeira Importada,,25.5,,\n")
+    assert (created["created"], created["failed"]) == (1, 0)
+
+    body = CSV_HEADER + "\n".join([
+        "mesa   importada,Mesa,100,,",        # 1: válida (nome normalizado para Mesa Importada)
+        "Cadeira Importada,,30,,",            # 2: já cadastrada
+        "Mesa Importada,,90,,",               # 3: repetida no arquivo
+        "X,,10,,",                            # 4: nome curto demais
+        "Banco Importado,,-5,,",              # 5: preço inválido
+        "Sofa Importado,,50,999999,",         # 6: categoria inexistente
+    ]) + "\n"
+    report = _import(client, headers, body, dry_run="true")
+
+    assert report["dry_run"] is True
+    assert (report["total_rows"], report["created"], report["failed"]) == (6, 1, 5)
+    errors = {error["row"]: error["errors"] for error in report["errors"]}
+    assert set(errors) == {2, 3, 4, 5, 6}
+    assert errors[2] == ["Product already registered, try another name"]
+    assert errors[3] == ["Duplicated name in import file"]
+    assert errors[4][0].startswith("name:")
+    assert errors[5][0].startswith("price:")
+    assert errors[6] == ["Category not found"]
+    # dry_run não grava nada, nem a linha válida
+    assert _count(session, "Mesa Importada", "Banco Importado", "Sofa Importado") == 0
+
+    report = _import(client, headers, body)
+    assert (report["created"], report["failed"]) == (1, 5)
+    assert _count(session, "Mesa Importada") == 1
@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+from models.models import CacheVersion, StockLevel
+from services.purchasing import purchase_suggestions
+
+# Outro worker: processo separado, com os próprios contadores em memória
+OTHER_WORKER = """
+import sys
+from models.models import StockLevel
+from routes.dependencies import SessionLocal
+session = SessionLocal()
+level = session.get(StockLevel, int(sys.argv[1]))
+level.current_quantity = 4
+session.commit()
+"""
+
+
+def _suggested(session, product_id):
+    items = [item for supplier in purchase_suggestions(session) for item in supplier["items"]]
+    return {item["product_id"]: item["suggested_quantity"] for item in items}.get(product_id)
+
+
+def test_commit_bumps_shared_generation(make_product, session):
+    product_id = make_product()
+    before = session.get(CacheVersion, "stock_levels")
+    before = before.generation if before else 0
+    session.add(StockLevel(product_id, 1, current_quantity=2, minimum_quantity=5))
+    session.commit()
+    assert session.get(CacheVersion, "stock_levels").generation == before + 1
+
+
+def test_cache_sees_writes_from_another_process(make_product, session):
+    product_id = make_product()
+    level = StockLevel(product_id, 1, current_quantity=2, minimum_quantity=5, maximum_quantity=10)
+    session.add(level)
+    session.commit()
+    assert _suggested(session, product_id) == 8
+    assert _suggested(session, product_id) == 8  # do cache
+
+    subprocess.run([sys.executable, "-c", OTHER_WORKER, str(level.id)], check=True)
+
+    assert _suggested(session, product_id) == 6
@@ -0,0 +1,92 @@
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+import services.rate_limit as rate_limit
+from services.rate_limit import InFlightLimiter, LoadShedding, RateLimit, in_flight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_refills_at_rate(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    limiter = RateLimit("test_bucket", "2/3")
+    key = (1, "GET", "/test")
+
+    assert [limiter._take(key) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter._take(key) == 0.5  # 2 tokens/s: meio segundo até o próximo
+    # Outro usuário tem o próprio bucket
+    assert limiter._take((2, "GET", "/test")) == 0.0
+
+    clock.now += 0.5
+    assert limiter._take(key) == 0.0
+    assert limiter._take(key) > 0
+    assert (limiter.allowed, limiter.limited) == (5, 2)
+
+
+def test_exceeding_the_limit_returns_429_with_retry_after(client, headers, monkeypatch):
+    limiter = RateLimit.instances["stock"]
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(limiter, "rate", 0.1)
+    monkeypatch.setattr(limiter, "burst", 2)
+    monkeypatch.setattr(limiter, "_buckets", {})
+    limited = limiter.limited
+
+    statuses = [client.get("/stock/levels", headers=headers).status_code for _ in range(2)]
+    response = client.get("/stock/levels", headers=headers)
+
+    assert statuses == [200, 200]
+    assert response.status_code == 429
+    assert 0 < int(response.headers["Retry-After"]) <= 10
+    # Outra rota do mesmo router tem bucket próprio
+    assert client.get("/stock/alerts", headers=headers).status_code == 200
+
+    metrics = client.get("/metrics", headers=headers)
+    assert metrics.status_code == 200, metrics.text
+    assert metrics.json()["rate_limits"]["stock"]["limited"] == limited + 1
+
+
+def test_requests_over_the_in_flight_limit_are_shed(client, headers, monkeypatch):
+    # Teto já ocupado por outros requests
+    monkeypatch.setattr(in_flight, "limit", 4)
+    monkeypatch.setattr(in_flight, "current", 4)
+    shed = in_flight.shed
+
+    response = client.get("/stock/levels", headers=headers)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(rate_limit.SHED_RETRY_AFTER)
+
+    # /metrics continua respondendo e mostra o corte
+    metrics = client.get("/metrics", headers=headers)
+    assert metrics.status_code == 200
+    assert metrics.json()["in_flight"]["shed"] == shed + 1
+    assert in_flight.current == 4
+
+
+def test_streaming_response_holds_its_slot_until_the_body_ends():
+    limiter = InFlightLimiter(5)
+    seen = []
+
+    async def export(request):
+        async def rows():
+            for row in range(3):
+                seen.append(limiter.current)
+                yield f"{row}\n"
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    app = LoadShedding(Starlette(routes=[Route("/export", export)]), limiter=limiter)
+    with TestClient(app) as client:
+        response = client.get("/export")
+
+    assert response.text == "0\n1\n2\n"
+    assert seen == [1, 1, 1]
+    assert limiter.current == 0
+    assert limiter.peak == 1
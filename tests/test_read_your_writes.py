@@ -0,0 +1,25 @@
+import routes.dependencies as dependencies
+
+
+def test_lookup_post_does_not_pin_client_to_primary(client, headers, make_product, monkeypatch):
+    monkeypatch.setattr(dependencies, "READ_REPLICA_URL", "sqlite:///replica.db")
+    product_id = make_product(quantity=4)
+
+    response = client.post(
+        "/stock/levels/lookup",
+        json={"product_ids": [product_id]},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert dependencies.STICKY_COOKIE not in response.cookies
+    assert headers["Authorization"] not in dependencies._recent_writes
+
+    response = client.post(
+        "/stock/movements",
+        json={"product_id": product_id, "movement_type": "in", "quantity": 1},
+        headers=headers
+    )
+    assert response.status_code == 201, response.text
+    assert dependencies.STICKY_COOKIE in response.cookies
+    client.cookies.clear()
+    dependencies._recent_writes.pop(headers["Authorization"], None)
@@ -0,0 +1,63 @@
+import json
+import uuid
+
+from sqlalchemy import select, update
+
+import services.reconciliation as reconciliation
+from models.models import Job, StockLevel, StockMovement
+from routes.dependencies import SessionLocal
+from services.jobs import JobQueue
+
+
+def _run_fix(session):
+    job = Job(id=uuid.uuid4().hex, kind="stock_reconciliation", params=json.dumps({"fix": True}))
+    session.add(job)
+    session.commit()
+    JobQueue()._run(job.id)
+    session.expire_all()
+    job = session.get(Job, job.id)
+    assert job.status == "completed", job.error
+    return json.loads(job.result)
+
+
+def test_fix_in_chunks_reports_rows_changed_since_the_scan(session, admin, make_product, monkeypatch):
+    # Níveis sem movimentações (saldo esperado 0) e um produto com movimentação e sem nível
+    drifted = [make_product(quantity=5) for _ in range(3)]
+    changed = make_product(quantity=7)
+    without_level = make_product()
+    session.add(StockMovement(without_level, "in", 4, admin, 1))
+    session.commit()
+    ours = set(drifted) | {changed, without_level}
+
+    real_find = reconciliation.find_stock_drift
+
+    def find_then_concurrent_write(job_session):
+        drift, missing = real_find(job_session)
+        drift = [row for row in drift if row.product_id in ours]
+        missing = [row for row in missing if row.product_id in ours]
+        # Outro writer mexe em um nível e cria o que faltava depois do levantamento
+        writer = SessionLocal()
+        writer.execute(
+            update(StockLevel)
+            .where(StockLevel.product_id == changed)
+            .values(current_quantity=8, version=StockLevel.version + 1)
+        )
+        writer.add(StockLevel(without_level, 1, current_quantity=4))
+        writer.commit()
+        writer.close()
+        return drift, missing
+
+    monkeypatch.setattr(reconciliation, "FIX_CHUNK_SIZE", 2)
+    monkeypatch.setattr(reconciliation, "find_stock_drift", find_then_concurrent_write)
+    result = _run_fix(session)
+
+    assert result["drift_count"] == 4
+    assert result["missing_count"] == 1
+    assert result["fixed"] == 3
+    assert {(item["product_id"], item["stock_level_id"] is None) for item in result["skipped"]} == {
+        (changed, False), (without_level, True)
+    }
+    quantities = dict(session.execute(
+        select(StockLevel.product_id, StockLevel.current_quantity).where(StockLevel.product_id.in_(ours))
+    ).all())
+    assert quantities == {**{product_id: 0 for product_id in drifted}, changed: 8, without_level: 4}
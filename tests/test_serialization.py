@@ -0,0 +1,49 @@
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import List, Optional
+
+import orjson
+from pydantic import BaseModel, Field, TypeAdapter
+
+from services.serialization import dumps_rows, list_response
+
+
+class Kind(str, Enum):
+    IN = "in"
+    OUT = "out"
+
+
+class RowGet(BaseModel):
+    id: int
+    kind: Kind
+    price: float
+    quantity: int = Field(..., ge=0)
+    created_at: datetime
+    note: Optional[str]
+    cost: Decimal
+
+
+KEYS = ["id", "kind", "price", "quantity", "created_at", "note", "cost", "extra"]
+ROWS = [
+    (1, "in", 2, 3, datetime(2026, 1, 2, 3, 4, 5, 600000), None, Decimal("1.50"), "ignorada"),
+    (2, "out", 9.5, 0, datetime(2026, 1, 3), "obs", "2.25", "ignorada"),
+]
+
+
+def test_fast_path_matches_response_model_output():
+    expected = TypeAdapter(List[RowGet]).dump_json(
+        [RowGet.model_validate(dict(zip(KEYS, row))) for row in ROWS]
+    )
+    assert orjson.loads(dumps_rows(RowGet, ROWS, KEYS)) == orjson.loads(expected)
+
+
+def test_fields_subset_keeps_schema_types():
+    body = orjson.loads(dumps_rows(RowGet, ROWS, KEYS, ["id", "price"]))
+    assert body == [{"id": 1, "price": 2.0}, {"id": 2, "price": 9.5}]
+    assert isinstance(body[0]["price"], float)
+
+
+def test_fast_path_is_opt_in_per_route():
+    assert list_response(RowGet, ROWS, KEYS)[0]["extra"] == "ignorada"  # dicts para o response_model
+    assert list_response(RowGet, ROWS, KEYS, fast=True).media_type == "application/json"
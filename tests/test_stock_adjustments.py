@@ -0,0 +1,88 @@
+from models.models import ProductStockTotal, StockLevel
+from routes.dependencies import SessionLocal
+from services.stock import adjust_level, find_stock_level
+
+
+def test_interleaved_adjustments_are_both_applied(make_product, session):
+    product_id = make_product(quantity=10)
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        # Os dois workers leem o nível (quantidade 10) antes de qualquer escrita
+        level_a = find_stock_level(first, product_id, 1)
+        level_b = find_stock_level(second, product_id, 1)
+        assert level_a.current_quantity == level_b.current_quantity == 10
+
+        assert adjust_level(first, level_a, 5)
+        first.commit()
+        assert adjust_level(second, level_b, -3)
+        second.commit()
+    finally:
+        first.close()
+        second.close()
+
+    level = session.query(StockLevel).filter_by(product_id=product_id).one()
+    assert level.current_quantity == 12
+    assert session.get(ProductStockTotal, product_id).total_quantity == 2  # só os deltas (nível criado direto)
+
+
+def test_out_adjustment_rechecks_stock_at_update(make_product, session):
+    product_id = make_product(quantity=10)
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        level_a = find_stock_level(first, product_id, 1)
+        level_b = find_stock_level(second, product_id, 1)
+
+        # Ambos viram 10 disponíveis; só a primeira saída de 8 cabe
+        assert adjust_level(first, level_a, -8, require_available=True)
+        first.commit()
+        assert not adjust_level(second, level_b, -8, require_available=True)
+        second.rollback()
+    finally:
+        first.close()
+        second.close()
+
+    assert session.query(StockLevel).filter_by(product_id=product_id).one().current_quantity == 2
+
+
+def test_movements_on_same_level_do_not_conflict(client, headers, make_product, session):
+    product_id = make_product(quantity=0)
+    for movement_type, quantity in (("in", 5), ("in", 3), ("out", 2)):
+        response = client.post(
+            "/stock/movements",
+            json={"product_id": product_id, "movement_type": movement_type, "quantity": quantity},
+            headers=headers
+        )
+        assert response.status_code == 201, response.text
+
+    level = session.query(StockLevel).filter_by(product_id=product_id).one()
+    assert level.current_quantity == 6
+    assert level.version == 4
+
+    response = client.post(
+        "/stock/movements",
+        json={"product_id": product_id, "movement_type": "out", "quantity": 7},
+        headers=headers
+    )
+    assert response.status_code == 400
+
+
+def test_level_edit_with_stale_version_conflicts_after_movement(client, headers, make_product, session):
+    product_id = make_product(quantity=4)
+    level_id = session.query(StockLevel.id).filter_by(product_id=product_id).scalar()
+    etag = client.get(f"/stock/levels/{level_id}", headers=headers).headers["ETag"]
+
+    response = client.post(
+        "/stock/movements",
+        json={"product_id": product_id, "movement_type": "in", "quantity": 1},
+        headers=headers
+    )
+    assert response.status_code == 201
+
+    body = {"current_quantity": 20, "minimum_quantity": 0, "maximum_quantity": 100, "location": None}
+    response = client.put(f"/stock/levels/{level_id}", json=body, headers={**headers, "If-Match": etag})
+    assert response.status_code == 409
+
+    current = client.get(f"/stock/levels/{level_id}", headers=headers)
+    response = client.put(f"/stock/levels/{level_id}", json=body, headers={**headers, "If-Match": current.headers["ETag"]})
+    assert response.status_code == 200, response.text
+    assert response.json()["current_quantity"] == 20
@@ -0,0 +1,44 @@
+from models.models import StockLevel
+
+# Regressão: o handler GET /levels/{stock_id} (get_stock_level) sobrescrevia o
+# helper de services.stock de mesmo nome importado em stock_routes, e estes
+# três endpoints chamavam a corrotina do handler em vez da consulta.
+
+
+def test_create_stock_level_and_reject_duplicate(client, headers, make_product):
+    product_id = make_product()
+    body = {"product_id": product_id, "current_quantity": 7, "minimum_quantity": 1, "maximum_quantity": 50}
+
+    response = client.post("/stock/levels", json=body, headers=headers)
+    assert response.status_code == 201, response.text
+    assert response.json()["current_quantity"] == 7
+    assert response.json()["location_id"] == 1
+
+    response = client.post("/stock/levels", json=body, headers=headers)
+    assert response.status_code == 409
+
+
+def test_get_stock_level_by_product(client, headers, make_product):
+    product_id = make_product(quantity=3)
+
+    response = client.get(f"/stock/levels/product/{product_id}", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["product_id"] == product_id
+    assert response.json()["current_quantity"] == 3
+
+    response = client.get(f"/stock/levels/product/{make_product()}", headers=headers)
+    assert response.status_code == 404
+
+
+def test_delete_stock_movement_reverts_level(client, headers, make_product, session):
+    product_id = make_product(quantity=2)
+    response = client.post(
+        "/stock/movements",
+        json={"product_id": product_id, "movement_type": "in", "quantity": 5},
+        headers=headers
+    )
+    assert response.status_code == 201, response.text
+
+    response = client.delete(f"/stock/movements/{response.json()['id']}", headers=headers)
+    assert response.status_code == 204, response.text
+    assert session.query(StockLevel).filter_by(product_id=product_id).one().current_quantity == 2
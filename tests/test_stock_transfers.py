@@ -0,0 +1,98 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from models.models import Location, StockLevel
+from routes.dependencies import SessionLocal
+from schemas.stock_schema import StockTransferItem
+from services.stock import apply_stock_transfers
+
+
+@pytest.fixture
+def second_location(session):
+    location = session.query(Location).filter_by(warehouse="BACK").first()
+    if location is None:
+        location = Location("BACK", "", "Segunda localização")
+        session.add(location)
+        session.commit()
+    return location.id
+
+
+def _quantities(session, product_id):
+    session.expire_all()
+    return {
+        level.location_id: level.current_quantity
+        for level in session.query(StockLevel).filter_by(product_id=product_id)
+    }
+
+
+def test_interleaved_transfers_do_not_take_the_same_stock(make_product, second_location, session, admin):
+    product_id = make_product(quantity=10)
+    item = StockTransferItem(product_id=product_id, from_location_id=1, to_location_id=second_location, quantity=8)
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        # As duas sessões leem o nível (10 disponíveis) antes de transferir
+        assert first.query(StockLevel).filter_by(product_id=product_id).one().current_quantity == 10
+        assert second.query(StockLevel).filter_by(product_id=product_id).one().current_quantity == 10
+
+        apply_stock_transfers(first, [item], admin)
+        first.commit()
+        with pytest.raises(HTTPException) as error:
+            apply_stock_transfers(second, [item], admin)
+        second.rollback()
+    finally:
+        first.close()
+        second.close()
+
+    assert error.value.status_code == 400
+    assert "Available: 2" in error.value.detail
+    assert _quantities(session, product_id) == {1: 2, second_location: 8}
+
+
+def test_failed_item_rolls_back_the_whole_batch(client, headers, make_product, second_location, session):
+    product_id = make_product(quantity=5)
+    response = client.post("/stock/transfers", headers=headers, json={"items": [
+        {"product_id": product_id, "from_location_id": 1, "to_location_id": second_location, "quantity": 4},
+        {"product_id": product_id, "from_location_id": 1, "to_location_id": second_location, "quantity": 4},
+    ]})
+    assert response.status_code == 400, response.text
+    assert "transfer 1" in response.json()["detail"]
+    assert _quantities(session, product_id) == {1: 5}
+
+    response = client.post("/stock/transfers", headers=headers, json={"items": [
+        {"product_id": product_id, "from_location_id": 1, "to_location_id": second_location, "quantity": 4},
+        {"product_id": product_id, "from_location_id": second_location, "to_location_id": 1, "quantity": 1},
+    ]})
+    assert response.status_code == 201, response.text
+    assert len(response.json()["movements"]) == 4
+    assert _quantities(session, product_id) == {1: 2, second_location: 3}
+
+
+def test_levels_are_updated_once_each_in_key_order(make_product, second_location, session, admin):
+    first_product = make_product(quantity=5)
+    second_product = make_product(quantity=5)
+    items = [
+        StockTransferItem(product_id=second_product, from_location_id=1, to_location_id=second_location, quantity=2),
+        StockTransferItem(product_id=first_product, from_location_id=1, to_location_id=second_location, quantity=3),
+        StockTransferItem(product_id=second_product, from_location_id=second_location, to_location_id=1, quantity=1),
+    ]
+    updated = []
+
+    def record_level_update(state):
+        if state.is_update and state.statement.table.name == "stock_levels":
+            params = state.statement.compile().params
+            updated.append((params["product_id_1"], params["location_id_1"]))
+
+    writer = SessionLocal()
+    event.listen(writer, "do_orm_execute", record_level_update)
+    try:
+        apply_stock_transfers(writer, items, admin)
+        writer.commit()
+    finally:
+        writer.close()
+
+    # Saldo líquido por nível, travados em ordem de (product_id, location_id)
+    assert updated == sorted(updated)
+    assert len(updated) == len(set(updated))
+    assert _quantities(session, first_product) == {1: 2, second_location: 3}
+    assert _quantities(session, second_product) == {1: 4, second_location: 1}
@@ -0,0 +1,70 @@
+import pytest
+
+from models.models import User
+
+
+@pytest.fixture(scope="module")
+def stored_users():
+    """Usuários gravados como no banco distribuído: tudo em minúsculas"""
+    from routes.dependencies import SessionLocal
+    session = SessionLocal()
+    users = [
+        User("packer", "joao", "joao.list@tests.local", "x"),
+        User("packer", "joana silva", "joana.list@tests.local", "x"),
+        User("logistics_coordinator", "maria", "maria.list@tests.local", "x"),
+        User("Conferente", "JOÃO Pereira", "Joao.Pereira@Tests.local", "x"),
+    ]
+    session.add_all(users)
+    session.commit()
+    ids = [user.id for user in users]
+    session.close()
+    return ids
+
+
+def listed_ids(client, headers, **params):
+    response = client.get("/user/list", params={"limit": 200, **params}, headers=headers)
+    assert response.status_code == 200, response.text
+    return {item["id"] for item in response.json()["items"]}
+
+
+@pytest.mark.parametrize("occupation", ["packer", "Packer", "PACKER"])
+def test_filter_by_occupation_matches_stored_lowercase(client, headers, stored_users, occupation):
+    joao, joana, maria, pereira = stored_users
+    ids = listed_ids(client, headers, occupation=occupation)
+    assert {joao, joana} <= ids
+    assert maria not in ids
+
+
+@pytest.mark.parametrize("name", ["jo", "Jo", "JOA"])
+def test_filter_by_name_prefix_ignores_case(client, headers, stored_users, name):
+    joao, joana, maria, pereira = stored_users
+    ids = listed_ids(client, headers, name=name)
+    assert {joao, joana} <= ids
+    assert maria not in ids
+
+
+def test_filter_by_name_prefix_with_space(client, headers, stored_users):
+    joao, joana, maria, pereira = stored_users
+    assert listed_ids(client, headers, name="Joana  Sil") & set(stored_users) == {joana}
+
+
+def test_filter_by_email_prefix(client, headers, stored_users):
+    joao, joana, maria, pereira = stored_users
+    assert listed_ids(client, headers, email="Maria.List") == {maria}
+
+
+@pytest.mark.parametrize("name", ["joão p", "JOÃO P", "Joao Pe"])
+def test_filter_by_name_ignores_accents_and_non_ascii_case(client, headers, stored_users, name):
+    joao, joana, maria, pereira = stored_users
+    assert listed_ids(client, headers, name=name) & set(stored_users) == {pereira}
+
+
+@pytest.mark.parametrize("occupation", ["conferente", "CONFERENTE"])
+def test_filter_by_occupation_stored_with_capitals(client, headers, stored_users, occupation):
+    joao, joana, maria, pereira = stored_users
+    assert listed_ids(client, headers, occupation=occupation) & set(stored_users) == {pereira}
+
+
+def test_filter_by_email_prefix_matches_stored_capitals(client, headers, stored_users):
+    joao, joana, maria, pereira = stored_users
+    assert listed_ids(client, headers, email="joao.pereira@") == {pereira}